@@ -5,6 +5,7 @@ Pipeline Avançado de Processamento de Dados de Vagas
 Implementa: (1) Limpeza/Split, (2) Extração com Regras, (3) Normalização
 """
 
+import argparse
 import pandas as pd
 import json
 import re
@@ -12,12 +13,19 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 import logging
 
+from extraction_cache import ExtractionCache
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Versão das regras de extração (faz parte da chave do cache de extração)
+EXTRACTOR_VERSION = '1.0'
+
 class AdvancedJobProcessor:
-    def __init__(self):
+    def __init__(self, cache: Optional[ExtractionCache] = None):
+        self.cache = cache
+        
         # Dicionários de normalização
         self.seniority_mapping = {
             'junior': 'Júnior', 'jr': 'Júnior', 'iniciante': 'Júnior', 'trainee': 'Júnior',
@@ -113,24 +121,19 @@ class AdvancedJobProcessor:
         
         return sections
 
-    def extract_structured_fields(self, sections: Dict[str, str], raw_data: Dict) -> Dict[str, Any]:
-        """Etapa 2: Extração estruturada de campos com regras claras"""
-        extracted = {
-            'title': self._extract_title(sections, raw_data),
+    def extract_description_fields(self, sections: Dict[str, str]) -> Dict[str, Any]:
+        """Campos que dependem apenas do texto da descrição (resultado cacheável)"""
+        salary_min, salary_max = self._extract_salary(sections)
+        return {
             'seniority': self._extract_seniority(sections),
             'area': self._extract_area(sections),
-            'company_name': self._extract_company(sections, raw_data),
             'industry': self._extract_industry(sections),
             'employment_type': self._extract_employment_type(sections),
             'work_schedule': self._extract_work_schedule(sections),
             'modality': self._extract_modality(sections),
-            'location_city': self._extract_location_city(sections, raw_data),
-            'location_state': self._extract_location_state(sections, raw_data),
             'location_region': self._extract_location_region(sections),
-            'salary_min': None,
-            'salary_max': None,
-            'salary_currency': 'BRL',
-            'salary_period': 'month',
+            'salary_min': salary_min,
+            'salary_max': salary_max,
             'benefits': self._extract_benefits(sections),
             'rewards': self._extract_rewards(sections),
             'requirements_must': self._extract_requirements_must(sections),
@@ -139,19 +142,56 @@ class AdvancedJobProcessor:
             'responsibilities': self._extract_responsibilities(sections),
             'pcd': self._extract_pcd(sections),
             'tags': self._extract_tags(sections),
+            'confidence': self._calculate_confidence(sections),
+        }
+
+    def cached_description_fields(self, description: Any, sections: Dict[str, str]) -> Dict[str, Any]:
+        """Campos da descrição, consultando o cache de extração se houver"""
+        if self.cache is None:
+            return self.extract_description_fields(sections)
+        return self.cache.get_or_extract(
+            description, 'advanced_data_processor', EXTRACTOR_VERSION,
+            lambda _: self.extract_description_fields(sections),
+            confidence_fn=lambda fields: fields['confidence']
+        )
+
+    def extract_structured_fields(self, sections: Dict[str, str], raw_data: Dict,
+                                  description_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Etapa 2: Extração estruturada de campos com regras claras"""
+        if description_fields is None:
+            description_fields = self.extract_description_fields(sections)
+        fields = description_fields
+        
+        return {
+            'title': self._extract_title(sections, raw_data),
+            'seniority': fields['seniority'],
+            'area': fields['area'],
+            'company_name': self._extract_company(sections, raw_data),
+            'industry': fields['industry'],
+            'employment_type': fields['employment_type'],
+            'work_schedule': fields['work_schedule'],
+            'modality': fields['modality'],
+            'location_city': self._extract_location_city(sections, raw_data),
+            'location_state': self._extract_location_state(sections, raw_data),
+            'location_region': fields['location_region'],
+            'salary_min': fields['salary_min'],
+            'salary_max': fields['salary_max'],
+            'salary_currency': 'BRL',
+            'salary_period': 'month',
+            'benefits': fields['benefits'],
+            'rewards': fields['rewards'],
+            'requirements_must': fields['requirements_must'],
+            'requirements_nice': fields['requirements_nice'],
+            'education_level': fields['education_level'],
+            'responsibilities': fields['responsibilities'],
+            'pcd': fields['pcd'],
+            'tags': fields['tags'],
             'source_name': 'Catho',
             'source_url': raw_data.get('link', ''),
             'raw_excerpt': self._create_raw_excerpt(sections, raw_data),
-            'confidence': self._calculate_confidence(sections),
+            'confidence': fields['confidence'],
             'parsed_at': datetime.now().strftime('%Y-%m-%d')
         }
-        
-        # Extrair salário
-        salary_min, salary_max = self._extract_salary(sections)
-        extracted['salary_min'] = salary_min
-        extracted['salary_max'] = salary_max
-        
-        return extracted
 
     def _extract_title(self, sections: Dict[str, str], raw_data: Dict) -> str:
         """Extrair título da vaga"""
@@ -598,10 +638,12 @@ class AdvancedJobProcessor:
         for idx, row in df.iterrows():
             try:
                 # Etapa 1: Limpeza e divisão
-                sections = self.clean_and_split_text(row.get('descricao', ''))
+                description = row.get('descricao', '')
+                sections = self.clean_and_split_text(description)
                 
                 # Etapa 2: Extração estruturada
-                extracted = self.extract_structured_fields(sections, row.to_dict())
+                description_fields = self.cached_description_fields(description, sections)
+                extracted = self.extract_structured_fields(sections, row.to_dict(), description_fields)
                 
                 # Etapa 3: Normalização
                 normalized = self.normalize_values(extracted)
@@ -623,6 +665,9 @@ class AdvancedJobProcessor:
         
         # Gerar estatísticas
         self._generate_stats(processed_jobs)
+        if self.cache:
+            self.cache.commit()
+            logger.info(f"Cache de extração: {self.cache.stats()}")
 
     def _generate_stats(self, jobs: List[Dict[str, Any]]) -> None:
         """Gerar estatísticas do processamento"""
@@ -644,11 +689,21 @@ class AdvancedJobProcessor:
         logger.info(f"Confiança média: {avg_confidence:.2f}")
 
 if __name__ == "__main__":
-    processor = AdvancedJobProcessor()
-    
-    input_file = "vagas_industrial_unico.csv"
-    output_file = "vagas_industrial_estruturado_avancado.json"
+    parser = argparse.ArgumentParser(description='Pipeline avançado de processamento de vagas')
+    parser.add_argument('input_file', nargs='?', default='vagas_industrial_unico.csv',
+                        help='Arquivo CSV de entrada')
+    parser.add_argument('output_file', nargs='?', default='vagas_industrial_estruturado_avancado.json',
+                        help='Arquivo JSON de saída')
+    parser.add_argument('--cache', metavar='ARQUIVO',
+                        help='Cache SQLite de extração (reaproveita descrições já processadas)')
+    args = parser.parse_args()
     
-    processor.process_csv(input_file, output_file)
+    cache = ExtractionCache(args.cache) if args.cache else None
+    try:
+        processor = AdvancedJobProcessor(cache=cache)
+        processor.process_csv(args.input_file, args.output_file)
+    finally:
+        if cache:
+            cache.close()
     
     logger.info("Pipeline de processamento avançado concluído!")
\ No newline at end of file
@@ -8,11 +8,42 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+from count_strategy import EXACT_STRATEGIES, RowCounter
+from keyset_pagination import InvalidCursor, apply_cursor, next_cursor
+from facets import FACET_COLUMNS, FacetService
+from fast_json import install_flask
+from fieldsets import InvalidFields, parse_fields, select_clause
+from search_index import SearchIndexRefresher, fetch_rows_by_id
+
+# Ordem da listagem de vagas (mais recentes primeiro, id como desempate)
+VAGAS_ORDER = ('created_at', 'id')
+
+# Colunas de jobs e as que só existem em jobs_complete_view (agregados das tabelas filhas)
+JOB_COLUMNS = [
+    'id', 'external_id', 'title', 'seniority', 'area', 'company_id', 'company_name', 'industry',
+    'employment_type', 'work_schedule', 'modality', 'location_city', 'location_state',
+    'location_region', 'salary_min', 'salary_max', 'salary_currency', 'salary_period',
+    'education_level', 'pcd', 'source_name', 'source_url', 'raw_excerpt', 'confidence', 'parsed_at',
+    'description', 'description_raw', 'published_date', 'extraction_timestamp',
+    'data_quality_score', 'sector', 'created_at', 'updated_at'
+]
+VIEW_COLUMNS = JOB_COLUMNS + [
+    'company_full_name', 'company_industry', 'benefits', 'responsibilities',
+    'requirements_must', 'requirements_nice', 'rewards', 'tags'
+]
+# Projeção de /vagas sem fields= (cartões da listagem; descrição completa só em /vagas/<id>)
+VAGAS_LIST_COLUMNS = [
+    'id', 'title', 'company_name', 'industry', 'sector', 'area', 'seniority', 'modality',
+    'employment_type', 'location_city', 'location_state', 'salary_min', 'salary_max',
+    'published_date', 'created_at'
+]
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)  # Permitir requisições de qualquer origem
+install_flask(app)  # jsonify com orjson (FAST_JSON_RESPONSES=1) e gzip/brotli (RESPONSE_COMPRESSION=1)
 
 # Configuração do Supabase
 SUPABASE_URL = os.getenv('SUPABASE_URL')
@@ -23,6 +54,26 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Total de /vagas por combinação de filtros, em cache (ver count_strategy.py)
+row_counter = RowCounter.from_env()
+
+# Índice invertido de /vagas/search (BM25, sem ilike '%termo%' no banco)
+SEARCH_FIELDS = ['title', 'company_name', 'sector', 'industry', 'area',
+                 'location_city', 'location_state', 'requirements_must']
+search_index = SearchIndexRefresher(supabase, 'jobs_complete_view', fields=SEARCH_FIELDS, search_fields=SEARCH_FIELDS)
+search_index.start()
+
+# Valores distintos de setor, empresa, modalidade, senioridade e cidade (/setores, /empresas, /facetas)
+facet_service = FacetService(supabase)
+facet_service.start()
+
+def parse_bool_arg(name: str) -> Optional[bool]:
+    """Parâmetro booleano opcional da query string (None se ausente)"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    return value.strip().lower() in ('1', 'true', 'sim', 'yes')
+
 class VagasAPI:
     """Classe para gerenciar operações da API de vagas"""
     
@@ -55,7 +106,7 @@ def home():
         "description": "API REST para consultar vagas estruturadas do Supabase",
         "endpoints": {
             "/": "Informações da API",
-            "/vagas": "Lista todas as vagas (com paginação)",
+            "/vagas": "Lista todas as vagas (com paginação; fields= escolhe as colunas)",
             "/vagas/count": "Número total de vagas",
             "/vagas/search": "Buscar vagas por filtros",
             "/vagas/{id}": "Obter vaga específica por ID",
@@ -63,6 +114,7 @@ def home():
             "/setores": "Lista todos os setores",
             "/sectors": "Lista todos os setores (English)",
             "/empresas": "Lista todas as empresas",
+            "/facetas": "Valores distintos com número de vagas (setor, empresa, modalidade, senioridade, cidade)",
             "/skills": "Lista básica de skills",
             "/skills/statistics": "Estatísticas agregadas de skills",
             "/skills/top": "Top skills mais demandadas",
@@ -84,6 +136,20 @@ def get_all_jobs():
         # Parâmetros de paginação
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)  # Máximo 100
+        cursor = request.args.get('cursor')  # next_cursor da página anterior (substitui page)
+        # Colunas da resposta: fields=title,company_name,... (padrão VAGAS_LIST_COLUMNS, fields=all para todas)
+        try:
+            columns = parse_fields(request.args.get('fields'), allowed=VIEW_COLUMNS,
+                                   default=VAGAS_LIST_COLUMNS, required=VAGAS_ORDER)
+        except InvalidFields as e:
+            return jsonify(VagasAPI.format_response(None, str(e), 400)), 400
+        # Só colunas de jobs: lê a tabela direto, sem os joins e agregações da view
+        source = 'jobs' if set(columns) <= set(JOB_COLUMNS) else 'jobs_complete_view'
+        # Total: cached (padrão), exact, estimated ou none; with_total=true/false força exact/none
+        try:
+            count_strategy = row_counter.resolve(request.args.get('count'), parse_bool_arg('with_total'))
+        except ValueError as e:
+            return jsonify(VagasAPI.format_response(None, str(e), 400)), 400
         
         # Parâmetros de filtro
         setor = request.args.get('setor')
@@ -91,8 +157,8 @@ def get_all_jobs():
         senioridade = request.args.get('senioridade')
         cidade = request.args.get('cidade')
         
-        # Construir query usando a view completa
-        query = supabase.table('jobs_complete_view').select('*')
+        # Construir query só com as colunas pedidas
+        query = supabase.table(source).select(select_clause(columns))
         
         # Aplicar filtros
         if setor:
@@ -108,22 +174,33 @@ def get_all_jobs():
         start = (page - 1) * per_page
         end = start + per_page - 1
         
-        # Executar query com ordenação por data de criação
-        result = query.order('created_at', desc=True).range(start, end).execute()
-        
-        # Contar total de registros
-        count_query = supabase.table('jobs_complete_view').select('id', count='exact')
-        if setor:
-            count_query = count_query.eq('industry', setor)
-        if modalidade:
-            count_query = count_query.eq('modality', modalidade)
-        if senioridade:
-            count_query = count_query.eq('seniority', senioridade)
-        if cidade:
-            count_query = count_query.eq('location_city', cidade)
+        # Executar query com ordenação por data de criação (cursor: a partir da última vaga vista)
+        query = apply_cursor(query, cursor, VAGAS_ORDER, desc=True)
+        query = query.limit(per_page) if cursor else query.limit(per_page).offset(start)
+        result = query.execute()
         
-        count_result = count_query.execute()
-        total_count = count_result.count
+        # Contar total de registros (em cache por combinação de filtros)
+        def build_count_query(method):
+            count_query = supabase.table(source).select('id', count=method)
+            if setor:
+                count_query = count_query.eq('industry', setor)
+            if modalidade:
+                count_query = count_query.eq('modality', modalidade)
+            if senioridade:
+                count_query = count_query.eq('seniority', senioridade)
+            if cidade:
+                count_query = count_query.eq('location_city', cidade)
+            return count_query
+        
+        total_count = row_counter.count(
+            build_count_query, (source, setor, modalidade, senioridade, cidade), count_strategy
+        )
+        
+        # Sem total exato (ou paginando por cursor), a próxima página existe se esta veio cheia
+        if total_count is not None and count_strategy in EXACT_STRATEGIES and not cursor:
+            has_next = end < total_count - 1
+        else:
+            has_next = len(result.data) == per_page
         
         return jsonify(VagasAPI.format_response({
             "vagas": result.data,
@@ -131,9 +208,11 @@ def get_all_jobs():
                 "page": page,
                 "per_page": per_page,
                 "total": total_count,
-                "total_pages": (total_count + per_page - 1) // per_page,
-                "has_next": end < total_count - 1,
-                "has_prev": page > 1
+                "total_is_exact": count_strategy in EXACT_STRATEGIES,
+                "total_pages": (total_count + per_page - 1) // per_page if total_count is not None else None,
+                "has_next": has_next,
+                "has_prev": page > 1,
+                "next_cursor": next_cursor(result.data, per_page, VAGAS_ORDER)
             },
             "filters_applied": {
                 "setor": setor,
@@ -143,6 +222,8 @@ def get_all_jobs():
             }
         }))
         
+    except InvalidCursor as e:
+        return jsonify(VagasAPI.format_response(None, str(e), 400)), 400
     except Exception as e:
         return jsonify(VagasAPI.handle_error(e, "Erro ao buscar vagas")), 500
 
@@ -174,18 +255,16 @@ def search_jobs():
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
         
-        # Buscar em título, empresa e área
+        # Buscar em título, empresa, setor, área, local e requisitos (ordenado por relevância)
         start = (page - 1) * per_page
-        end = start + per_page - 1
-        
-        result = supabase.table('jobs_complete_view').select('*').or_(
-            f'title.ilike.%{termo}%,company_name.ilike.%{termo}%,area.ilike.%{termo}%'
-        ).order('created_at', desc=True).range(start, end).execute()
+        filters = {'industry': request.args.get('setor'), 'location_city': request.args.get('cidade')}
+        ids, total = search_index.search(termo, filters, per_page, start)
+        vagas = fetch_rows_by_id(supabase, 'jobs_complete_view', ids)
         
         return jsonify(VagasAPI.format_response({
-            "vagas": result.data,
+            "vagas": vagas,
             "termo_busca": termo,
-            "total_encontradas": len(result.data),
+            "total_encontradas": total,
             "pagination": {
                 "page": page,
                 "per_page": per_page
@@ -276,9 +355,7 @@ def get_jobs_stats():
 def get_sectors():
     """Lista todos os setores únicos"""
     try:
-        result = supabase.table('jobs').select('industry').execute()
-        setores = list(set([job['industry'] for job in result.data if job.get('industry')]))
-        setores.sort()
+        setores = facet_service.values('setor')
         
         return jsonify(VagasAPI.format_response({
             "setores": setores,
@@ -292,9 +369,7 @@ def get_sectors():
 def get_sectors_en():
     """Lista todos os setores únicos (English alias)"""
     try:
-        result = supabase.table('jobs').select('industry').execute()
-        sectors = list(set([job['industry'] for job in result.data if job.get('industry')]))
-        sectors.sort()
+        sectors = facet_service.values('setor')
         
         return jsonify(VagasAPI.format_response({
             "sectors": sectors,
@@ -330,9 +405,7 @@ def get_skills():
 def get_companies():
     """Lista todas as empresas únicas"""
     try:
-        result = supabase.table('jobs').select('company_name').execute()
-        empresas = list(set([job['company_name'] for job in result.data if job.get('company_name')]))
-        empresas.sort()
+        empresas = facet_service.values('empresa')
         
         return jsonify(VagasAPI.format_response({
             "empresas": empresas,
@@ -342,6 +415,26 @@ def get_companies():
     except Exception as e:
         return jsonify(VagasAPI.handle_error(e, "Erro ao buscar empresas")), 500
 
+@app.route('/facetas', methods=['GET'])
+def get_facets():
+    """Valores distintos com número de vagas; ?campo=setor para uma faceta só, ?limit=N para os N maiores"""
+    try:
+        campo = request.args.get('campo')
+        limit = request.args.get('limit', type=int)
+        if campo and campo not in FACET_COLUMNS:
+            return jsonify(VagasAPI.format_response(
+                None, f"campo deve ser um de: {', '.join(FACET_COLUMNS)}", 400
+            )), 400
+        
+        campos = [campo] if campo else list(FACET_COLUMNS)
+        return jsonify(VagasAPI.format_response({
+            "facetas": {nome: facet_service.counts(nome, limit) for nome in campos},
+            "atualizacao": facet_service.info()
+        }))
+        
+    except Exception as e:
+        return jsonify(VagasAPI.handle_error(e, "Erro ao buscar facetas")), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Verificação de saúde da API"""
@@ -516,6 +609,10 @@ def recalculate_statistics():
         # Executar função de recálculo de setores
         sectors_result = supabase.rpc('recalculate_sector_coverage').execute()
         
+        # Facetas e índice de busca são reconstruídos em segundo plano
+        facet_service.refresh_soon()
+        search_index.refresh_soon()
+        
         return jsonify(VagasAPI.format_response({
             "message": "Estatísticas recalculadas com sucesso",
             "skills_updated": True,
@@ -552,6 +649,7 @@ if __name__ == '__main__':
     print("   GET /setores - Lista setores")
     print("   GET /sectors - Lista setores (English)")
     print("   GET /empresas - Lista empresas")
+    print("   GET /facetas - Valores distintos com contagem")
     print("   GET /skills - Lista básica de skills")
     print("   GET /skills/statistics - Estatísticas de skills")
     print("   GET /skills/top - Top skills")
@@ -5,13 +5,23 @@ import os
 import re
 from typing import List, Optional, Dict
 from supabase import create_client, Client
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 from dotenv import load_dotenv
 from datetime import datetime
 
+from async_db import run_query, run_sync
+from export_stream import EXPORT_FORMATS, export_chunks
+from fast_json import RESPONSE_COMPRESSION, CompressionMiddleware, fast_json_response
+from fieldsets import InvalidFields, parse_fields, select_clause
+from keyset_pagination import InvalidCursor, apply_cursor, iter_rows, next_cursor
+from response_cache import ResponseCache
+from search_index import SearchIndexRefresher, fetch_rows_by_id
+from skills_snapshot import SkillsBySectorSnapshot
+
 # ---------------------------
 # Configuração Supabase
 # ---------------------------
@@ -24,6 +34,9 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Respostas em cache até a próxima carga (invalidate_api_cache) ou o TTL
+response_cache = ResponseCache.from_env()
+
 # ---------------------------
 # Configuração FastAPI
 # ---------------------------
@@ -33,24 +46,42 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# gzip/brotli negociado pelo Accept-Encoding (RESPONSE_COMPRESSION=1)
+if RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
+
 # ---------------------------
 # Modelos de resposta
 # ---------------------------
 class JobResponse(BaseModel):
+    """Campos fora do fields= pedido não aparecem (response_model_exclude_unset)"""
     id: int
-    titulo: str
-    empresa: Optional[str]
-    setor: Optional[str]
-    regime_contratacao: Optional[str]
-    modalidade: Optional[str]
-    localidade: Optional[str]
-    salario: Optional[str]
-    descricao: Optional[str]
+    titulo: Optional[str] = None
+    empresa: Optional[str] = None
+    setor: Optional[str] = None
+    regime_contratacao: Optional[str] = None
+    modalidade: Optional[str] = None
+    localidade: Optional[str] = None
+    salario: Optional[str] = None
+    descricao: Optional[str] = None
     habilidades: List[str] = []
     requisitos: List[str] = []
-    publicada_em: Optional[str]
+    publicada_em: Optional[str] = None
+
+# Campos de JobResponse que aceitam fields=, e a projeção das listagens sem fields
+JOB_FIELDS = ["id", "titulo", "empresa", "setor", "regime_contratacao", "modalidade", "localidade",
+              "salario", "descricao", "habilidades", "requisitos", "publicada_em"]
+LIST_FIELDS = ["id", "titulo", "empresa", "setor", "regime_contratacao", "modalidade",
+               "localidade", "salario", "publicada_em"]
+# Colunas de vagas de onde sai cada campo (os demais têm o mesmo nome)
+FIELD_COLUMNS = {
+    "habilidades": ["habilidades", "requisitos"],
+    "requisitos": ["habilidades", "requisitos"],
+    "publicada_em": ["data_publicacao"],
+}
 
 # ---------------------------
 # Helpers
@@ -63,6 +94,62 @@ def parse_skills(job: Dict) -> List[str]:
             skills.extend([p.strip() for p in parts if p.strip()])
     return list(set(skills))
 
+def job_fields(fields: Optional[str], default: List[str] = LIST_FIELDS) -> List[str]:
+    """Campos pedidos em fields= (default se ausente, todos com fields=all)"""
+    try:
+        return parse_fields(fields, allowed=JOB_FIELDS, default=default)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def job_columns(fields: List[str]) -> str:
+    """select() de vagas só com as colunas necessárias para os campos pedidos"""
+    columns = [column for field in fields for column in FIELD_COLUMNS.get(field, [field])]
+    return select_clause(list(dict.fromkeys(columns)))
+
+def job_payload(job: Dict, fields: Optional[List[str]] = None) -> Dict:
+    """Linha de vagas no formato de JobResponse, só com os campos pedidos
+    (validada pelo response_model, ou enviada direto no caminho rápido de fast_json)"""
+    fields = fields or JOB_FIELDS
+    skills = parse_skills(job) if "habilidades" in fields or "requisitos" in fields else []
+    payload = {
+        "id": job.get("id"),
+        "titulo": job.get("titulo"),
+        "empresa": job.get("empresa"),
+        "setor": job.get("setor"),
+        "regime_contratacao": job.get("regime_contratacao"),
+        "modalidade": job.get("modalidade"),
+        "localidade": job.get("localidade"),
+        "salario": job.get("salario"),
+        "descricao": job.get("descricao"),
+        "habilidades": skills,
+        "requisitos": skills,
+        "publicada_em": job.get("data_publicacao"),
+    }
+    return {field: payload[field] for field in fields}
+
+# Agregado de /skills-by-sector: reconstruído em segundo plano após cada carga
+# (invalidação do cache) ou a cada SKILLS_SNAPSHOT_MAX_AGE segundos
+skills_snapshot = SkillsBySectorSnapshot(
+    supabase, parse_skills,
+    generation=response_cache.current_generation,
+    max_age=float(os.getenv("SKILLS_SNAPSHOT_MAX_AGE", 600)),
+)
+
+# Índice invertido de /jobs-filtered: filtros e busca sem ilike '%...%' no banco
+search_index = SearchIndexRefresher(
+    supabase, "vagas",
+    fields=["titulo", "empresa", "setor", "localidade", "requisitos", "habilidades",
+            "modalidade", "regime_contratacao", "salario", "horario"],
+    search_fields=["titulo", "empresa", "setor", "localidade", "requisitos", "habilidades"],
+    generation=response_cache.current_generation,
+    columns="*",
+)
+
+@app.on_event("startup")
+async def start_background_jobs():
+    skills_snapshot.start()
+    search_index.start()
+
 # ---------------------------
 # Endpoints
 # ---------------------------
@@ -72,37 +159,35 @@ async def root():
     return {
         "message": "API de Vagas conectada ao Supabase",
         "version": "1.0.0",
-        "endpoints": ["/jobs", "/jobs-filtered", "/skills-by-sector"]
+        "endpoints": ["/jobs", "/jobs-filtered", "/jobs/export", "/skills-by-sector"]
     }
 
-@app.get("/jobs", response_model=List[JobResponse])
-async def get_jobs(limit: int = 50, offset: int = 0):
-    """Lista todas as vagas"""
+@app.get("/jobs", response_model=List[JobResponse], response_model_exclude_unset=True)
+async def get_jobs(response: Response, limit: int = 50, offset: int = 0, cursor: Optional[str] = None,
+                   fields: Optional[str] = None):
+    """Lista todas as vagas por id. Paginação por offset ou, mais barata em
+    páginas profundas, por cursor: o próximo vem no header X-Next-Cursor.
+    fields=titulo,empresa,... escolhe os campos (padrão: sem descrição e skills; fields=all traz tudo)"""
+    jobs = await fetch_jobs(limit=limit, offset=offset, cursor=cursor, fields=job_fields(fields))
+    cursor_seguinte = next_cursor(jobs, limit, ("id",))
+    headers = {"X-Next-Cursor": cursor_seguinte} if cursor_seguinte else {}
+    response.headers.update(headers)
+    return fast_json_response(jobs, headers=headers)
+
+@response_cache.cached("jobs")
+async def fetch_jobs(limit: int, offset: int, cursor: Optional[str], fields: List[str]):
     try:
-        response = supabase.table("vagas").select("*").range(offset, offset + limit - 1).execute()
-        jobs = response.data or []
-
-        return [
-            JobResponse(
-                id=job.get("id"),
-                titulo=job.get("titulo"),
-                empresa=job.get("empresa"),
-                setor=job.get("setor"),
-                regime_contratacao=job.get("regime_contratacao"),
-                modalidade=job.get("modalidade"),
-                localidade=job.get("localidade"),
-                salario=job.get("salario"),
-                descricao=job.get("descricao"),
-                habilidades=parse_skills(job),
-                requisitos=parse_skills(job),
-                publicada_em=job.get("data_publicacao"),
-            )
-            for job in jobs
-        ]
+        query = apply_cursor(supabase.table("vagas").select(job_columns(fields)), cursor, ("id",))
+        query = query.limit(limit) if cursor else query.limit(limit).offset(offset)
+        jobs = (await run_query(query)).data or []
+
+        return [job_payload(job, fields) for job in jobs]
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar vagas: {e}")
 
-@app.get("/jobs-filtered", response_model=List[JobResponse])
+@app.get("/jobs-filtered", response_model=List[JobResponse], response_model_exclude_unset=True)
 async def get_jobs_filtered(
     setor: Optional[str] = None,
     localidade: Optional[str] = None,
@@ -112,72 +197,121 @@ async def get_jobs_filtered(
     titulo: Optional[str] = None,
     horario: Optional[str] = None,
     requisitos: Optional[str] = None,
-    limit: int = 50
+    q: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None
+):
+    """Filtrar vagas por setor, localidade, modalidade, regime, salário, título, horário e requisitos.
+    Os filtros (sem acento/maiúsculas, por palavra ou começo de palavra) e a busca
+    livre q (ordenada por relevância) usam o índice em memória; só a página vem do banco,
+    com os campos de fields= (como em /jobs)"""
+    jobs = await filter_jobs(
+        setor=setor, localidade=localidade, modalidade=modalidade, regime=regime, salario=salario,
+        titulo=titulo, horario=horario, requisitos=requisitos, q=q, limit=limit, fields=job_fields(fields),
+    )
+    return fast_json_response(jobs)
+
+@response_cache.cached("jobs-filtered")
+async def filter_jobs(
+    setor: Optional[str] = None,
+    localidade: Optional[str] = None,
+    modalidade: Optional[str] = None,
+    regime: Optional[str] = None,
+    salario: Optional[str] = None,
+    titulo: Optional[str] = None,
+    horario: Optional[str] = None,
+    requisitos: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[List[str]] = None
 ):
-    """Filtrar vagas por setor, localidade, modalidade, regime, salário, título, horário e requisitos"""
+    fields = fields or LIST_FIELDS
     try:
-        query = supabase.table("vagas").select("*")
-
-        if setor: query = query.ilike("setor", f"%{setor}%")
-        if localidade: query = query.ilike("localidade", f"%{localidade}%")
-        if modalidade: query = query.ilike("modalidade", f"%{modalidade}%")
-        if regime: query = query.ilike("regime_contratacao", f"%{regime}%")
-        if salario: query = query.ilike("salario", f"%{salario}%")
-        if titulo: query = query.ilike("titulo", f"%{titulo}%")
-        if horario: query = query.ilike("horario", f"%{horario}%")
-        if requisitos: query = query.ilike("requisitos", f"%{requisitos}%")
-
-        jobs = query.limit(limit).execute().data or []
-
-        return [
-            JobResponse(
-                id=job.get("id"),
-                titulo=job.get("titulo"),
-                empresa=job.get("empresa"),
-                setor=job.get("setor"),
-                regime_contratacao=job.get("regime_contratacao"),
-                modalidade=job.get("modalidade"),
-                localidade=job.get("localidade"),
-                salario=job.get("salario"),
-                descricao=job.get("descricao"),
-                habilidades=parse_skills(job),
-                requisitos=parse_skills(job),
-                publicada_em=job.get("data_publicacao"),
-            )
-            for job in jobs
-        ]
+        filters = {
+            "setor": setor, "localidade": localidade, "modalidade": modalidade,
+            "regime_contratacao": regime, "salario": salario, "titulo": titulo,
+            "horario": horario, "requisitos": requisitos,
+        }
+        ids, _ = await run_sync(search_index.search, q, filters, limit)
+        jobs = await run_sync(fetch_rows_by_id, supabase, "vagas", ids, job_columns(fields))
+
+        return [job_payload(job, fields) for job in jobs]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro no filtro: {e}")
 
+# Filtros de /jobs/export -> coluna de vagas (ilike '%valor%' no banco, página a página)
+EXPORT_FILTERS = {
+    "setor": "setor", "localidade": "localidade", "modalidade": "modalidade",
+    "regime": "regime_contratacao", "salario": "salario", "titulo": "titulo",
+    "horario": "horario", "requisitos": "requisitos",
+}
+
+@app.get("/jobs/export", summary="Exporta as vagas em NDJSON ou CSV (streaming)")
+async def export_jobs(
+    export_format: str = Query("ndjson", alias="format"),
+    fields: Optional[str] = None,
+    setor: Optional[str] = None,
+    localidade: Optional[str] = None,
+    modalidade: Optional[str] = None,
+    regime: Optional[str] = None,
+    salario: Optional[str] = None,
+    titulo: Optional[str] = None,
+    horario: Optional[str] = None,
+    requisitos: Optional[str] = None,
+):
+    """Todas as vagas que passam nos filtros, enviadas aos poucos (chunked):
+    internamente percorre vagas por id em páginas de PAGE_SIZE, então a
+    memória não cresce com o tamanho da exportação. Sem fields, exporta todos os campos"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format deve ser um de: {', '.join(EXPORT_FORMATS)}")
+    campos = job_fields(fields, default=JOB_FIELDS)
+    valores = {
+        "setor": setor, "localidade": localidade, "modalidade": modalidade, "regime": regime,
+        "salario": salario, "titulo": titulo, "horario": horario, "requisitos": requisitos,
+    }
+    filtros = {EXPORT_FILTERS[param]: value for param, value in valores.items() if value}
+
+    def where(query):
+        for column, value in filtros.items():
+            query = query.ilike(column, f"%{value}%")
+        return query
+
+    rows = (job_payload(job, campos) for job in iter_rows(supabase, "vagas", job_columns(campos), where=where))
+    filename = f"vagas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    # Gerador síncrono: o Starlette o consome numa thread, fora do event loop
+    return StreamingResponse(
+        export_chunks(rows, export_format, campos),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @app.get("/skills-by-sector")
 async def skills_by_sector():
-    """Estatísticas de skills agrupadas por setor"""
+    """Estatísticas de skills agrupadas por setor (agregado pré-calculado em memória)"""
     try:
-        jobs = supabase.table("vagas").select("*").execute().data or []
-        sectors = {}
-
-        for job in jobs:
-            sector = job.get("setor") or "Outros"
-            if sector not in sectors:
-                sectors[sector] = {"count": 0, "skills": {}}
-            sectors[sector]["count"] += 1
-
-            for skill in parse_skills(job):
-                sectors[sector]["skills"][skill] = sectors[sector]["skills"].get(skill, 0) + 1
-
-        results = []
-        for sector, data in sectors.items():
-            skills_sorted = sorted(data["skills"].items(), key=lambda x: x[1], reverse=True)
-            results.append({
-                "sector": sector,
-                "total_jobs": data["count"],
-                "top_skills": [{"skill": s, "count": c} for s, c in skills_sorted[:10]]
-            })
-
-        return {"sectors": results, "last_updated": datetime.now().isoformat()}
+        return fast_json_response(await run_sync(skills_snapshot.get))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao gerar estatísticas: {e}")
 
+def require_cache_token(x_cache_token: Optional[str]) -> None:
+    """Rotas administrativas do cache exigem o cabeçalho X-Cache-Token = API_CACHE_TOKEN"""
+    token = os.getenv("API_CACHE_TOKEN")
+    if not token or x_cache_token != token:
+        raise HTTPException(status_code=403, detail="Token de cache inválido")
+
+@app.get("/cache/stats", summary="Estatísticas do cache de respostas")
+async def cache_stats(x_cache_token: Optional[str] = Header(None)):
+    require_cache_token(x_cache_token)
+    return {**response_cache.info(), "skills_by_sector": skills_snapshot.info(), "search_index": search_index.info()}
+
+@app.post("/cache/invalidate", summary="Descarta as respostas em cache (chamado após uma carga)")
+async def invalidate_cache(x_cache_token: Optional[str] = Header(None)):
+    require_cache_token(x_cache_token)
+    response_cache.invalidate()
+    skills_snapshot.refresh_soon()
+    search_index.refresh_soon()
+    return {"invalidated": True, "cache": response_cache.info()}
+
 # ---------------------------
 # Runner
 # ---------------------------
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Acesso ao Supabase a partir de endpoints async sem travar o event loop
+- O cliente supabase-py é síncrono: um .execute() dentro de um "async def"
+  segura o event loop durante toda a ida e volta da rede, e o worker do
+  uvicorn atende uma requisição por vez
+- run_query / run_sync executam a chamada em um pool de threads limitado
+  (DB_POOL_SIZE), compartilhado pelo processo; o cliente HTTP do supabase
+  continua reaproveitando as conexões abertas
+
+Variáveis de ambiente:
+  DB_POOL_SIZE   consultas simultâneas por worker (padrão 16)
+
+Uso:
+  response = await run_query(supabase.table("vagas").select("*").limit(50))
+  resultado = await run_sync(snapshot.get)
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+DEFAULT_POOL_SIZE = 16
+
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+    thread_name_prefix="supabase",
+)
+
+async def run_sync(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Executa uma função bloqueante no pool de threads e aguarda o resultado"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+async def run_query(query) -> Any:
+    """query.execute() de um builder do supabase-py, fora do event loop"""
+    return await run_sync(query.execute)
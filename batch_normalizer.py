@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalização e validação de lotes de vagas antes do upload
+- normalize_vagas: prepara e valida um lote inteiro do JSON estruturado da
+  Catho (título e empresa obrigatórios), devolvendo o motivo das rejeitadas
+- prepare_vaga: linha da tabela jobs de uma vaga (usada por prepare_job_data)
+- clean_text / parse_salary / convert_to_float / parse_date: conversões de campo
+- clean_raw_text / clean_numeric / clean_array / extract_salary_from_text:
+  conversões dos uploaders avançado e completo ('nan'/'none' viram nulos)
+
+Expressões regulares compiladas uma vez, data de extração calculada uma vez
+por lote e nenhuma função auxiliar recriada por vaga.
+
+Uso:
+  records, reasons = normalize_vagas(lote)
+  for vaga, job_data, reason in zip(lote, records, reasons):
+      ...  # job_data é None quando a vaga foi rejeitada (motivo em reason)
+"""
+
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+SALARY_NOISE_RE = re.compile(r'[^\d,.-]')
+SALARY_RANGE_RE = re.compile(r'[-a]')
+SALARY_PLACEHOLDERS = frozenset(['não informado', 'a combinar', 'null'])
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']
+ISO_DATE_RE = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})')
+BR_DATE_RE = re.compile(r'([0-9]{2})([/-])([0-9]{2})\2([0-9]{4})')
+
+SALARY_TEXT_PATTERNS = [re.compile(pattern) for pattern in (
+    r'R\$\s*([\d.,]+)\s*a\s*R\$\s*([\d.,]+)',
+    r'([\d.,]+)\s*a\s*([\d.,]+)',
+    r'R\$\s*([\d.,]+)',
+    r'([\d.,]+)'
+)]
+NULL_TEXTS = frozenset(['nan', 'null', 'none', ''])
+
+REJECT_NOT_DICT = 'vaga não é um dicionário'
+REJECT_REQUIRED = 'título ou empresa em branco'
+
+def clean_value(value: Any) -> Any:
+    """Limpa e converte valores para tipos apropriados"""
+    if value is None or value == "" or value == "null":
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "" or value.lower() == "null":
+            return None
+    return value
+
+def clean_text(value: Any, max_length: Optional[int] = None) -> Optional[str]:
+    """Texto limpo e truncado (None para vazios)"""
+    cleaned = clean_value(value)
+    if not cleaned:
+        return None
+    text = cleaned if isinstance(cleaned, str) else str(cleaned)
+    return text[:max_length] if max_length else text
+
+def convert_to_float(value: str) -> Optional[float]:
+    """Converte string para float, lidando com formato brasileiro"""
+    if not value:
+        return None
+    try:
+        clean = value.replace(' ', '').replace(',', '.')
+        # Remove pontos que não são decimais (milhares)
+        if clean.count('.') > 1:
+            parts = clean.split('.')
+            clean = ''.join(parts[:-1]) + '.' + parts[-1]
+        return float(clean)
+    except ValueError:
+        return None
+
+def parse_salary(salary_str: str) -> Tuple[Optional[float], Optional[float]]:
+    """Extrai salário mínimo e máximo de uma string"""
+    if not salary_str or salary_str.lower() in SALARY_PLACEHOLDERS:
+        return None, None
+    clean_salary = SALARY_NOISE_RE.sub('', salary_str)
+    # Padrões como "5000-8000" ou "5.000,00 - 8.000,00"
+    if '-' in clean_salary or 'a' in salary_str.lower():
+        parts = SALARY_RANGE_RE.split(clean_salary)
+        if len(parts) >= 2:
+            return convert_to_float(parts[0].strip()), convert_to_float(parts[1].strip())
+    single_salary = convert_to_float(clean_salary)
+    return single_salary, single_salary
+
+def parse_date(date_str: Any) -> Optional[str]:
+    """Converte string de data para formato ISO"""
+    if not date_str or not isinstance(date_str, str):
+        return None
+    # Atalho sem strptime para datas com dia e mês de dois dígitos
+    match = ISO_DATE_RE.fullmatch(date_str)
+    if match:
+        year, month, day = match.groups()
+    else:
+        match = BR_DATE_RE.fullmatch(date_str)
+        if match:
+            day, _, month, year = match.groups()
+    if match:
+        try:
+            return date(int(year), int(month), int(day)).isoformat()
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def clean_raw_text(value: Any) -> Optional[str]:
+    """Texto sem truncar; 'nan'/'null'/'none' (pandas, JSON) viram None"""
+    if not value:
+        return None
+    text = str(value)
+    if text.lower() in NULL_TEXTS:
+        return None
+    return text.strip()
+
+def clean_numeric(value: Any) -> Optional[float]:
+    """Float ou None ('nan'/'null'/'none' e valores inválidos)"""
+    if value is None or str(value).lower() in NULL_TEXTS:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+def clean_array(values: Optional[Sequence[Any]]) -> List[str]:
+    """Itens limpos de uma lista, sem os vazios ou nulos"""
+    if not values:
+        return []
+    cleaned = (clean_raw_text(item) for item in values)
+    return [item for item in cleaned if item]
+
+def extract_salary_from_text(salary_text: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Extrai salário mínimo e máximo do texto ("R$ 2.000 a R$ 3.000")"""
+    if not salary_text or str(salary_text).lower() in NULL_TEXTS:
+        return None, None
+    for pattern in SALARY_TEXT_PATTERNS:
+        match = pattern.search(str(salary_text))
+        if not match:
+            continue
+        try:
+            values = [float(group.replace('.', '').replace(',', '.')) for group in match.groups()]
+        except ValueError:
+            continue
+        return (values[0], values[-1])
+    return None, None
+
+def _salary(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def prepare_vaga(vaga: Dict[str, Any], extraction_timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Linha da tabela jobs de uma vaga estruturada, sem campos None.
+
+    Salários inválidos em valor_minimo/valor_maximo viram nulos (e caem no
+    texto original) em vez de derrubar a vaga.
+    """
+    info_basicas = vaga.get('informacoes_basicas') or {}
+    localizacao = vaga.get('localizacao') or {}
+    remuneracao = vaga.get('remuneracao') or {}
+    jornada = vaga.get('jornada_trabalho') or {}
+    requisitos = vaga.get('requisitos') or {}
+
+    salary_min = _salary(remuneracao.get('valor_minimo'))
+    salary_max = _salary(remuneracao.get('valor_maximo'))
+    # Se não tem min/max, tenta extrair do texto original
+    if not salary_min and not salary_max and remuneracao.get('texto_original'):
+        salary_min, salary_max = parse_salary(str(remuneracao['texto_original']))
+
+    job_data = {
+        'title': clean_text(info_basicas.get('fonte'), 500),
+        'company_name': clean_text(info_basicas.get('empresa_principal'), 255),
+        'sector': clean_text(info_basicas.get('setor'), 100),
+        'area': clean_text(info_basicas.get('area'), 100),
+        'employment_type': clean_text(remuneracao.get('tipo'), 50),
+        'work_schedule': clean_text(jornada.get('jornada_extraida')),
+        'modality': clean_text(info_basicas.get('modalidade'), 50),
+        'location_city': clean_text(localizacao.get('cidade_extraida'), 100),
+        'location_state': clean_text(localizacao.get('estado_extraido'), 10),
+        'location_region': clean_text(localizacao.get('localidade_original'), 100),
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'salary_currency': 'BRL',
+        'salary_period': 'month',
+        'education_level': clean_text(requisitos.get('formacao_minima'), 100),
+        'seniority': clean_text(requisitos.get('experiencia_necessaria'), 100),
+        'source_name': 'Catho',
+        'source_url': clean_text(info_basicas.get('link')),
+        'description': clean_text(requisitos.get('requisitos_texto_original')),
+        'published_date': parse_date(info_basicas.get('publicada_em')),
+        'extraction_timestamp': extraction_timestamp or datetime.now().isoformat(),
+        'data_quality_score': 0.8
+    }
+
+    # Remover campos None para não sobrescrever defaults
+    return {k: v for k, v in job_data.items() if v is not None}
+
+def normalize_vagas(vagas: Sequence[Any]) -> Tuple[List[Optional[Dict[str, Any]]], List[Optional[str]]]:
+    """Prepara e valida um lote de vagas.
+
+    Retorna (records, reasons) alinhados com a entrada: vagas rejeitadas têm
+    record None e o motivo em reasons.
+    """
+    extraction_timestamp = datetime.now().isoformat()
+    records: List[Optional[Dict[str, Any]]] = []
+    reasons: List[Optional[str]] = []
+    for vaga in vagas:
+        if not isinstance(vaga, dict):
+            records.append(None)
+            reasons.append(REJECT_NOT_DICT)
+            continue
+        job_data = prepare_vaga(vaga, extraction_timestamp)
+        if 'title' not in job_data or 'company_name' not in job_data:
+            records.append(None)
+            reasons.append(REJECT_REQUIRED)
+            continue
+        records.append(job_data)
+        reasons.append(None)
+    return records, reasons
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de concorrência da API (api_vagas_skills) com um PostgREST falso local
+- Sobe, em outro processo, um servidor HTTP que imita o PostgREST da tabela
+  vagas, com latência fixa por consulta (simula a ida e volta até o Supabase)
+- Roda a API em um único worker uvicorn e dispara requisições simultâneas
+  em /jobs e /jobs-filtered, com parâmetros distintos (sem acerto de cache)
+- 'bloqueante' chama query.execute() direto no event loop (comportamento
+  anterior); 'pool' usa async_db.run_query
+
+Uso:
+  python benchmark_async_api.py --requests 200 --concurrency 50 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import httpx
+import uvicorn
+
+SETORES = ['Comercial', 'Industrial', 'Administrativo', 'Saúde', 'Tecnologia']
+
+def generate_vagas(size):
+    return [
+        {
+            'id': i,
+            'titulo': f'Vaga {i}',
+            'empresa': f'Empresa {i % 50}',
+            'setor': SETORES[i % len(SETORES)],
+            'localidade': 'São Paulo - SP',
+            'habilidades': 'Excel, Comunicação; Inglês',
+            'requisitos': 'Ensino médio completo',
+        }
+        for i in range(1, size + 1)
+    ]
+
+def serve_fake_postgrest(port, size, latency):
+    """Servidor com o subconjunto do PostgREST usado pela API (select, ilike, gt, limit, Range)"""
+    vagas = generate_vagas(size)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            # postgrest-py manda corpo até no GET; lê para manter a conexão reutilizável
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            time.sleep(latency)
+            rows = vagas
+            params = dict(parse_qsl(urlparse(self.path).query))
+            for column, value in params.items():
+                if value.startswith('ilike.'):
+                    pattern = value[len('ilike.'):].strip('*%').lower()
+                    rows = [r for r in rows if pattern in str(r.get(column) or '').lower()]
+                elif value.startswith('gt.'):
+                    rows = [r for r in rows if r[column] > int(value[len('gt.'):])]
+            start, end = 0, len(rows) - 1
+            if self.headers.get('Range'):
+                start, end = (int(x) for x in self.headers['Range'].split('-'))
+            if 'limit' in params:
+                end = min(end, start + int(params['limit']) - 1)
+            body = json.dumps(rows[start:end + 1]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+def start_fake_postgrest(port, size, latency):
+    """Backend em outro processo, para não disputar o GIL com a API medida"""
+    process = multiprocessing.Process(target=serve_fake_postgrest, args=(port, size, latency), daemon=True)
+    process.start()
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+
+def start_api(port):
+    import api_vagas_skills
+    config = uvicorn.Config(api_vagas_skills.app, host='127.0.0.1', port=port, log_level='warning')
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return api_vagas_skills, server
+
+async def blocking_query(query):
+    return query.execute()
+
+async def load(base_url, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def one(i):
+            path = f'/jobs?limit=20&offset={i}' if i % 2 else f'/jobs-filtered?setor={SETORES[i % 5]}&limit={i + 1}'
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de concorrência: execute() bloqueante x pool de threads')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05, help='latência simulada por consulta (s)')
+    parser.add_argument('--vagas', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=8765, help='porta da API (o backend usa port + 1)')
+    args = parser.parse_args()
+
+    backend = start_fake_postgrest(args.port + 1, args.vagas, args.latency)
+    os.environ['SUPABASE_URL'] = f'http://127.0.0.1:{args.port + 1}'
+    os.environ['SUPABASE_KEY'] = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.c2ln'
+    os.environ['API_CACHE_SIZE'] = '0'
+    os.environ.pop('CACHE_REDIS_URL', None)
+
+    api, server = start_api(args.port)
+    pooled_query = api.run_query
+    base_url = f'http://127.0.0.1:{args.port}'
+
+    print(f"\n📊 {args.requests} requisições, {args.concurrency} simultâneas, "
+          f"latência {args.latency * 1000:.0f} ms por consulta, 1 worker")
+    results = {}
+    for name, query_fn in (('bloqueante', blocking_query), ('pool', pooled_query)):
+        api.run_query = query_fn
+        elapsed = asyncio.run(load(base_url, args.requests, args.concurrency))
+        results[name] = elapsed
+        print(f"   {name:<10} {elapsed:8.2f}s  {args.requests / elapsed:9.1f} req/s")
+    print(f"   ganho: {results['bloqueante'] / results['pool']:.1f}x")
+
+    server.should_exit = True
+    backend.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de carga no Postgres: COPY + merge (copy_loader) x INSERT por linha
+- Gera vagas sintéticas (linha de jobs + benefícios/tags/responsabilidades)
+- 'linha' reproduz o fluxo dos uploaders REST (empresa, vaga e filhas uma a uma),
+  mas direto na conexão: é um limite superior para o caminho via API
+- As tabelas do schema avançado são esvaziadas antes de cada método
+
+ATENÇÃO: use um banco descartável (TRUNCATE em jobs, companies e filhas).
+
+Uso:
+  python benchmark_copy_loader.py --dsn postgresql://postgres@localhost/bench --sizes 5000 20000
+"""
+
+import argparse
+import random
+import time
+
+import psycopg2
+
+from copy_loader import CHILD_TABLES, CopyJobsLoader, JOB_COLUMNS
+
+WORDS = (
+    'atendimento cliente vendas sistema relatorio equipe processo gestao controle estoque '
+    'financeiro suporte tecnico manutencao operacao producao qualidade seguranca logistica'
+).split()
+
+def generate_jobs(size, seed=42):
+    rng = random.Random(seed)
+    for i in range(size):
+        job = {
+            'external_id': f'bench-{i}',
+            'title': ' '.join(rng.choice(WORDS) for _ in range(3)).title(),
+            'company_name': f'Empresa {rng.randrange(size // 10 + 1)}',
+            'sector': rng.choice(['Industrial', 'Comercial', 'Tecnologia']),
+            'location_city': rng.choice(['São Paulo', 'Campinas', 'Curitiba']),
+            'salary_min': rng.randrange(1500, 5000),
+            'source_name': 'Catho',
+            'description': ' '.join(rng.choice(WORDS) for _ in range(60)),
+        }
+        children = {
+            'job_benefits': ['Vale transporte', 'Vale refeição'],
+            'job_tags': [rng.choice(WORDS)],
+        }
+        yield job, children
+
+def reset_tables(dsn):
+    conn = psycopg2.connect(dsn)
+    with conn, conn.cursor() as cursor:
+        cursor.execute('TRUNCATE jobs, companies, ' + ', '.join(CHILD_TABLES) + ' RESTART IDENTITY CASCADE')
+    conn.close()
+
+def load_row_by_row(dsn, jobs):
+    conn = psycopg2.connect(dsn)
+    columns = list(JOB_COLUMNS)
+    insert_job = (f"INSERT INTO jobs (company_id, {', '.join(columns)}) "
+                  f"VALUES (%s, {', '.join(['%s'] * len(columns))}) RETURNING id")
+    with conn, conn.cursor() as cursor:
+        for job, children in jobs:
+            cursor.execute('SELECT id FROM companies WHERE name = %s', (job['company_name'],))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute('INSERT INTO companies (name, industry) VALUES (%s, %s) RETURNING id',
+                               (job['company_name'], job['sector']))
+                row = cursor.fetchone()
+            cursor.execute(insert_job, [row[0]] + [job.get(c) for c in columns])
+            job_id = cursor.fetchone()[0]
+            for table, values in children.items():
+                for value in values:
+                    cursor.execute(f'INSERT INTO {table} (job_id, {CHILD_TABLES[table]}) VALUES (%s, %s)',
+                                   (job_id, value))
+    conn.close()
+
+def run(name, fn, dsn, jobs):
+    size = len(jobs)
+    reset_tables(dsn)
+    start = time.perf_counter()
+    fn(dsn, jobs)
+    elapsed = time.perf_counter() - start
+    print(f"   {name:<8} {elapsed:8.2f}s  {size / elapsed:9.0f} vagas/s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark COPY x INSERT por linha')
+    parser.add_argument('--dsn', required=True, help='DSN de um banco descartável com o schema avançado')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        jobs = list(generate_jobs(size))
+        print(f"\n📊 {size} vagas")
+        row = run('linha', load_row_by_row, args.dsn, jobs)
+        copy = run('copy', lambda dsn, jobs: CopyJobsLoader(dsn).load(jobs), args.dsn, jobs)
+        print(f"   ganho: {row / copy:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do total das listagens paginadas (/vagas, /jobs) em uma tabela grande
+- Cria bench_count_jobs com N vagas sintéticas (setor/cidade indexados)
+- Mede a latência média por requisição de página (20 linhas) + total, com as
+  mesmas consultas que o PostgREST roda para cada estratégia de count_strategy:
+    select-tudo  página + SELECT * sem limite (o antigo main /jobs)
+    exact        página + COUNT(*) com os filtros (o antigo /vagas)
+    cached       página + COUNT(*) só na primeira vez de cada filtro (RowCounter)
+    estimated    página + estimativa do planejador (EXPLAIN, count=planned)
+    none         só a página
+
+ATENÇÃO: use um banco descartável (a tabela bench_count_jobs é recriada).
+
+Uso:
+  python benchmark_counts.py --dsn postgresql://postgres@localhost/bench --rows 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import psycopg2
+
+from count_strategy import RowCounter
+
+TABLE = 'bench_count_jobs'
+SETORES = ['Comercial', 'Industrial', 'Administrativo', 'Saúde', 'Tecnologia', 'Logística']
+CIDADES = ['São Paulo', 'Campinas', 'Curitiba', 'Recife', 'Salvador', 'Porto Alegre']
+PAGE_SIZE = 20
+
+def create_table(conn, rows):
+    with conn, conn.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+        cursor.execute(f'''
+            CREATE TABLE {TABLE} (
+                id SERIAL PRIMARY KEY,
+                title TEXT,
+                sector TEXT,
+                location_city TEXT,
+                description TEXT,
+                created_at TIMESTAMPTZ DEFAULT NOW()
+            )''')
+        cursor.execute(f'''
+            INSERT INTO {TABLE} (title, sector, location_city, description, created_at)
+            SELECT 'Vaga ' || g,
+                   (%s::text[])[1 + g %% {len(SETORES)}],
+                   (%s::text[])[1 + (g / 7) %% {len(CIDADES)}],
+                   repeat('descricao da vaga ', 20),
+                   NOW() - (g || ' seconds')::interval
+            FROM generate_series(1, %s) g''', (SETORES, CIDADES, rows))
+        cursor.execute(f'CREATE INDEX ON {TABLE} (sector)')
+        cursor.execute(f'CREATE INDEX ON {TABLE} (location_city)')
+        cursor.execute(f'CREATE INDEX ON {TABLE} (created_at DESC, id DESC)')
+        cursor.execute(f'ANALYZE {TABLE}')
+
+def where_clause(filters):
+    conditions = [f'{column} = %s' for column in filters]
+    return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', list(filters.values())
+
+class _CountQuery:
+    """Adaptador mínimo para RowCounter: build_query(method).limit(1).execute().count"""
+
+    def __init__(self, conn, filters, method):
+        self.conn, self.filters, self.method = conn, filters, method
+
+    def limit(self, _):
+        return self
+
+    def execute(self):
+        self.count = count_rows(self.conn, self.filters, self.method)
+        return self
+
+def count_rows(conn, filters, method):
+    where, params = where_clause(filters)
+    with conn.cursor() as cursor:
+        if method == 'planned':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) SELECT 1 FROM {TABLE}{where}', params)
+            plan = cursor.fetchone()[0]
+            plan = plan if isinstance(plan, list) else json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        cursor.execute(f'SELECT COUNT(*) FROM {TABLE}{where}', params)
+        return cursor.fetchone()[0]
+
+def fetch_page(conn, filters, offset):
+    where, params = where_clause(filters)
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT * FROM {TABLE}{where} ORDER BY created_at DESC, id DESC '
+                       f'LIMIT {PAGE_SIZE} OFFSET %s', params + [offset])
+        return cursor.fetchall()
+
+def fetch_all(conn, filters):
+    where, params = where_clause(filters)
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT * FROM {TABLE}{where}', params)
+        return len(cursor.fetchall())
+
+def make_requests(size, seed=42):
+    """Navegação típica: filtros repetidos, várias páginas de cada combinação"""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(size):
+        filters = {}
+        if rng.random() < 0.7:
+            filters['sector'] = rng.choice(SETORES)
+        if rng.random() < 0.4:
+            filters['location_city'] = rng.choice(CIDADES)
+        requests.append((filters, rng.randrange(5) * PAGE_SIZE))
+    return requests
+
+def run(name, conn, requests, total_fn):
+    start = time.perf_counter()
+    for filters, offset in requests:
+        fetch_page(conn, filters, offset)
+        total_fn(filters)
+    elapsed = time.perf_counter() - start
+    print(f"   {name:<12} {elapsed / len(requests) * 1000:9.1f} ms/requisição")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das estratégias de total das listagens')
+    parser.add_argument('--dsn', required=True, help='DSN de um banco descartável')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--skip-select-all', action='store_true', help='pula o select-tudo (lento em tabelas grandes)')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.dsn)
+    print(f"🏗️ Criando {TABLE} com {args.rows} linhas...")
+    create_table(conn, args.rows)
+    conn.autocommit = True
+    requests = make_requests(args.requests)
+    counter = RowCounter()
+
+    def cached(filters):
+        counter.count(lambda method: _CountQuery(conn, filters, method),
+                      tuple(sorted(filters.items())), 'cached')
+
+    print(f"\n📊 {args.rows} linhas, {args.requests} requisições de {PAGE_SIZE} vagas")
+    results = {}
+    if not args.skip_select_all:
+        results['select-tudo'] = run('select-tudo', conn, requests, lambda f: fetch_all(conn, f))
+    results['exact'] = run('exact', conn, requests, lambda f: count_rows(conn, f, 'exact'))
+    results['cached'] = run('cached', conn, requests, cached)
+    results['estimated'] = run('estimated', conn, requests, lambda f: count_rows(conn, f, 'planned'))
+    results['none'] = run('none', conn, requests, lambda f: None)
+
+    print(f"   cached: {counter.stats['queries']} COUNTs para {args.requests} requisições")
+    for name in ('cached', 'estimated', 'none'):
+        print(f"   ganho {name} x exact: {results['exact'] / results[name]:.1f}x")
+
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+    conn.close()
+
+if __name__ == "__main__":
+    main()
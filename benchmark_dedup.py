@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de remoção de duplicatas: difflib (atual) x MinHash/LSH
+- Gera vagas sintéticas no formato de remove_duplicates.py, com uma fração de
+  quase-duplicatas (mesma empresa/setor/cidade, descrição com pequenas alterações)
+- Mede tempo e quantas quase-duplicatas cada método encontra
+
+Métodos:
+  difflib          remove_duplicates(): par a par (SequenceMatcher) dentro de
+                   empresa+setor+cidade, custo quadrático por bloco
+  minhash          remove_duplicates_minhash()
+
+Uso:
+  python benchmark_dedup.py --sizes 1000 5000 20000 --dup-rate 0.2
+"""
+
+import argparse
+import io
+import random
+import time
+from contextlib import redirect_stdout
+
+from remove_duplicates import remove_duplicates, remove_duplicates_minhash
+
+WORDS = (
+    'atendimento cliente vendas sistema relatorio equipe processo gestao controle estoque '
+    'financeiro contabil suporte tecnico manutencao preventiva corretiva operacao maquinas '
+    'producao qualidade seguranca trabalho experiencia comprovada ensino medio completo '
+    'superior cursando desejavel conhecimento pacote office excel avancado comunicacao '
+    'proatividade organizacao planejamento rotina administrativa documentos fiscais notas '
+    'pagamentos cobranca negociacao fornecedores compras logistica entrega rotas motorista'
+).split()
+
+EMPRESAS = [f'Empresa {i}' for i in range(200)]
+SETORES = ['Comercial', 'Industrial', 'Administrativo', 'Saúde', 'Tecnologia', 'Logística']
+CIDADES = ['São Paulo', 'Campinas', 'Curitiba', 'Brasília', 'Recife', 'Belo Horizonte']
+
+def make_vaga(vaga_id, descricao, empresa, setor, cidade, titulo):
+    return {
+        'id': vaga_id,
+        'informacoes_basicas': {'empresa_principal': empresa, 'setor': setor, 'fonte': titulo},
+        'localizacao': {'cidade_extraida': cidade},
+        'descricao_completa': {'texto_completo': descricao},
+    }
+
+def perturb(rng, descricao, edits=3):
+    """Troca algumas palavras da descrição (quase-duplicata)"""
+    words = descricao.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return ' '.join(words)
+
+def generate_dataset(size, dup_rate, seed=42):
+    rng = random.Random(seed)
+    vagas = []
+    near_duplicates = 0
+    while len(vagas) < size:
+        if vagas and rng.random() < dup_rate:
+            base = rng.choice(vagas)
+            info = base['informacoes_basicas']
+            vagas.append(make_vaga(
+                len(vagas) + 1, perturb(rng, base['descricao_completa']['texto_completo']),
+                info['empresa_principal'], info['setor'], base['localizacao']['cidade_extraida'],
+                info['fonte']
+            ))
+            near_duplicates += 1
+        else:
+            descricao = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(80, 200)))
+            vagas.append(make_vaga(
+                len(vagas) + 1, descricao, rng.choice(EMPRESAS), rng.choice(SETORES),
+                rng.choice(CIDADES), ' '.join(rng.choice(WORDS) for _ in range(3)).title()
+            ))
+    return vagas, near_duplicates
+
+def run(name, fn, vagas, expected):
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        unique = fn(vagas)
+    elapsed = time.perf_counter() - start
+    removed = len(vagas) - len(unique)
+    print(f"   {name:<15} {elapsed:8.2f}s  {len(vagas) / elapsed:9.0f} vagas/s  "
+          f"removidas: {removed:6d} / {expected} esperadas")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark difflib x MinHash/LSH')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--dup-rate', type=float, default=0.2)
+    parser.add_argument('--threshold', type=float, default=0.7,
+                        help='Limiar de Jaccard do MinHash')
+    parser.add_argument('--skip-difflib', action='store_true',
+                        help='Não roda o difflib (lento em tamanhos grandes)')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        vagas, expected = generate_dataset(size, args.dup_rate)
+        print(f"\n📊 {size} vagas ({expected} quase-duplicatas geradas)")
+        if not args.skip_difflib:
+            run('difflib', lambda v: remove_duplicates(v), vagas, expected)
+        run('minhash', lambda v: remove_duplicates_minhash(v, threshold=args.threshold, verbose=False),
+            vagas, expected)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de serialização e compressão das respostas das APIs (fast_json.py)
+- Gera páginas de vagas sintéticas com descrições longas (1000 vagas por padrão)
+- Mede o tempo para transformar a página em bytes JSON em cada caminho:
+    fastapi-modelo   JobResponse por linha + jsonable_encoder + JSONResponse
+                     (o que api_vagas_skills fazia com response_model)
+    flask-jsonify    jsonify(format_response(...)) com o provedor padrão
+    flask-orjson     o mesmo jsonify com install_flask(fast_json=True)
+    fast-json        fast_json.dumps (o caminho rápido, orjson se instalado)
+    fast-json-stdlib fast_json.dumps sem orjson (json da stdlib)
+- Mede o tamanho do corpo e o custo de gzip e brotli
+
+Uso:
+  python benchmark_json_responses.py --jobs 1000 --repeat 20
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from flask import Flask, jsonify
+from pydantic import BaseModel
+
+import fast_json
+
+WORDS = (
+    'experiência atendimento cliente vendas sistema relatório equipe processo gestão '
+    'controle estoque financeiro suporte técnico desenvolvimento dados banco aplicações '
+    'conhecimento desejável avançado ensino superior completo rotina administrativa'
+).split()
+SETORES = ['Comercial', 'Industrial', 'Administrativo', 'Saúde', 'Tecnologia', 'Logística']
+
+# Mesmo formato de api_vagas_skills.JobResponse
+class JobResponse(BaseModel):
+    id: int
+    titulo: str
+    empresa: Optional[str]
+    setor: Optional[str]
+    regime_contratacao: Optional[str]
+    modalidade: Optional[str]
+    localidade: Optional[str]
+    salario: Optional[str]
+    descricao: Optional[str]
+    habilidades: List[str] = []
+    requisitos: List[str] = []
+    publicada_em: Optional[str]
+
+def generate_page(size, seed=42):
+    rng = random.Random(seed)
+    return [{
+        'id': job_id,
+        'titulo': ' '.join(rng.choice(WORDS) for _ in range(3)).title(),
+        'empresa': f'Empresa {rng.randrange(500)}',
+        'setor': rng.choice(SETORES),
+        'regime_contratacao': rng.choice(['CLT', 'PJ', 'Estágio']),
+        'modalidade': rng.choice(['Presencial', 'Remoto', 'Híbrido']),
+        'localidade': rng.choice(['São Paulo - SP', 'Campinas - SP', 'Recife - PE']),
+        'salario': f'R$ {rng.randrange(1500, 15000)},00',
+        'descricao': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(150, 400))),
+        'habilidades': [rng.choice(WORDS).title() for _ in range(5)],
+        'requisitos': [rng.choice(WORDS).title() for _ in range(5)],
+        'publicada_em': '2024-05-01',
+    } for job_id in range(1, size + 1)]
+
+def format_response(data):
+    """Mesmo envelope de api_supabase_vagas.VagasAPI.format_response"""
+    return {"status": 200, "message": "Sucesso", "data": data, "timestamp": datetime.now().isoformat()}
+
+def fastapi_model_path(rows):
+    models = [JobResponse(**row) for row in rows]
+    return JSONResponse(jsonable_encoder(models)).body
+
+def flask_path(app):
+    def encode(rows):
+        with app.app_context():
+            return jsonify(format_response(rows)).get_data()
+    return encode
+
+def stdlib_dumps(rows):
+    orjson, fast_json.orjson = fast_json.orjson, None
+    try:
+        return fast_json.dumps(rows)
+    finally:
+        fast_json.orjson = orjson
+
+def measure(func, rows, repeat):
+    func(rows)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = func(rows)
+    return (time.perf_counter() - start) / repeat * 1000, body
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de serialização/compressão das respostas')
+    parser.add_argument('--jobs', type=int, default=1000, help='vagas por página')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = generate_page(args.jobs)
+    flask_default = Flask('padrao')
+    flask_fast = Flask('orjson')
+    fast_json.install_flask(flask_fast, fast_json=True, compression=False)
+
+    paths = [
+        ('fastapi-modelo', fastapi_model_path),
+        ('flask-jsonify', flask_path(flask_default)),
+        ('flask-orjson', flask_path(flask_fast)),
+        ('fast-json', fast_json.dumps),
+        ('fast-json-stdlib', stdlib_dumps),
+    ]
+    print(f"📊 Página de {args.jobs} vagas (orjson {'sim' if fast_json.orjson else 'não'}, "
+          f"brotli {'sim' if fast_json.brotli else 'não'})")
+    print(f"\n   {'caminho':<17} {'ms/página':>10} {'ganho':>7}")
+    results = {}
+    for name, func in paths:
+        results[name], body = measure(func, rows, args.repeat)
+        print(f"   {name:<17} {results[name]:>10.2f} {results['fastapi-modelo'] / results[name]:>6.1f}x")
+
+    body = fast_json.dumps(rows)
+    encodings = ['gzip'] + (['br'] if fast_json.brotli else [])
+    print(f"\n   {'codificação':<17} {'bytes':>10} {'% do JSON':>10} {'ms':>8}")
+    print(f"   {'identity':<17} {len(body):>10} {100.0:>9.1f}% {0.0:>8.2f}")
+    for encoding in encodings:
+        elapsed, compressed = measure(lambda data: fast_json.compress(data, encoding), body, args.repeat)
+        print(f"   {encoding:<17} {len(compressed):>10} {len(compressed) / len(body) * 100:>9.1f}% {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da análise de skills do main.py (/common-skills, /skills-by-sector)
+- Gera vagas sintéticas (titulo, requisitos, habilidades, setor)
+- Compara a análise antiga (três varreduras de texto por vaga e, para cada
+  skill, uma releitura de todas as vagas atrás dos job_ids) com a atual
+  (skill_matcher: uma varredura por vaga e índice skill -> vagas numa passada)
+- Confere que as duas dão as mesmas skills, frequências e job_ids
+
+Uso:
+  python benchmark_skills_analysis.py --sizes 10000 50000 100000
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from skill_matcher import COMMON_SKILLS, build_skill_index
+
+WORDS = (
+    'experiencia atendimento cliente vendas sistema relatorio equipe processo gestao '
+    'controle estoque financeiro suporte tecnico desenvolvimento dados banco aplicacoes '
+    'conhecimento desejavel avancado ensino superior completo rotina administrativa'
+).split()
+TITULOS = ['Analista', 'Desenvolvedor', 'Assistente', 'Coordenador', 'Técnico', 'Engenheiro']
+SETORES = ['Comercial', 'Industrial', 'Administrativo', 'Saúde', 'Tecnologia', 'Logística']
+
+def generate_jobs(size, seed=42):
+    rng = random.Random(seed)
+    jobs = []
+    for job_id in range(1, size + 1):
+        skills = rng.sample(COMMON_SKILLS, rng.randint(0, 6))
+        words = [rng.choice(WORDS) for _ in range(rng.randint(20, 60))] + skills[:3]
+        rng.shuffle(words)
+        jobs.append({
+            'id': job_id,
+            'titulo': f"{rng.choice(TITULOS)} {rng.choice(skills) if skills else rng.choice(WORDS)}",
+            'requisitos': ' '.join(words),
+            'habilidades': skills[3:] or None,
+            'setor': rng.choice(SETORES),
+        })
+    return jobs
+
+def legacy_extract_skills(text):
+    """extract_skills_from_text antes do skill_matcher"""
+    if not text:
+        return []
+    found_skills = []
+    text_upper = text.upper()
+    for skill in COMMON_SKILLS:
+        if skill.upper() in text_upper:
+            found_skills.append(skill)
+    return found_skills
+
+def legacy_analysis(jobs):
+    """Núcleo do analyze_common_skills antigo: skill -> (frequência, job_ids)"""
+    all_skills = []
+    job_skills_map = {}
+    for job in jobs:
+        job_skills = []
+        if job.get('titulo'):
+            job_skills.extend(legacy_extract_skills(job['titulo']))
+        if job.get('requisitos'):
+            job_skills.extend(legacy_extract_skills(job['requisitos']))
+        if job.get('habilidades'):
+            job_skills.extend(legacy_extract_skills(str(job['habilidades'])))
+        job_skills = list(set(job_skills))
+        job_skills_map[job['id']] = job_skills
+        all_skills.extend(job_skills)
+
+    result = {}
+    for skill, frequency in Counter(all_skills).items():
+        job_ids = [job_id for job_id, skills in job_skills_map.items() if skill in skills]
+        result[skill] = (frequency, job_ids)
+    return result
+
+def indexed_analysis(jobs):
+    return {skill: (len(job_ids), job_ids) for skill, job_ids in build_skill_index(jobs).items()}
+
+def timed(func, jobs):
+    start = time.perf_counter()
+    result = func(jobs)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da análise de skills do main.py')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'vagas':>8} {'antigo (s)':>11} {'índice (s)':>11} {'ganho':>7}")
+    for size in args.sizes:
+        jobs = generate_jobs(size)
+        legacy, legacy_time = timed(legacy_analysis, jobs)
+        indexed, indexed_time = timed(indexed_analysis, jobs)
+        assert legacy == indexed, "as duas análises divergiram"
+        print(f"{size:>8} {legacy_time:>11.2f} {indexed_time:>11.2f} {legacy_time / indexed_time:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import re
 from typing import List, Dict, Any
 import glob
 
+from upload_engine import UploadEngine
+
 # Configurações do Supabase
 SUPABASE_URL = "https://your-project.supabase.co"  # Substitua pela sua URL
 SUPABASE_KEY = "your-anon-key"  # Substitua pela sua chave
@@ -144,7 +146,7 @@ def prepare_job_for_database(job: Dict[str, Any]) -> Dict[str, Any]:
     
     return db_job
 
-def upload_jobs_to_supabase(jobs_file: str, batch_size: int = 100) -> bool:
+def upload_jobs_to_supabase(jobs_file: str, batch_size: int = 100, workers: int = 4) -> bool:
     """Faz upload das vagas para o Supabase"""
     print(f"🚀 Iniciando upload para Supabase...")
     print(f"📁 Arquivo: {jobs_file}")
@@ -166,48 +168,40 @@ def upload_jobs_to_supabase(jobs_file: str, batch_size: int = 100) -> bool:
             print("❌ Nenhuma vaga encontrada no arquivo")
             return False
         
-        # Processa vagas em lotes
-        total_uploaded = 0
+        # Processa vagas em lotes enviados em paralelo
         total_errors = 0
+        total_batches = (len(jobs) + batch_size - 1) // batch_size
         
-        for i in range(0, len(jobs), batch_size):
-            batch = jobs[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (len(jobs) + batch_size - 1) // batch_size
-            
-            print(f"\n📦 Processando lote {batch_num}/{total_batches} ({len(batch)} vagas)")
-            
-            # Prepara dados do lote
-            prepared_jobs = []
-            for job in batch:
-                try:
-                    prepared_job = prepare_job_for_database(job)
-                    prepared_jobs.append(prepared_job)
-                except Exception as e:
-                    print(f"   ⚠️ Erro ao preparar vaga: {e}")
-                    total_errors += 1
+        with UploadEngine(SUPABASE_URL, SUPABASE_KEY, workers=workers) as engine:
+            for i in range(0, len(jobs), batch_size):
+                batch = jobs[i:i + batch_size]
+                batch_num = (i // batch_size) + 1
+                
+                print(f"\n📦 Processando lote {batch_num}/{total_batches} ({len(batch)} vagas)")
+                
+                # Prepara dados do lote
+                prepared_jobs = []
+                for job in batch:
+                    try:
+                        prepared_job = prepare_job_for_database(job)
+                        prepared_jobs.append(prepared_job)
+                    except Exception as e:
+                        print(f"   ⚠️ Erro ao preparar vaga: {e}")
+                        total_errors += 1
+                        continue
+                
+                if not prepared_jobs:
+                    print(f"   ❌ Nenhuma vaga válida no lote {batch_num}")
                     continue
-            
-            if not prepared_jobs:
-                print(f"   ❌ Nenhuma vaga válida no lote {batch_num}")
-                continue
-            
-            # Faz upload do lote
-            try:
-                result = supabase.table('vagas').insert(prepared_jobs).execute()
                 
-                if result.data:
-                    uploaded_count = len(result.data)
-                    total_uploaded += uploaded_count
-                    print(f"   ✅ {uploaded_count} vagas inseridas com sucesso")
-                else:
-                    print(f"   ❌ Erro no upload do lote {batch_num}")
-                    total_errors += len(prepared_jobs)
-                    
-            except Exception as e:
-                print(f"   ❌ Erro no upload do lote {batch_num}: {e}")
-                total_errors += len(prepared_jobs)
-                continue
+                # Faz upload do lote (retentativas e isolamento de linhas inválidas no motor)
+                engine.submit('vagas', prepared_jobs)
+        
+        for _, job, reason in engine.failed_rows:
+            print(f"   ❌ Erro ao inserir vaga '{job.get('title', 'N/A')}': {reason}")
+        total_uploaded = engine.stats['rows_sent']
+        total_errors += engine.stats['rows_failed']
+        engine.print_metrics()
         
         # Relatório final
         print("\n" + "="*60)
@@ -215,7 +209,7 @@ def upload_jobs_to_supabase(jobs_file: str, batch_size: int = 100) -> bool:
         print("="*60)
         print(f"✅ Vagas inseridas com sucesso: {total_uploaded}")
         print(f"❌ Erros: {total_errors}")
-        print(f"📈 Taxa de sucesso: {(total_uploaded/(total_uploaded+total_errors)*100):.1f}%")
+        print(f"📈 Taxa de sucesso: {(total_uploaded/max(total_uploaded+total_errors, 1)*100):.1f}%")
         
         # Estatísticas por setor
         print("\n📊 Estatísticas por setor:")
@@ -1,9 +1,15 @@
+import argparse
 import pandas as pd
 import json
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from extraction_cache import ExtractionCache
+
+# Versão das regras de extração (faz parte da chave do cache de extração)
+EXTRACTOR_VERSION = '1.0'
+
 def extract_salary_info(salary_text: str) -> Dict[str, Any]:
     """Extrai informações detalhadas do salário"""
     if not salary_text or salary_text.strip() == '':
@@ -241,8 +247,20 @@ def extract_requirements_from_description(description: str) -> Dict[str, Any]:
         "outros": []
     }
 
-def clean_and_structure_data(csv_file: str) -> List[Dict[str, Any]]:
+def extract_description_fields(descricao_limpa: str) -> Dict[str, Any]:
+    """Executa as extrações baseadas na descrição limpa (resultado cacheável)"""
+    return {
+        "skills": extract_skills_from_description(descricao_limpa),
+        "requirements": extract_requirements_from_description(descricao_limpa),
+        "companies": extract_company_from_description(descricao_limpa),
+        "location": extract_location_from_description(descricao_limpa),
+        "work_schedule": extract_work_schedule_from_description(descricao_limpa),
+        "responsibilities": extract_responsibilities_from_description(descricao_limpa),
+    }
+
+def clean_and_structure_data(csv_file: str, cache_path: Optional[str] = None) -> List[Dict[str, Any]]:
     """Limpa e estrutura os dados do CSV"""
+    cache = ExtractionCache(cache_path) if cache_path else None
     print(f"Carregando dados de {csv_file}...")
     df = pd.read_csv(csv_file)
     print(f"Total de registros carregados: {len(df)}")
@@ -318,12 +336,19 @@ def clean_and_structure_data(csv_file: str) -> List[Dict[str, Any]]:
         
         # Extrai informações estruturadas a partir da descrição limpa e combinada
         salary_info = extract_salary_info(str(row.get('Salário', '')))
-        skills_from_desc = extract_skills_from_description(descricao_limpa)
-        requirements = extract_requirements_from_description(descricao_limpa)
-        companies = extract_company_from_description(descricao_limpa)
-        location_info = extract_location_from_description(descricao_limpa)
-        work_schedule = extract_work_schedule_from_description(descricao_limpa)
-        responsibilities = extract_responsibilities_from_description(descricao_limpa)
+        if cache:
+            fields = cache.get_or_extract(
+                descricao_limpa, 'clean_and_structure_data_complete', EXTRACTOR_VERSION,
+                extract_description_fields
+            )
+        else:
+            fields = extract_description_fields(descricao_limpa)
+        skills_from_desc = fields["skills"]
+        requirements = fields["requirements"]
+        companies = fields["companies"]
+        location_info = fields["location"]
+        work_schedule = fields["work_schedule"]
+        responsibilities = fields["responsibilities"]
         
         # Combina habilidades do campo específico com as extraídas da descrição
         habilidades_campo = str(row.get('Habilidades', '')).split(',') if pd.notna(row.get('Habilidades')) and row.get('Habilidades') else []
@@ -387,6 +412,11 @@ def clean_and_structure_data(csv_file: str) -> List[Dict[str, Any]]:
         
         structured_jobs.append(job_data)
     
+    if cache:
+        cache_stats = cache.stats()
+        cache.close()
+        print(f"Cache de extração: {cache_stats['hits']} acertos, {cache_stats['misses']} faltas ({cache_stats['hit_rate']}%)")
+    
     print(f"Processamento concluído! Total de vagas estruturadas: {len(structured_jobs)}")
     return structured_jobs
 
@@ -465,8 +495,15 @@ def generate_summary_report(structured_data: List[Dict[str, Any]]) -> Dict[str,
     }
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Processador de vagas completo')
+    parser.add_argument('csv_file', nargs='?', default='vagas_todos_setores_1_pagina.csv',
+                        help='Arquivo CSV de entrada')
+    parser.add_argument('--cache', metavar='ARQUIVO',
+                        help='Cache SQLite de extração (reaproveita descrições já processadas)')
+    args = parser.parse_args()
+    
     # Arquivo de entrada
-    csv_file = "vagas_todos_setores_1_pagina.csv"
+    csv_file = args.csv_file
     
     # Arquivos de saída
     json_output = "vagas_todos_setores_estruturadas_completo.json"
@@ -479,7 +516,7 @@ if __name__ == "__main__":
     print("="*50)
     
     # Processa e estrutura os dados
-    structured_data = clean_and_structure_data(csv_file)
+    structured_data = clean_and_structure_data(csv_file, cache_path=args.cache)
     
     # Salva dados estruturados
     save_structured_data(structured_data, json_output)
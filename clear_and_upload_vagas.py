@@ -10,6 +10,8 @@ from supabase import create_client, Client
 from dotenv import load_dotenv
 from datetime import datetime
 
+from response_cache import invalidate_api_cache
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -153,6 +155,7 @@ def main():
     
     # Verificar resultado
     final_count = verify_upload(supabase)
+    invalidate_api_cache()
     
     # Relatório final
     print("\n" + "=" * 60)
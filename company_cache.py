@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache em memória de IDs da tabela companies para os uploaders
+- Carrega todas as empresas existentes uma única vez (id, name, paginando por id)
+- Resolve nomes localmente; só nomes nunca vistos vão ao banco
+- resolve_many() cria as empresas novas de um lote inteiro em um único insert
+
+Uso:
+  companies = CompanyCache(supabase)
+  ids = companies.resolve_many([(nome, setor), ...])   # por lote
+  company_id = companies.resolve(nome, setor)          # por vaga
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from supabase import Client
+
+from keyset_pagination import iter_rows
+
+class CompanyCache:
+    """Mapa nome -> id de companies, pré-carregado e atualizado a cada inserção"""
+
+    def __init__(self, supabase: Client, page_size: int = 1000):
+        self.supabase = supabase
+        self.page_size = page_size
+        self.ids: Dict[str, int] = {}
+        self.loaded = False
+        self.inserted = 0
+
+    def warm(self) -> int:
+        """Carrega todas as empresas existentes (uma requisição por página)"""
+        self.ids.clear()
+        for row in iter_rows(self.supabase, 'companies', 'id,name', page_size=self.page_size):
+            self.ids.setdefault(row['name'], row['id'])
+        self.loaded = True
+        return len(self.ids)
+
+    def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.warm()
+
+    def get(self, name: Optional[str]) -> Optional[int]:
+        """ID da empresa se já conhecida (sem acessar o banco)"""
+        if not name:
+            return None
+        self._ensure_loaded()
+        return self.ids.get(name)
+
+    def resolve(self, name: Optional[str], industry: Optional[str] = None) -> Optional[int]:
+        """ID da empresa, inserindo-a se ainda não existir"""
+        if not name:
+            return None
+        return self.resolve_many([(name, industry)]).get(name)
+
+    def resolve_many(self, companies: Iterable[Tuple[Optional[str], Optional[str]]]) -> Dict[str, int]:
+        """Resolve vários nomes; os que faltam são inseridos em um único insert"""
+        self._ensure_loaded()
+        missing: Dict[str, Optional[str]] = {}
+        for name, industry in companies:
+            if name and name not in self.ids and name not in missing:
+                missing[name] = industry
+
+        if missing:
+            rows = [{'name': name, 'industry': industry} for name, industry in missing.items()]
+            try:
+                result = self.supabase.table('companies').insert(rows).execute()
+                for row in result.data or []:
+                    self.ids[row['name']] = row['id']
+                self.inserted += len(result.data or [])
+            except Exception:
+                # Ex.: outra carga criou uma das empresas (UNIQUE em name). Resolve uma a uma.
+                for row in rows:
+                    self._resolve_one(row['name'], row['industry'])
+
+        return self.ids
+
+    def _resolve_one(self, name: str, industry: Optional[str]) -> Optional[int]:
+        result = self.supabase.table('companies').select('id').eq('name', name).execute()
+        if not result.data:
+            result = self.supabase.table('companies').insert({'name': name, 'industry': industry}).execute()
+            if result.data:
+                self.inserted += 1
+        if result.data:
+            self.ids[name] = result.data[0]['id']
+        return self.ids.get(name)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Total de registros das listagens paginadas sem um COUNT exato por requisição
+- cached     COUNT exato guardado por combinação de filtros durante
+             COUNT_CACHE_TTL segundos (padrão): só a primeira página de cada
+             filtro paga a contagem
+- exact      COUNT exato a cada requisição (comportamento anterior)
+- estimated  estimativa do planejador do Postgres (count=planned no PostgREST):
+             custo constante, mas aproximada
+- none       sem total; a paginação segue por next_cursor / página cheia
+
+A consulta de contagem pede só a coluna id e limit 1: o total vem no header
+Content-Range, sem baixar as linhas.
+
+Variáveis de ambiente:
+  COUNT_STRATEGY    estratégia padrão (cached)
+  COUNT_CACHE_TTL   validade das contagens em cache, em segundos (padrão 300)
+
+Uso:
+  counter = RowCounter.from_env()
+  strategy = resolve_strategy(count, with_total)
+  total = counter.count(lambda method: supabase.table('jobs').select('id', count=method), ('jobs',), strategy)
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+COUNT_STRATEGIES = ('cached', 'exact', 'estimated', 'none')
+DEFAULT_STRATEGY = 'cached'
+DEFAULT_TTL = 300
+MAX_ENTRIES = 1024
+
+# Estratégias cujo total é exato (has_next/total_pages confiáveis)
+EXACT_STRATEGIES = ('cached', 'exact')
+
+def resolve_strategy(count: Optional[str] = None, with_total: Optional[bool] = None,
+                     default: str = DEFAULT_STRATEGY) -> str:
+    """Estratégia pedida: with_total=true força exact, with_total=false desliga o total"""
+    if with_total is not None:
+        return 'exact' if with_total else 'none'
+    strategy = (count or default).strip().lower()
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"count deve ser um de: {', '.join(COUNT_STRATEGIES)}")
+    return strategy
+
+class RowCounter:
+    """Contagens por combinação de filtros, com cache TTL para a estratégia cached"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, default_strategy: str = DEFAULT_STRATEGY,
+                 max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.default_strategy = resolve_strategy(default_strategy)
+        self.entries: Dict[Hashable, Tuple[float, int]] = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'queries': 0}
+
+    @classmethod
+    def from_env(cls) -> 'RowCounter':
+        return cls(
+            ttl=float(os.getenv('COUNT_CACHE_TTL', DEFAULT_TTL)),
+            default_strategy=os.getenv('COUNT_STRATEGY', DEFAULT_STRATEGY),
+        )
+
+    def resolve(self, count: Optional[str] = None, with_total: Optional[bool] = None) -> str:
+        return resolve_strategy(count, with_total, self.default_strategy)
+
+    def count(self, build_query: Callable[[str], Any], key: Hashable, strategy: str) -> Optional[int]:
+        """Total da consulta montada por build_query(count_method), conforme a estratégia.
+
+        key identifica a tabela + filtros (ex.: ('jobs_complete_view', setor, cidade)).
+        """
+        if strategy == 'none':
+            return None
+
+        now = time.monotonic()
+        if strategy == 'cached':
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self.stats['hits'] += 1
+                    return entry[1]
+
+        method = 'planned' if strategy == 'estimated' else 'exact'
+        total = build_query(method).limit(1).execute().count
+        self.stats['queries'] += 1
+        if method == 'exact' and total is not None:
+            with self.lock:
+                if key not in self.entries and len(self.entries) >= self.max_entries:
+                    # Filtros vêm da query string: descarta as expiradas e, se preciso, a mais antiga
+                    for old_key in [k for k, (expires_at, _) in self.entries.items() if expires_at <= now]:
+                        del self.entries[old_key]
+                    if len(self.entries) >= self.max_entries:
+                        del self.entries[next(iter(self.entries))]
+                self.entries[key] = (now + self.ttl, total)
+        return total
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
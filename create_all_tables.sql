@@ -66,6 +66,9 @@ CREATE INDEX IF NOT EXISTS idx_jobs_employment_type ON jobs(employment_type);
 CREATE INDEX IF NOT EXISTS idx_jobs_published_date ON jobs(published_date);
 CREATE INDEX IF NOT EXISTS idx_jobs_salary_min ON jobs(salary_min);
 CREATE INDEX IF NOT EXISTS idx_jobs_salary_max ON jobs(salary_max);
+-- Paginação por cursor de /vagas (api_supabase_vagas): ordem (created_at, id), NULL no fim
+DROP INDEX IF EXISTS idx_jobs_created_at_id;
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at_id_nulls_last ON jobs(created_at DESC NULLS LAST, id DESC);
 
 -- =====================================================
 -- TABELA DE BENEFÍCIOS
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regra única de deduplicação de vagas
+- Bloco: empresa + setor + cidade normalizados (sem acento, minúsculo, espaços colapsados)
+- Duplicata exata: fingerprint de 64 bits (xxhash se instalado, senão blake2b)
+  de bloco + título + descrição normalizados
+- Estágio fuzzy opcional: MinHash/LSH da descrição (ou do título, sem descrição)
+  dentro do mesmo bloco, com limiar de Jaccard configurável
+
+Os formatos de vaga do projeto têm nomes de campo diferentes; FIELD_MAPS traduz
+cada formato para os campos canônicos (title, company, sector, city, description).
+Campos ausentes contam como vazios.
+
+Uso:
+  from dedup import Deduplicator, JOBDATA_FIELDS
+
+  dedup = Deduplicator(ESTRUTURADA_FIELDS, fuzzy_threshold=0.85)
+  unicas = list(dedup.filter(vagas))
+
+  Deduplicator(JOBDATA_FIELDS).is_duplicate(jobdata_record(job, descricao))
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+try:
+    import xxhash
+except ImportError:  # dependência opcional: blake2b (stdlib) é mais lento, mesmo resultado
+    xxhash = None
+
+from minhash_lsh import MinHashLSH
+
+STATUS_NEW = 'new'
+STATUS_EXACT = 'exact'
+STATUS_NEAR = 'near'
+
+# Caminhos (com pontos para campos aninhados) de cada campo canônico por formato
+JOBDATA_FIELDS = {
+    # Formato plano de normalize_vagas_to_json: campos de JobData mais a descrição
+    # de origem, que JobData não guarda (monte o registro com jobdata_record)
+    'title': 'title',
+    'company': 'company_name',
+    'sector': 'area',
+    'city': 'location_city',
+    'description': 'description',
+}
+
+ESTRUTURADA_FIELDS = {
+    # JSONL estruturado (clean_and_structure_data_complete / remove_duplicates)
+    'title': 'informacoes_basicas.fonte',
+    'company': 'informacoes_basicas.empresa_principal',
+    'sector': 'informacoes_basicas.setor',
+    'city': 'localizacao.cidade_extraida',
+    'description': 'descricao_completa.texto_completo',
+}
+
+FIELD_MAPS = {
+    'jobdata': JOBDATA_FIELDS,
+    'estruturada': ESTRUTURADA_FIELDS,
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_field(value: Any) -> str:
+    """Normaliza um campo para comparação (sem acentos, minúsculo, espaços colapsados)"""
+    if value is None or value != value:  # None ou NaN (célula vazia do pandas)
+        return ''
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    return _WHITESPACE_RE.sub(' ', text).strip().lower()
+
+def get_field(record: Any, path: Optional[str]) -> Any:
+    """Lê um campo de dict ou objeto, aceitando caminhos aninhados ('a.b.c')"""
+    if not path:
+        return None
+    value = record
+    for part in path.split('.'):
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            value = value.get(part)
+        else:
+            value = getattr(value, part, None)
+    return value
+
+def jobdata_record(job: Any, description: Any) -> Dict[str, Any]:
+    """Registro no formato de JOBDATA_FIELDS para uma vaga normalizada (JobData ou
+    JobRecord) e o texto da vaga de onde ela saiu"""
+    record = {path: get_field(job, path) for name, path in JOBDATA_FIELDS.items() if name != 'description'}
+    record[JOBDATA_FIELDS['description']] = description
+    return record
+
+def _get(record: Any, fields: Dict[str, Optional[str]], name: str) -> str:
+    return normalize_field(get_field(record, fields.get(name)))
+
+def block_key(record: Any, fields: Dict[str, Optional[str]] = ESTRUTURADA_FIELDS) -> str:
+    """Chave de bloco: empresa + setor + cidade"""
+    return '|'.join((_get(record, fields, 'company'), _get(record, fields, 'sector'),
+                     _get(record, fields, 'city')))
+
+def content_text(record: Any, fields: Dict[str, Optional[str]] = ESTRUTURADA_FIELDS) -> str:
+    """Texto para a comparação fuzzy: descrição ou, sem ela, o título"""
+    return _get(record, fields, 'description') or _get(record, fields, 'title')
+
+def fingerprint(*parts: str) -> int:
+    """Hash não criptográfico de 64 bits dos campos normalizados"""
+    data = '\x1f'.join(parts).encode('utf-8')
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+class Deduplicator:
+    """Deduplicação em streaming: check() decide e registra cada vaga em O(1) amortizado"""
+
+    def __init__(self, fields: Dict[str, Optional[str]] = ESTRUTURADA_FIELDS,
+                 fuzzy_threshold: Optional[float] = None, num_perm: int = 128):
+        self.fields = fields
+        self.seen: Dict[int, Hashable] = {}
+        self.lsh = MinHashLSH(threshold=fuzzy_threshold, num_perm=num_perm) if fuzzy_threshold else None
+        self.counts = {STATUS_NEW: 0, STATUS_EXACT: 0, STATUS_NEAR: 0}
+
+    def block_key(self, record: Any) -> str:
+        return block_key(record, self.fields)
+
+    def content_text(self, record: Any) -> str:
+        return content_text(record, self.fields)
+
+    def record_fingerprint(self, record: Any) -> int:
+        return fingerprint(self.block_key(record), _get(record, self.fields, 'title'),
+                           _get(record, self.fields, 'description'))
+
+    def check(self, record: Any, key: Hashable = None) -> Tuple[str, Optional[Hashable]]:
+        """Classifica a vaga ('new', 'exact' ou 'near') e registra as novas.
+
+        Retorna também a chave da vaga já vista que ela duplica.
+        """
+        fp = self.record_fingerprint(record)
+        if fp in self.seen:
+            self.counts[STATUS_EXACT] += 1
+            return STATUS_EXACT, self.seen[fp]
+
+        key = fp if key is None else key
+        if self.lsh is not None:
+            text = self.content_text(record)
+            if text:
+                block = self.block_key(record)
+                signature = self.lsh.hasher.signature(text)
+                matches = self.lsh.query(signature=signature, block=block)
+                if matches:
+                    self.counts[STATUS_NEAR] += 1
+                    return STATUS_NEAR, matches[0][0]
+                self.lsh.insert(key, signature=signature, block=block)
+
+        self.seen[fp] = key
+        self.counts[STATUS_NEW] += 1
+        return STATUS_NEW, None
+
+    def is_duplicate(self, record: Any, key: Hashable = None) -> bool:
+        return self.check(record, key)[0] != STATUS_NEW
+
+    def filter(self, records: Iterable[Any]) -> Iterator[Any]:
+        """Gera apenas as vagas novas, na ordem de entrada"""
+        for index, record in enumerate(records):
+            if not self.is_duplicate(record, index):
+                yield record
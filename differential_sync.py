@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sincronização diferencial de vagas por external_id
+- Cada linha recebe um content_hash (blake2b dos campos de conteúdo, sem timestamps)
+- Os hashes já gravados são lidos em uma única passada paginada por id (external_id, content_hash)
+- Só linhas novas ou alteradas são enviadas (upsert on_conflict=external_id)
+- Apagar as vagas que sumiram da carga é opcional (delete_missing=True) e é
+  recusado se a carga veio vazia, se alguma vaga falhou (no mapeamento ou no
+  envio) ou se a remoção passa de max_delete_fraction das linhas existentes
+  (a não ser com force_delete=True): um arquivo truncado não esvazia a tabela
+
+Requer a coluna content_hash e o índice único em external_id
+(differential_sync_schema.sql).
+
+Uso:
+  from differential_sync import sync_table
+  stats = sync_table(supabase, 'jobs', linhas_mapeadas)
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from supabase import Client
+
+from keyset_pagination import iter_rows
+from upload_engine import UploadEngine
+
+# Fração máxima das linhas existentes que uma sincronização apaga sem force_delete
+MAX_DELETE_FRACTION = 0.1
+
+# Campos que mudam a cada execução e não indicam alteração da vaga
+VOLATILE_FIELDS = ('id', 'created_at', 'updated_at', 'content_hash')
+
+def content_hash(row: Dict[str, Any], ignore: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """Hash estável do conteúdo da linha (ordem das chaves não importa)"""
+    ignore = set(ignore)
+    content = {k: v for k, v in row.items() if k not in ignore}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def fetch_existing_hashes(supabase: Client, table: str, key: str = 'external_id',
+                          page_size: int = 1000) -> Dict[str, Optional[str]]:
+    """external_id -> content_hash de todas as linhas da tabela (páginas por id,
+    lendo só o id e as duas colunas)"""
+    existing: Dict[str, Optional[str]] = {}
+    for row in iter_rows(supabase, table, f'id,{key},content_hash', page_size=page_size):
+        if row.get(key) is not None:
+            existing[row[key]] = row.get('content_hash')
+    return existing
+
+def plan_sync(rows: Iterable[Dict[str, Any]], existing: Dict[str, Optional[str]],
+              key: str = 'external_id') -> Tuple[List[Dict[str, Any]], int, List[str]]:
+    """Compara a carga com o banco: (linhas a enviar, nº inalteradas, external_ids a apagar)"""
+    to_upsert: List[Dict[str, Any]] = []
+    unchanged = 0
+    seen = set()
+    for row in rows:
+        external_id = row.get(key)
+        if external_id is None or external_id in seen:
+            continue
+        seen.add(external_id)
+
+        row = dict(row, content_hash=content_hash(row))
+        if external_id in existing:
+            if existing[external_id] == row['content_hash']:
+                unchanged += 1
+                continue
+            # Preserva a data de criação original da vaga alterada
+            row.pop('created_at', None)
+        to_upsert.append(row)
+
+    to_delete = [external_id for external_id in existing if external_id not in seen]
+    return to_upsert, unchanged, to_delete
+
+def delete_refusal(loaded: int, existing: int, to_delete: int, failed: int,
+                   max_delete_fraction: float = MAX_DELETE_FRACTION,
+                   force_delete: bool = False) -> Optional[str]:
+    """Motivo para não apagar as vagas ausentes da carga (None se a remoção pode seguir)"""
+    if not to_delete:
+        return None
+    if not loaded:
+        return 'a carga está vazia'
+    if failed:
+        return f'{failed} vagas da carga falharam'
+    if not force_delete and to_delete > max_delete_fraction * existing:
+        return (f'{to_delete} de {existing} linhas seriam apagadas (limite de '
+                f'{max_delete_fraction:.0%}; use force_delete para confirmar)')
+    return None
+
+def sync_table(supabase: Client, table: str, rows: Iterable[Dict[str, Any]], key: str = 'external_id',
+               batch_size: int = 500, workers: int = 4, delete_missing: bool = False,
+               delete_chunk: int = 200, dry_run: bool = False, load_errors: int = 0,
+               max_delete_fraction: float = MAX_DELETE_FRACTION, force_delete: bool = False) -> Dict[str, int]:
+    """Aplica só a diferença entre a carga e a tabela.
+
+    load_errors: vagas que falharam antes do sync (ex.: no mapeamento); com
+    qualquer falha, nada é apagado.
+    """
+    existing = fetch_existing_hashes(supabase, table, key)
+    to_upsert, unchanged, to_delete = plan_sync(rows, existing, key)
+    inserted = sum(1 for row in to_upsert if row[key] not in existing)
+    loaded = len(to_upsert) + unchanged
+    if not delete_missing:
+        to_delete = []
+
+    stats = {
+        'existing': len(existing),
+        'inserted': inserted,
+        'updated': len(to_upsert) - inserted,
+        'unchanged': unchanged,
+        'deleted': 0,
+        'failed': 0,
+    }
+
+    refusal = delete_refusal(loaded, len(existing), len(to_delete), load_errors,
+                             max_delete_fraction, force_delete)
+    print(f"🔍 {table}: {stats['inserted']} novas, {stats['updated']} alteradas, "
+          f"{stats['unchanged']} inalteradas, {0 if refusal else len(to_delete)} removidas")
+    if dry_run:
+        if refusal:
+            print(f"⚠️ Remoção de {len(to_delete)} vagas seria recusada: {refusal}")
+        else:
+            stats['deleted'] = len(to_delete)
+        return stats
+
+    if to_upsert:
+        with UploadEngine(supabase.supabase_url, supabase.supabase_key, workers=workers) as engine:
+            for start in range(0, len(to_upsert), batch_size):
+                engine.submit(table, to_upsert[start:start + batch_size], upsert=True, on_conflict=key)
+        for _, row, reason in engine.failed_rows:
+            print(f"❌ Erro ao sincronizar {row.get(key)}: {reason}")
+        stats['failed'] = len(engine.failed_rows)
+        engine.print_metrics()
+
+    refusal = refusal or delete_refusal(loaded, len(existing), len(to_delete), stats['failed'],
+                                        max_delete_fraction, force_delete)
+    if refusal:
+        print(f"⚠️ Remoção de {len(to_delete)} vagas cancelada: {refusal}")
+        return stats
+
+    for start in range(0, len(to_delete), delete_chunk):
+        chunk = to_delete[start:start + delete_chunk]
+        supabase.table(table).delete().in_(key, chunk).execute()
+        stats['deleted'] += len(chunk)
+
+    return stats
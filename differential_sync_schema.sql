@@ -0,0 +1,11 @@
+-- Colunas e índices para a sincronização diferencial (differential_sync.py)
+-- Execute este script no SQL Editor do Supabase antes do primeiro --sync
+
+-- Hash do conteúdo da vaga, comparado a cada carga
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE vagas ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE vagas ADD COLUMN IF NOT EXISTS external_id TEXT;
+
+-- O upsert por external_id (on_conflict) exige índice único
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_external_id_unique ON jobs(external_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vagas_external_id_unique ON vagas(external_id);
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache compartilhado de extração de descrições
+- Chave: hash do texto exato da descrição (só em NFC) + nome do extrator +
+  versão do extrator. Os extratores dependem de maiúsculas e quebras de linha,
+  então descrições que diferem só nisso têm entradas separadas
+- Valor: campos estruturados (salário, experiência, benefícios, responsabilidades...)
+  em JSON, com o score de confiança da extração
+- Backend: SQLite (stdlib), um único arquivo reaproveitado entre execuções
+
+Uso:
+  from extraction_cache import ExtractionCache
+
+  with ExtractionCache('extraction_cache.sqlite') as cache:
+      fields = cache.get_or_extract(descricao, 'master_extractor', '1.0', extrair_campos)
+
+Ao alterar as regras de um extrator, aumente a versão dele: as entradas antigas
+deixam de ser encontradas (e podem ser removidas com purge()).
+"""
+
+import hashlib
+import json
+import sqlite3
+import unicodedata
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_PATH = 'extraction_cache.sqlite'
+
+# Formato da chave: muda quando o texto que entra no hash muda (entradas antigas
+# deixam de ser encontradas). 2: texto exato em NFC, sem minúsculas/espaços colapsados
+KEY_FORMAT = '2'
+
+def normalize_description(text: Any) -> str:
+    """Texto da descrição para a chave do cache (só NFC: maiúsculas e quebras de linha contam)"""
+    if text is None:
+        return ''
+    return unicodedata.normalize('NFC', str(text))
+
+def description_key(text: Any, extractor: str, version: str) -> str:
+    """Gera a chave do cache para uma descrição em um extrator/versão"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{KEY_FORMAT}\x00{extractor}\x00{version}\x00".encode('utf-8'))
+    h.update(normalize_description(text).encode('utf-8'))
+    return h.hexdigest()
+
+class ExtractionCache:
+    """Cache persistente (SQLite) de campos extraídos de descrições"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, commit_every: int = 500):
+        self.path = path
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                extractor TEXT NOT NULL,
+                version TEXT NOT NULL,
+                data TEXT NOT NULL,
+                confidence REAL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_extractions_extractor ON extractions (extractor, version)'
+        )
+        self.conn.commit()
+
+    def get(self, text: Any, extractor: str, version: str,
+            min_confidence: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Retorna os campos em cache ou None (ausente ou com confiança abaixo do mínimo)"""
+        row = self.conn.execute(
+            'SELECT data, confidence FROM extractions WHERE key = ?',
+            (description_key(text, extractor, version),)
+        ).fetchone()
+        if row is None or (min_confidence is not None and (row[1] or 0.0) < min_confidence):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, text: Any, extractor: str, version: str, fields: Dict[str, Any],
+            confidence: Optional[float] = None) -> None:
+        """Grava (ou substitui) os campos extraídos de uma descrição"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO extractions (key, extractor, version, data, confidence, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                description_key(text, extractor, version), extractor, version,
+                json.dumps(fields, ensure_ascii=False, default=str), confidence,
+                datetime.now().isoformat()
+            )
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def get_or_extract(self, text: Any, extractor: str, version: str,
+                       extract_fn: Callable[[Any], Dict[str, Any]],
+                       confidence_fn: Optional[Callable[[Dict[str, Any]], float]] = None,
+                       min_confidence: Optional[float] = None) -> Dict[str, Any]:
+        """Retorna os campos do cache ou executa extract_fn(text) e grava o resultado"""
+        fields = self.get(text, extractor, version, min_confidence)
+        if fields is not None:
+            return fields
+        fields = extract_fn(text)
+        confidence = confidence_fn(fields) if confidence_fn else None
+        self.set(text, extractor, version, fields, confidence)
+        # Devolve a forma serializada, igual à que um acerto de cache retornaria
+        return json.loads(json.dumps(fields, ensure_ascii=False, default=str))
+
+    def purge(self, extractor: str, keep_version: str) -> int:
+        """Remove entradas de versões antigas de um extrator"""
+        cur = self.conn.execute(
+            'DELETE FROM extractions WHERE extractor = ? AND version != ?',
+            (extractor, keep_version)
+        )
+        self.conn.commit()
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Estatísticas de uso do cache na execução atual"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0,
+        }
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Valores distintos (facetas) das vagas, com contagem, servidos da memória
+- FacetCounts: por campo (setor, empresa, modalidade, senioridade, cidade),
+  Counter valor -> número de vagas
+- FacetService: carrega a tabela jobs uma vez por id (só as colunas das
+  facetas), acrescenta as vagas novas a cada poll_interval e reconstrói tudo
+  após max_age ou refresh_soon() (ex.: depois de uma carga); mesmo ciclo do
+  índice de busca (search_index.SearchIndexRefresher)
+
+/setores, /sectors e /empresas deixam de baixar a coluna inteira a cada chamada.
+
+Uso:
+  facets = FacetService(supabase)
+  facets.start()
+  facets.values('setor')          # ['Administração', 'Comercial', ...]
+  facets.counts('empresa', 10)    # [{'valor': 'Empresa X', 'total': 42}, ...]
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from search_index import SearchIndexRefresher
+
+# Nome da faceta -> coluna da tabela jobs
+FACET_COLUMNS = {
+    'setor': 'industry',
+    'empresa': 'company_name',
+    'modalidade': 'modality',
+    'senioridade': 'seniority',
+    'cidade': 'location_city',
+}
+
+class FacetCounts:
+    """Contagem de vagas por valor de cada faceta (vagas só são acrescentadas;
+    alterações e remoções entram na próxima reconstrução)"""
+
+    def __init__(self, facet_columns: Dict[str, str]):
+        self.facet_columns = dict(facet_columns)
+        self.counters: Dict[str, Counter] = {facet: Counter() for facet in self.facet_columns}
+        self.documents = 0
+        self.max_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self.documents
+
+    def add(self, row: Dict[str, Any]) -> None:
+        for facet, column in self.facet_columns.items():
+            value = row.get(column)
+            if isinstance(value, str):
+                value = value.strip()
+            if value:
+                self.counters[facet][value] += 1
+        self.documents += 1
+        self.max_id = row['id'] if self.max_id is None else max(self.max_id, row['id'])
+
+class FacetService(SearchIndexRefresher):
+    """FacetCounts da tabela jobs, mantido em memória e atualizado em segundo plano"""
+
+    label = "cache de facetas"
+
+    def __init__(self, supabase, table: str = 'jobs', facet_columns: Optional[Dict[str, str]] = None, **kwargs):
+        self.facet_columns = dict(facet_columns or FACET_COLUMNS)
+        columns = list(dict.fromkeys(self.facet_columns.values()))
+        super().__init__(supabase, table, fields=columns, search_fields=[], **kwargs)
+
+    def new_index(self) -> FacetCounts:
+        return FacetCounts(self.facet_columns)
+
+    def values(self, facet: str) -> List[Any]:
+        """Valores distintos da faceta, em ordem alfabética"""
+        index = self.get()
+        with self.lock:
+            return sorted(index.counters[facet])
+
+    def counts(self, facet: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Valores da faceta com o número de vagas, dos mais frequentes aos menos"""
+        index = self.get()
+        with self.lock:
+            return [{'valor': value, 'total': total} for value, total in index.counters[facet].most_common(limit)]
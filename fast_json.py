@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Respostas JSON rápidas e comprimidas para as APIs (FastAPI e Flask)
+- fast_json_response(): com FAST_JSON_RESPONSES=1 os endpoints devolvem o JSON
+  já serializado (orjson, se instalado), sem revalidar as linhas do banco
+  pelo response_model; sem a variável, devolvem o conteúdo como antes
+- CompressionMiddleware (ASGI) e install_flask(): gzip ou brotli conforme o
+  Accept-Encoding do cliente, com RESPONSE_COMPRESSION=1
+- Respostas pequenas, já comprimidas ou em streaming passam sem alteração
+
+Variáveis de ambiente:
+  FAST_JSON_RESPONSES     1 liga o caminho rápido (padrão desligado)
+  RESPONSE_COMPRESSION    1 liga gzip/brotli (padrão desligado)
+  COMPRESSION_MIN_SIZE    bytes mínimos para comprimir (padrão 1024)
+
+Uso (FastAPI):
+  if RESPONSE_COMPRESSION:
+      app.add_middleware(CompressionMiddleware)
+
+  @app.get("/jobs", response_model=List[JobResponse])
+  async def get_jobs():
+      return fast_json_response(rows)
+
+Uso (Flask):
+  install_flask(app)   # jsonify passa a usar orjson e as respostas são comprimidas
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: json da stdlib, mesmo resultado
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # dependência opcional: sem brotli, só gzip
+    brotli = None
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, '0').strip().lower() in ('1', 'true', 'yes', 'on')
+
+FAST_JSON_RESPONSES = _env_flag('FAST_JSON_RESPONSES')
+RESPONSE_COMPRESSION = _env_flag('RESPONSE_COMPRESSION')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+def dumps(data: Any) -> bytes:
+    """JSON em UTF-8 (tipos fora do JSON, como Decimal, viram texto)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def fast_json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Any:
+    """Resposta já serializada (pula o response_model) com FAST_JSON_RESPONSES;
+    senão o próprio conteúdo, validado pelo FastAPI como antes.
+
+    Headers definidos no Response injetado do endpoint não são copiados:
+    passe-os em headers."""
+    if not FAST_JSON_RESPONSES:
+        return content
+    from starlette.responses import Response
+    return Response(dumps(content), status_code=status_code, headers=headers, media_type='application/json')
+
+# ---------------------------
+# Negociação e compressão
+# ---------------------------
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br' ou 'gzip' (o de maior q aceito pelo cliente; br no empate), ou None"""
+    if not accept_encoding:
+        return None
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    available = (['br'] if brotli is not None else []) + ['gzip']
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    """Middleware ASGI: comprime respostas completas com gzip/brotli (as que
+    chegam em vários pedaços, como streaming, passam sem compressão)"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        request_headers = dict(scope.get('headers') or [])
+        encoding = negotiate_encoding(request_headers.get(b'accept-encoding', b'').decode('latin-1'))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message: Optional[Dict[str, Any]] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message['type'] == 'http.response.start':
+                start_message = message
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                return await send(message)
+
+            body = message.get('body', b'')
+            headers = [(k, v) for k, v in start_message.get('headers', [])]
+            names = {k.lower(): v for k, v in headers}
+            if (message.get('more_body') or b'content-encoding' in names
+                    or len(body) < self.minimum_size
+                    or not is_compressible(names.get(b'content-type', b'').decode('latin-1'))):
+                passthrough = True
+                await send(start_message)
+                return await send(message)
+
+            compressed = compress(body, encoding)
+            headers = [(k, v) for k, v in headers if k.lower() not in (b'content-length', b'vary')]
+            vary = names.get(b'vary')
+            headers += [
+                (b'content-encoding', encoding.encode('latin-1')),
+                (b'content-length', str(len(compressed)).encode('latin-1')),
+                (b'vary', vary + b', Accept-Encoding' if vary else b'Accept-Encoding'),
+            ]
+            await send({**start_message, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+# ---------------------------
+# Flask
+# ---------------------------
+def _compress_flask_response(response):
+    from flask import request
+
+    if (response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not is_compressible(response.content_type)):
+        return response
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def install_flask(app, fast_json: Optional[bool] = None, compression: Optional[bool] = None) -> None:
+    """Liga no app Flask o jsonify com orjson (FAST_JSON_RESPONSES) e a
+    compressão gzip/brotli (RESPONSE_COMPRESSION)"""
+    from flask.json.provider import JSONProvider
+
+    class FastJSONProvider(JSONProvider):
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return dumps(obj).decode('utf-8')
+
+        def loads(self, s, **kwargs: Any) -> Any:
+            return loads(s)
+
+        def response(self, *args: Any, **kwargs: Any):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(dumps(obj), mimetype='application/json')
+
+    if FAST_JSON_RESPONSES if fast_json is None else fast_json:
+        app.json = FastJSONProvider(app)
+    if RESPONSE_COMPRESSION if compression is None else compression:
+        app.after_request(_compress_flask_response)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Campos esparsos (?fields=) para as listagens de vagas
+- O cliente pede só as colunas que vai mostrar: fields=titulo,empresa,localidade
+- Sem fields, as listagens usam uma projeção enxuta (sem descrição e outros
+  textos longos); fields=all devolve todas as colunas
+- Os campos são validados contra uma lista fixa antes de irem para o
+  select() do Supabase, e as colunas obrigatórias (id, chaves do cursor)
+  entram sempre
+
+Uso:
+  campos = parse_fields(request.args.get('fields'), allowed=JOB_COLUMNS, default=LIST_COLUMNS,
+                        required=('created_at', 'id'))
+  supabase.table('jobs').select(select_clause(campos))
+"""
+
+from typing import List, Optional, Sequence
+
+ALL_FIELDS = ('all', '*')
+
+class InvalidFields(ValueError):
+    """Campo pedido em fields= não existe na listagem"""
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Sequence[str],
+                 required: Sequence[str] = ('id',)) -> List[str]:
+    """Campos pedidos em fields= (ou default), na ordem pedida, com os obrigatórios à frente"""
+    if fields is None or not fields.strip():
+        requested = list(default)
+    elif fields.strip().lower() in ALL_FIELDS:
+        requested = list(allowed)
+    else:
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in allowed]
+        if unknown:
+            raise InvalidFields(
+                f"Campos inválidos em fields: {', '.join(unknown)}. Disponíveis: {', '.join(allowed)}"
+            )
+    return list(dict.fromkeys(list(required) + requested))
+
+def select_clause(columns: Sequence[str]) -> str:
+    return ','.join(columns)
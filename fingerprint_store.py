@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazém persistente de fingerprints de vagas (SimHash em SQLite)
+- Cada vaga vira: hash exato (conteúdo normalizado) + SimHash de 64 bits dos shingles
+- Classificação em uma única passada: 'new', 'exact' (mesmo conteúdo) ou
+  'near' (SimHash a distância de Hamming <= max_distance, no mesmo bloco)
+- Índice por blocos de bits: com max_distance = k, o SimHash é dividido em k + 1
+  faixas; duas fingerprints a distância <= k coincidem em pelo menos uma faixa
+  (princípio da casa dos pombos), então cada consulta é uma busca indexada
+- max_distance padrão 6: com o SimHash sem pesos, trocar uma palavra em uma
+  descrição de 100-300 palavras muda de 2 a 8 bits (3 perdia boa parte dessas
+  quase-duplicatas); vagas diferentes ficam acima de 20
+
+Tudo fica em disco: a memória não depende do tamanho do histórico, e a
+execução do dia seguinte reconhece as vagas já vistas.
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from minhash_lsh import shingles
+
+DEFAULT_STORE_PATH = 'fingerprints.sqlite'
+DEFAULT_MAX_DISTANCE = 6
+
+STATUS_NEW = 'new'
+STATUS_EXACT = 'exact'
+STATUS_NEAR = 'near'
+
+def _hash64(value: str) -> bytes:
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """SimHash de 64 bits (inteiro sem sinal) dos shingles do texto"""
+    grams = shingles(text, shingle_size)
+    if not grams:
+        return 0
+    digests = np.frombuffer(b''.join(_hash64(g) for g in grams), dtype=np.uint8)
+    bits = np.unpackbits(digests).reshape(len(grams), 64)
+    # Bit i = 1 quando a maioria dos shingles tem o bit i ligado
+    majority = (bits.sum(axis=0) * 2 > len(grams)).astype(np.uint8)
+    return int.from_bytes(np.packbits(majority).tobytes(), 'big')
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def _to_signed(value: int) -> int:
+    # SQLite guarda INTEGER com sinal (64 bits)
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+class FingerprintStore:
+    """Índice SimHash persistente para deduplicação incremental"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, max_distance: Optional[int] = None,
+                 commit_every: int = 1000):
+        """max_distance=None usa o valor gravado no armazém (ou o padrão, se for novo)"""
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.max_distance = self._stored_max_distance(max_distance)
+        self.num_bands = self.max_distance + 1
+        self.band_bits = 64 // self.num_bands
+        self._create_schema()
+
+    def _stored_max_distance(self, max_distance: Optional[int]) -> int:
+        meta = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'store_meta'"
+        ).fetchone()
+        stored = meta and self.conn.execute(
+            "SELECT value FROM store_meta WHERE key = 'max_distance'"
+        ).fetchone()
+        if not stored:
+            return DEFAULT_MAX_DISTANCE if max_distance is None else max_distance
+        if max_distance is not None and int(stored[0]) != max_distance:
+            raise ValueError(
+                f"{self.path} foi criado com max_distance={stored[0]}, "
+                f"não {max_distance}"
+            )
+        return int(stored[0])
+
+    def _create_schema(self) -> None:
+        band_columns = ', '.join(f'band{i} INTEGER NOT NULL' for i in range(self.num_bands))
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                exact_hash TEXT PRIMARY KEY,
+                simhash INTEGER NOT NULL,
+                block TEXT NOT NULL,
+                posting_id TEXT,
+                first_seen TEXT NOT NULL,
+                {band_columns}
+            );
+        """)
+        for i in range(self.num_bands):
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_fingerprints_band{i} ON fingerprints (block, band{i})'
+            )
+        self.conn.execute(
+            "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('max_distance', ?)",
+            (str(self.max_distance),)
+        )
+        self.conn.commit()
+
+    def _bands(self, fingerprint: int):
+        # Com max_distance=0 a faixa única tem os 64 bits e também precisa de sinal
+        mask = (1 << self.band_bits) - 1
+        return [_to_signed((fingerprint >> (i * self.band_bits)) & mask) for i in range(self.num_bands)]
+
+    @staticmethod
+    def exact_hash(text: str, block: str = '') -> str:
+        return hashlib.blake2b(f"{block}\x00{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def lookup(self, text: str, block: str = '') -> Tuple[str, Optional[str], int]:
+        """Classifica sem gravar: (status, posting_id da vaga correspondente, simhash)"""
+        exact = self.exact_hash(text, block)
+        row = self.conn.execute(
+            'SELECT posting_id FROM fingerprints WHERE exact_hash = ?', (exact,)
+        ).fetchone()
+        fingerprint = simhash(text)
+        if row:
+            return STATUS_EXACT, row[0], fingerprint
+
+        for i, band in enumerate(self._bands(fingerprint)):
+            rows = self.conn.execute(
+                f'SELECT simhash, posting_id FROM fingerprints WHERE block = ? AND band{i} = ?',
+                (block, band)
+            )
+            for stored, posting_id in rows:
+                if hamming_distance(fingerprint, _to_unsigned(stored)) <= self.max_distance:
+                    return STATUS_NEAR, posting_id, fingerprint
+        return STATUS_NEW, None, fingerprint
+
+    def add(self, text: str, block: str = '', posting_id: Any = None,
+            fingerprint: Optional[int] = None) -> None:
+        """Grava a fingerprint de uma vaga (ignora se o conteúdo exato já existe)"""
+        if fingerprint is None:
+            fingerprint = simhash(text)
+        band_names = ', '.join(f'band{i}' for i in range(self.num_bands))
+        placeholders = ', '.join('?' for _ in range(self.num_bands))
+        self.conn.execute(
+            f'INSERT OR IGNORE INTO fingerprints (exact_hash, simhash, block, posting_id, first_seen, '
+            f'{band_names}) VALUES (?, ?, ?, ?, ?, {placeholders})',
+            (
+                self.exact_hash(text, block), _to_signed(fingerprint), block,
+                None if posting_id is None else str(posting_id), datetime.now().isoformat(),
+                *self._bands(fingerprint)
+            )
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def classify(self, text: str, block: str = '', posting_id: Any = None) -> Tuple[str, Optional[str]]:
+        """Classifica a vaga e, se for nova, grava no armazém"""
+        status, match_id, fingerprint = self.lookup(text, block)
+        if status == STATUS_NEW:
+            self.add(text, block, posting_id, fingerprint)
+        return status, match_id
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM fingerprints').fetchone()[0]
+
+    def commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
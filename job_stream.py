@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura incremental de arquivos de vagas (JSON e JSONL)
+- iter_json_array: percorre um array JSON elemento a elemento, lendo o arquivo
+  em blocos (json.JSONDecoder.raw_decode); aceita o array na raiz ou dentro de
+  um objeto ({"vagas": [...]}, {"jobs": [...]})
+- iter_jsonl: uma vaga por linha, pulando linhas vazias ou inválidas
+- iter_jobs: escolhe o leitor pela extensão; batched: agrupa em lotes
+
+A memória fica proporcional a um bloco + uma vaga, não ao arquivo inteiro,
+e o upload começa assim que o primeiro lote é lido.
+
+Uso:
+  for lote in batched(iter_jobs('vagas.json'), 50):
+      uploader.upload_batch(lote)
+"""
+
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+CHUNK_SIZE = 1 << 20
+
+# Chaves que envolvem a lista de vagas nos JSONs exportados pelo projeto
+ARRAY_KEYS = ('vagas', 'jobs')
+
+_WHITESPACE = ' \t\r\n'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+class _Reader:
+    """Buffer de texto sobre o arquivo, com leitura sob demanda"""
+
+    def __init__(self, handle, chunk_size: int = CHUNK_SIZE):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        """Lê mais um bloco; False no fim do arquivo"""
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Próximo caractere que não é espaço ('' no fim do arquivo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Esperado um de {chars!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decodifica o próximo valor JSON completo, lendo mais blocos se preciso"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Um número no fim do buffer ('12', '1.', '1e') pode continuar no próximo bloco
+            if (not self.eof and isinstance(value, (int, float))
+                    and not self.buffer[end:].strip(_NUMBER_CHARS)):
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+def _iter_array(reader: _Reader) -> Iterator[Any]:
+    # O '[' já foi consumido
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+def iter_json_array(path: str, array_keys: Sequence[str] = ARRAY_KEYS,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Gera os elementos do array de vagas de um arquivo JSON sem carregá-lo inteiro.
+
+    Array na raiz: gera cada elemento. Objeto na raiz: gera os elementos do
+    primeiro campo de array_keys; sem essas chaves, mantém a regra antiga dos
+    uploaders (valores do objeto se todos forem objetos, senão o próprio objeto).
+    """
+    with open(path, 'r', encoding='utf-8') as handle:
+        reader = _Reader(handle, chunk_size)
+        start = reader.expect('[{')
+        if start == '[':
+            yield from _iter_array(reader)
+            return
+
+        # Objeto na raiz: campos fora de array_keys são guardados para o fallback
+        others: Dict[str, Any] = {}
+        if reader.peek() == '}':
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.value()
+                reader.expect(':')
+                if key in array_keys and reader.peek() == '[':
+                    reader.pos += 1
+                    yield from _iter_array(reader)
+                    return
+                others[key] = reader.value()
+                if reader.expect(',}') == '}':
+                    break
+
+        if all(isinstance(v, dict) for v in others.values()):
+            yield from others.values()
+        else:
+            yield others
+
+def iter_jsonl(path: str, on_error: Optional[str] = 'warn') -> Iterator[Dict[str, Any]]:
+    """Gera uma vaga por linha do JSONL (on_error='raise' para falhar em linha inválida)"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        for line_num, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                if on_error == 'raise':
+                    raise
+                if on_error == 'warn':
+                    print(f"⚠️ Erro ao decodificar JSON na linha {line_num}: {e}")
+
+def iter_jobs(path: str) -> Iterator[Any]:
+    """Leitor adequado à extensão: .jsonl/.ndjson por linha, demais como array JSON"""
+    if path.endswith(('.jsonl', '.ndjson')):
+        return iter_jsonl(path)
+    return iter_json_array(path)
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Agrupa um iterável em listas de até size elementos"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
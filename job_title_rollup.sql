@@ -0,0 +1,115 @@
+-- Contagem de vagas por título normalizado para /most-wanted-jobs (main.py)
+-- Execute este script no SQL Editor do Supabase; depois disso a tabela é
+-- mantida pelos triggers em jobs (inserções, remoções e troca de título,
+-- inclusive pelo COPY de copy_loader.py) e a API só lê as N primeiras linhas
+
+CREATE TABLE IF NOT EXISTS job_title_rollup (
+    normalized_title TEXT PRIMARY KEY,
+    title VARCHAR(500) NOT NULL,          -- título original da primeira vaga
+    job_count INTEGER NOT NULL DEFAULT 0,
+    sample_job_ids INTEGER[] NOT NULL DEFAULT '{}',  -- amostra uniforme (reservatório) de até 3 vagas
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_title_rollup_count ON job_title_rollup(job_count DESC);
+
+-- Mesma normalização de main.py: só letras ASCII, dígitos e espaços, minúsculas, sem espaços nas pontas
+CREATE OR REPLACE FUNCTION normalize_job_title(p_title TEXT)
+RETURNS TEXT AS $$
+    SELECT regexp_replace(lower(regexp_replace(p_title, '[^a-zA-Z0-9[:space:]]', '', 'g')), '^[[:space:]]+|[[:space:]]+$', '', 'g')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Um passo do algoritmo R: a n-ésima vaga entra na amostra com probabilidade k/n
+CREATE OR REPLACE FUNCTION job_title_reservoir_add(p_samples INTEGER[], p_count INTEGER, p_job_id INTEGER, p_size INTEGER DEFAULT 3)
+RETURNS INTEGER[] AS $$
+DECLARE
+    v_slot INTEGER;
+BEGIN
+    IF cardinality(p_samples) < p_size THEN
+        RETURN array_append(p_samples, p_job_id);
+    END IF;
+    v_slot := 1 + floor(random() * p_count)::INTEGER;
+    IF v_slot <= p_size THEN
+        p_samples[v_slot] := p_job_id;
+    END IF;
+    RETURN p_samples;
+END;
+$$ LANGUAGE plpgsql VOLATILE;
+
+CREATE OR REPLACE FUNCTION job_title_rollup_add(p_job_id INTEGER, p_title TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_title IS NULL OR btrim(p_title) = '' THEN
+        RETURN;
+    END IF;
+    INSERT INTO job_title_rollup AS r (normalized_title, title, job_count, sample_job_ids)
+    VALUES (normalize_job_title(p_title), btrim(p_title), 1, ARRAY[p_job_id])
+    ON CONFLICT (normalized_title) DO UPDATE SET
+        job_count = r.job_count + 1,
+        sample_job_ids = job_title_reservoir_add(r.sample_job_ids, r.job_count + 1, p_job_id),
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION job_title_rollup_remove(p_job_id INTEGER, p_title TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_title IS NULL OR btrim(p_title) = '' THEN
+        RETURN;
+    END IF;
+    UPDATE job_title_rollup SET
+        job_count = job_count - 1,
+        sample_job_ids = array_remove(sample_job_ids, p_job_id),
+        updated_at = NOW()
+    WHERE normalized_title = normalize_job_title(p_title);
+    DELETE FROM job_title_rollup WHERE normalized_title = normalize_job_title(p_title) AND job_count <= 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_job_title_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM job_title_rollup_remove(OLD.id, OLD.title);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM job_title_rollup_add(NEW.id, NEW.title);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_title_rollup_insert_delete ON jobs;
+CREATE TRIGGER jobs_title_rollup_insert_delete
+    AFTER INSERT OR DELETE ON jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_job_title_rollup();
+
+DROP TRIGGER IF EXISTS jobs_title_rollup_update ON jobs;
+CREATE TRIGGER jobs_title_rollup_update
+    AFTER UPDATE OF title ON jobs
+    FOR EACH ROW
+    WHEN (OLD.title IS DISTINCT FROM NEW.title)
+    EXECUTE FUNCTION update_job_title_rollup();
+
+-- Recalcula tudo a partir de jobs (carga inicial ou depois de um TRUNCATE em jobs)
+CREATE OR REPLACE FUNCTION rebuild_job_title_rollup()
+RETURNS INTEGER AS $$
+DECLARE
+    v_titles INTEGER;
+BEGIN
+    DELETE FROM job_title_rollup;
+    INSERT INTO job_title_rollup (normalized_title, title, job_count, sample_job_ids)
+    SELECT normalize_job_title(title),
+           (array_agg(btrim(title) ORDER BY id))[1],
+           COUNT(*),
+           (array_agg(id ORDER BY random()))[1:3]
+    FROM jobs
+    WHERE title IS NOT NULL AND btrim(title) <> ''
+    GROUP BY normalize_job_title(title);
+    GET DIAGNOSTICS v_titles = ROW_COUNT;
+    RETURN v_titles;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_job_title_rollup();
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Paginação por cursor (keyset) para as consultas do supabase-py
+- Em vez de range(offset, ...), que obriga o banco a ler e descartar todas as
+  linhas anteriores, a próxima página é pedida a partir da última linha vista:
+  "id > ultimo_id" ou "(created_at, id) < (ultimo_created_at, ultimo_id)"
+- O cursor é opaco para o cliente (base64 do JSON com as colunas de ordenação)
+- Com índice nas colunas de ordenação, qualquer página custa o mesmo que a primeira
+- NULL nas primeiras colunas vai para o fim (nullslast) e também entra no cursor;
+  a última coluna é o desempate e precisa ser única e não nula (id)
+
+Uso:
+  query = apply_cursor(supabase.table("jobs").select("*"), cursor, ("created_at", "id"), desc=True)
+  rows = query.limit(limit).execute().data
+  proximo = next_cursor(rows, limit, ("created_at", "id"))
+
+  for row in iter_rows(supabase, "vagas", "id, titulo"):  # tabela inteira, página a página
+      ...
+  iter_rows(supabase, "vagas", "*", where=lambda q: q.ilike("setor", "%saude%"))
+"""
+
+import base64
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+PAGE_SIZE = 1000
+
+class InvalidCursor(ValueError):
+    """Cursor malformado ou gerado para outra ordenação"""
+
+def encode_cursor(row: Dict[str, Any], keys: Sequence[str]) -> str:
+    payload = json.dumps({key: row.get(key) for key in keys}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Cursor inválido: {e}")
+    if not isinstance(values, dict) or set(values) != set(keys) or values[keys[-1]] is None:
+        raise InvalidCursor("Cursor inválido para esta listagem")
+    return values
+
+def next_cursor(rows: List[Dict[str, Any]], limit: int, keys: Sequence[str]) -> Optional[str]:
+    """Cursor da página seguinte (None quando esta página não veio cheia);
+    NULL nas primeiras colunas vai no cursor, como as demais"""
+    if len(rows) < limit or rows[-1].get(keys[-1]) is None:
+        return None
+    return encode_cursor(rows[-1], keys)
+
+def _quote(value: Any) -> str:
+    # Datas têm ':' e '.', reservados na sintaxe de or=(...) do PostgREST
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _equal(key: str, value: Any) -> str:
+    return f"{key}.is.null" if value is None else f"{key}.eq.{_quote(value)}"
+
+def apply_cursor(query, cursor: Optional[str], keys: Sequence[str] = ("id",), desc: bool = False):
+    """Ordena pela chave (com desempate pelas colunas seguintes, NULL no fim) e,
+    com cursor, filtra só as linhas depois da última linha da página anterior"""
+    direction = ".desc" if desc else ""
+    query.params = query.params.set("order", ",".join(f"{key}{direction}.nullslast" for key in keys))
+    if not cursor:
+        return query
+
+    values = decode_cursor(cursor, keys)
+    op = "lt" if desc else "gt"
+    first = keys[0]
+    if len(keys) == 1:
+        return query.filter(first, op, values[first])
+
+    if values[first] is None:
+        # Já no bloco de NULL (o fim da ordem): segue só dentro dele (usa o índice)
+        query = query.filter(first, "is", "null")
+    # Depois de (v1, v2, ...): k1 < v1 OR k1 IS NULL OR (k1 = v1 AND k2 < v2) ...
+    # Um valor NULL não tem nada depois dele na própria coluna (nullslast)
+    terms = []
+    for i, key in enumerate(keys):
+        if values[key] is None:
+            continue
+        after = [f"{key}.{op}.{_quote(values[key])}"]
+        if i < len(keys) - 1:
+            after.append(f"{key}.is.null")
+        equal = [_equal(k, values[k]) for k in keys[:i]]
+        for condition in after:
+            conditions = equal + [condition]
+            terms.append(conditions[0] if len(conditions) == 1 else f"and({','.join(conditions)})")
+    query.params = query.params.add("or", f"({','.join(terms)})")
+    return query
+
+def iter_rows(supabase, table: str, columns: str = "*", page_size: int = PAGE_SIZE,
+              after_id: Optional[int] = None, where: Optional[Callable] = None) -> Iterator[Dict[str, Any]]:
+    """Percorre uma tabela em páginas por id (sem o limite de linhas de um select
+    único); after_id pula as linhas já vistas e where(query) aplica filtros a cada página"""
+    last_id = after_id
+    while True:
+        query = supabase.table(table).select(columns).order("id").limit(page_size)
+        if where is not None:
+            query = where(query)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
@@ -11,8 +11,13 @@ from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from datetime import datetime
-import re
-from collections import Counter
+
+from async_db import run_query, run_sync
+from count_strategy import EXACT_STRATEGIES, RowCounter
+from fast_json import RESPONSE_COMPRESSION, CompressionMiddleware, fast_json_response
+from keyset_pagination import InvalidCursor, apply_cursor, next_cursor
+from search_index import fetch_rows_by_id
+from skill_matcher import SKILL_MATCHER, build_skill_index
 
 # Configuração do Supabase
 SUPABASE_URL = os.getenv('SUPABASE_URL')
@@ -23,6 +28,12 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Total de /jobs: COUNT exato em cache por COUNT_CACHE_TTL, sem contar a cada página
+row_counter = RowCounter.from_env()
+
+# Vagas de exemplo por título em /most-wanted-jobs (tamanho da amostra em job_title_rollup.sql)
+SAMPLE_JOBS_PER_TITLE = 3
+
 # Configuração da API
 app = FastAPI(
     title="API de Vagas e Skills",
@@ -39,6 +50,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli negociado pelo Accept-Encoding (RESPONSE_COMPRESSION=1)
+if RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
+
 # Modelos Pydantic
 class JobResponse(BaseModel):
     id: int
@@ -89,72 +104,22 @@ class MostWantedJobsResponse(BaseModel):
 # Funções auxiliares
 def extract_skills_from_text(text: str) -> List[str]:
     """Extrai skills de um texto usando padrões comuns"""
-    if not text:
-        return []
-    
-    # Lista de skills comuns para buscar
-    common_skills = [
-        'Python', 'Java', 'JavaScript', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust', 'Swift',
-        'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring', 'Laravel',
-        'HTML', 'CSS', 'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Docker',
-        'Kubernetes', 'AWS', 'Azure', 'GCP', 'Git', 'Linux', 'Windows', 'MacOS',
-        'Scrum', 'Agile', 'DevOps', 'CI/CD', 'Jenkins', 'Terraform', 'Ansible',
-        'Machine Learning', 'AI', 'Data Science', 'Big Data', 'Hadoop', 'Spark',
-        'Excel', 'Power BI', 'Tableau', 'Photoshop', 'Illustrator', 'Figma',
-        'Inglês', 'Espanhol', 'Francês', 'Alemão', 'Comunicação', 'Liderança',
-        'Trabalho em Equipe', 'Gestão de Projetos', 'Análise', 'Criatividade',
-        'Organização', 'Proatividade', 'Resolução de Problemas'
-    ]
-    
-    found_skills = []
-    text_upper = text.upper()
-    
-    for skill in common_skills:
-        if skill.upper() in text_upper:
-            found_skills.append(skill)
-    
-    return found_skills
+    return SKILL_MATCHER.find(text)
 
 def analyze_common_skills(jobs_data: List[Dict], min_frequency: int = 1) -> Dict:
     """Analisa skills comuns entre as vagas"""
-    all_skills = []
-    job_skills_map = {}
-    
-    for job in jobs_data:
-        job_id = job['id']
-        job_skills = []
-        
-        # Extrair skills do título
-        if job.get('titulo'):
-            job_skills.extend(extract_skills_from_text(job['titulo']))
-        
-        # Extrair skills dos requisitos
-        if job.get('requisitos'):
-            job_skills.extend(extract_skills_from_text(job['requisitos']))
-        
-        # Extrair skills do campo habilidades (se existir e não for None)
-        if job.get('habilidades'):
-            job_skills.extend(extract_skills_from_text(str(job['habilidades'])))
-        
-        # Remover duplicatas para este job
-        job_skills = list(set(job_skills))
-        job_skills_map[job_id] = job_skills
-        all_skills.extend(job_skills)
-    
-    # Contar frequência das skills
-    skill_counter = Counter(all_skills)
+    # Índice skill -> ids das vagas, montado numa única passada
+    skill_index = build_skill_index(jobs_data)
     
     # Filtrar por frequência mínima
-    filtered_skills = {skill: count for skill, count in skill_counter.items() if count >= min_frequency}
+    filtered_skills = {skill: job_ids for skill, job_ids in skill_index.items() if len(job_ids) >= min_frequency}
     
     # Criar lista de skills comuns com detalhes
     common_skills = []
     total_jobs = len(jobs_data)
     
-    for skill, frequency in sorted(filtered_skills.items(), key=lambda x: x[1], reverse=True):
-        # Encontrar IDs dos jobs que têm essa skill
-        job_ids = [job_id for job_id, skills in job_skills_map.items() if skill in skills]
-        
+    for skill, job_ids in sorted(filtered_skills.items(), key=lambda x: len(x[1]), reverse=True):
+        frequency = len(job_ids)
         percentage = (frequency / total_jobs) * 100
         
         common_skills.append({
@@ -185,26 +150,40 @@ async def root():
     }
 
 @app.get("/jobs", summary="Todas as vagas da tabela jobs")
-async def get_all_jobs(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+async def get_all_jobs(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0),
+                       cursor: Optional[str] = Query(None, description="next_cursor da página anterior (substitui offset)"),
+                       count: Optional[str] = Query(None, description="Total: cached (padrão), exact, estimated ou none"),
+                       with_total: Optional[bool] = Query(None, description="true = total exato, false = sem total")):
     """Retorna todas as vagas exatamente como estão na tabela jobs"""
     try:
-        # Buscar todos os dados da tabela jobs sem modificações
-        response = supabase.table('jobs').select('*').range(offset, offset + limit - 1).execute()
+        strategy = row_counter.resolve(count, with_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        # Buscar todos os dados da tabela jobs sem modificações, em ordem de id
+        query = apply_cursor(supabase.table('jobs').select('*'), cursor, ('id',))
+        query = query.limit(limit) if cursor else query.limit(limit).offset(offset)
+        response = await run_query(query)
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Nenhuma vaga encontrada")
         
-        # Contar total de registros
-        count_response = supabase.table('jobs').select('*', count='exact').execute()
-        total_count = count_response.count if hasattr(count_response, 'count') else len(response.data)
+        # Contar total de registros (só o header Content-Range, sem baixar as linhas)
+        total_count = await run_sync(
+            row_counter.count, lambda method: supabase.table('jobs').select('id', count=method), ('jobs',), strategy
+        )
         
-        return {
+        return fast_json_response({
             "total_jobs": total_count,
+            "total_is_exact": strategy in EXACT_STRATEGIES,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor(response.data, limit, ('id',)),
             "jobs": response.data
-        }
+        })
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
@@ -212,7 +191,7 @@ async def get_all_jobs(limit: int = Query(100, ge=1, le=1000), offset: int = Que
 async def get_skills_by_sector(limit: int = Query(10, ge=1, le=100)):
     try:
         # Buscar dados das vagas
-        response = supabase.table('jobs').select('id, titulo, setor, habilidades, requisitos').limit(1000).execute()
+        response = await run_query(supabase.table('jobs').select('id, titulo, setor, habilidades, requisitos').limit(1000))
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Nenhuma vaga encontrada")
@@ -237,7 +216,7 @@ async def get_skills_by_sector(limit: int = Query(10, ge=1, le=100)):
                 'analysis_date': skills_analysis['analysis_date']
             })
         
-        return result
+        return fast_json_response(result)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
@@ -246,7 +225,7 @@ async def get_skills_by_sector(limit: int = Query(10, ge=1, le=100)):
 async def get_common_skills(min_frequency: int = Query(1, ge=1, description="Frequência mínima da skill")):
     try:
         # Buscar dados das vagas
-        response = supabase.table('jobs').select('id, titulo, setor, habilidades, requisitos').execute()
+        response = await run_query(supabase.table('jobs').select('id, titulo, setor, habilidades, requisitos'))
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Nenhuma vaga encontrada")
@@ -254,7 +233,7 @@ async def get_common_skills(min_frequency: int = Query(1, ge=1, description="Fre
         # Analisar skills comuns
         analysis = analyze_common_skills(response.data, min_frequency)
         
-        return analysis
+        return fast_json_response(analysis)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
@@ -262,30 +241,40 @@ async def get_common_skills(min_frequency: int = Query(1, ge=1, description="Fre
 @app.get("/most-wanted-jobs", response_model=MostWantedJobsResponse, summary="Vagas mais procuradas")
 async def get_most_wanted_jobs(limit: int = Query(10, ge=1, le=50)):
     try:
-        # Buscar dados das vagas
-        response = supabase.table('jobs').select('*').execute()
+        # Títulos mais frequentes, já contados pela tabela job_title_rollup (job_title_rollup.sql)
+        response = await run_query(
+            supabase.table('job_title_rollup')
+            .select('normalized_title, title, job_count, sample_job_ids')
+            .order('job_count', desc=True)
+            .limit(limit)
+        )
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Nenhuma vaga encontrada")
         
-        # Contar títulos de vagas (normalizados)
-        job_titles = {}
-        jobs_by_title = {}
+        # Só as vagas de exemplo dos N títulos, numa única consulta id=in.(...)
+        sample_ids = [job_id for row in response.data for job_id in row['sample_job_ids'][:SAMPLE_JOBS_PER_TITLE]]
+        sample_rows = await run_sync(fetch_rows_by_id, supabase, 'jobs', sample_ids)
+        jobs_by_id = {job['id']: job for job in sample_rows}
         
-        for job in response.data:
-            title = job.get('titulo', '').strip()
-            if title:
-                # Normalizar título (remover caracteres especiais, converter para minúsculas)
-                normalized_title = re.sub(r'[^a-zA-Z0-9\s]', '', title).lower().strip()
-                
-                if normalized_title not in job_titles:
-                    job_titles[normalized_title] = 0
-                    jobs_by_title[normalized_title] = []
-                
-                job_titles[normalized_title] += 1
-                jobs_by_title[normalized_title].append({
+        # Percentual sobre o total de vagas (COUNT exato, em cache por COUNT_CACHE_TTL)
+        total_jobs = await run_sync(
+            row_counter.count, lambda method: supabase.table('jobs').select('id', count=method), ('jobs',), 'cached'
+        )
+        most_wanted = []
+        
+        for row in response.data:
+            count = row['job_count']
+            percentage = (count / total_jobs) * 100 if total_jobs else 0.0
+            sample_jobs = []
+            
+            for job_id in row['sample_job_ids'][:SAMPLE_JOBS_PER_TITLE]:
+                job = jobs_by_id.get(job_id)
+                if not job:
+                    continue
+                sample_jobs.append({
                     'id': job['id'],
-                    'title': title,
+                    'title': (job.get('titulo') or job.get('title') or row['title']).strip(),
                     'company': job.get('empresa'),
                     'sector': job.get('setor'),
                     'location': job.get('localizacao'),
@@ -296,32 +285,19 @@ async def get_most_wanted_jobs(limit: int = Query(10, ge=1, le=50)):
                     'url': job.get('url'),
                     'posted_date': job.get('data_publicacao')
                 })
-        
-        # Ordenar por frequência e pegar os mais comuns
-        sorted_titles = sorted(job_titles.items(), key=lambda x: x[1], reverse=True)[:limit]
-        
-        total_jobs = len(response.data)
-        most_wanted = []
-        
-        for normalized_title, count in sorted_titles:
-            percentage = (count / total_jobs) * 100
-            sample_jobs = jobs_by_title[normalized_title][:3]  # Máximo 3 exemplos
-            
-            # Usar o título original do primeiro job como representativo
-            original_title = sample_jobs[0]['title'] if sample_jobs else normalized_title
             
             most_wanted.append({
-                'title': original_title,
+                'title': row['title'],
                 'count': count,
                 'percentage': round(percentage, 2),
                 'sample_jobs': sample_jobs
             })
         
-        return {
+        return fast_json_response({
             'total_jobs_analyzed': total_jobs,
             'most_wanted_jobs': most_wanted,
             'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
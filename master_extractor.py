@@ -4,6 +4,12 @@ import re
 from datetime import datetime, timedelta
 from collections import Counter
 import unicodedata
+import argparse
+
+from extraction_cache import ExtractionCache
+
+# Versão das regras de extração (faz parte da chave do cache de extração)
+EXTRACTOR_VERSION = '1.0'
 
 def clean_description(description):
     """Remove ruídos e informações irrelevantes da descrição"""
@@ -613,9 +619,26 @@ def calculate_data_quality_score(job):
     
     return score
 
-def process_csv_master(csv_file):
+def extract_description_fields(description):
+    """Executa as extrações que dependem apenas da descrição (resultado cacheável)"""
+    edu_skills = extract_education_and_skills(description)
+    contract_info = extract_contract_type(description)
+    return {
+        'salary': extract_salary_advanced(description),
+        'experience': extract_experience_advanced(description),
+        'responsibilities': extract_responsibilities_advanced(description),
+        'benefits': extract_benefits_advanced(description),
+        'education': edu_skills.get('education', []),
+        'skills': edu_skills.get('skills', []),
+        'location_extracted': extract_location_advanced(description),
+        'contract_type': contract_info.get('contract_type'),
+        'work_model': contract_info.get('work_model'),
+    }
+
+def process_csv_master(csv_file, cache_path=None):
     """Processa CSV com extração master de dados"""
     print("🚀 Iniciando extração MASTER de dados...")
+    cache = ExtractionCache(cache_path) if cache_path else None
     
     # Carrega o CSV
     df = pd.read_csv(csv_file, encoding='utf-8')
@@ -640,23 +663,28 @@ def process_csv_master(csv_file):
         description_raw = row.get('Descrição', '')
         description = clean_description(description_raw)
         
-        salary_info = extract_salary_advanced(description)
-        experience = extract_experience_advanced(description)
-        responsibilities = extract_responsibilities_advanced(description)
-        benefits = extract_benefits_advanced(description)
-        edu_skills = extract_education_and_skills(description)
+        if cache:
+            fields = cache.get_or_extract(
+                description, 'master_extractor', EXTRACTOR_VERSION,
+                extract_description_fields, confidence_fn=calculate_data_quality_score
+            )
+        else:
+            fields = extract_description_fields(description)
+        salary_info = fields['salary']
+        experience = fields['experience']
+        responsibilities = fields['responsibilities']
+        benefits = fields['benefits']
+        location_extracted = fields['location_extracted']
         
-        # Campos adicionais extraídos da descrição
-        location_extracted = extract_location_advanced(description)
+        # Datas relativas ("há 2 dias") dependem do dia da execução: não vão para o cache
         published_date = extract_published_date(description)
-        contract_info = extract_contract_type(description)
         
         # Fallbacks e consolidação
         location_csv = row.get('Localidade', '')
         location_final = location_csv if (isinstance(location_csv, str) and location_csv.strip()) else location_extracted
         
         work_type_csv = row.get('Modalidade', '')
-        work_type_final = work_type_csv if (isinstance(work_type_csv, str) and work_type_csv.strip()) else contract_info.get('work_model')
+        work_type_final = work_type_csv if (isinstance(work_type_csv, str) and work_type_csv.strip()) else fields['work_model']
         
         # Cria objeto da vaga
         job = {
@@ -673,11 +701,11 @@ def process_csv_master(csv_file):
             'responsibilities': responsibilities,
             'benefits': benefits,
             'published_date': published_date,
-            'contract_type': contract_info.get('contract_type'),
-            'work_model': contract_info.get('work_model'),
+            'contract_type': fields['contract_type'],
+            'work_model': fields['work_model'],
             'location_extracted': location_extracted,
-            'education': edu_skills.get('education', []),
-            'skills': edu_skills.get('skills', []),
+            'education': fields['education'],
+            'skills': fields['skills'],
             'extraction_timestamp': datetime.now().isoformat()
         }
         
@@ -701,6 +729,11 @@ def process_csv_master(csv_file):
         
         jobs_data.append(job)
     
+    if cache:
+        cache_stats = cache.stats()
+        cache.close()
+        print(f"🗃️ Cache de extração: {cache_stats['hits']} acertos, {cache_stats['misses']} faltas ({cache_stats['hit_rate']}%)")
+    
     # Cria estrutura final
     final_data = {
         'metadata': {
@@ -731,6 +764,12 @@ def process_csv_master(csv_file):
     return output_file
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Extração master de dados das vagas')
+    parser.add_argument('csv_file', nargs='?', default='catho_batch_009_vagas_36001-40500.csv',
+                        help='Arquivo CSV de entrada')
+    parser.add_argument('--cache', metavar='ARQUIVO',
+                        help='Cache SQLite de extração (reaproveita descrições já processadas)')
+    args = parser.parse_args()
+    
     # Processa o arquivo CSV
-    csv_file = 'catho_batch_009_vagas_36001-40500.csv'
-    process_csv_master(csv_file)
\ No newline at end of file
+    process_csv_master(args.csv_file, cache_path=args.cache)
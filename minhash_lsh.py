@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção de quase-duplicatas com MinHash + LSH
+- Shingles de palavras (n-gramas) sobre o texto normalizado (sem acentos, minúsculo)
+- Assinatura MinHash com permutações universais (a*x + b) mod p, vetorizada com numpy
+  (p primo de 32 bits: a conta cabe em uint64 e a*x dá a volta no módulo para
+  qualquer x, então nenhum shingle domina os mínimos)
+- LSH por bandas: só documentos que colidem em alguma banda viram candidatos,
+  e o candidato é confirmado pela similaridade de Jaccard estimada pela assinatura
+
+Custo ~linear no número de documentos (cada inserção/consulta toca apenas
+os buckets das suas bandas), em vez da comparação par a par do difflib.
+"""
+
+import re
+import zlib
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_PRIME = np.uint64(4294967291)  # maior primo < 2^32
+_MAX_HASH = np.uint64((1 << 32) - 1)  # assinatura de texto vazio (nunca sai do módulo)
+_TOKEN_RE = re.compile(r'\w+')
+
+def strip_accents(text: str) -> str:
+    """Remove acentos (ç -> c, ã -> a, ...) e demais caracteres fora do ASCII"""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+def shingles(text: str, size: int = 3) -> set:
+    """Conjunto de n-gramas de palavras do texto normalizado"""
+    if not text:
+        return set()
+    tokens = _TOKEN_RE.findall(strip_accents(str(text).lower()))
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+def _hash32(value: str) -> int:
+    # crc32 é estável entre execuções (ao contrário de hash()) e roda em C
+    return zlib.crc32(value.encode('utf-8'))
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Escolhe (bandas, linhas) que minimizam falsos positivos + falsos negativos"""
+    def area(f, start, end, steps=100):
+        step = (end - start) / steps
+        return sum(f(start + (i + 0.5) * step) for i in range(steps)) * step
+
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows == 0:
+            break
+        false_pos = area(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        false_neg = area(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        error = false_pos + false_neg
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+class MinHasher:
+    """Gera assinaturas MinHash de tamanho fixo para textos"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Assinatura MinHash (uint32[num_perm]) do texto"""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter((_hash32(g) for g in grams), dtype=np.uint64, count=len(grams))
+        # a < p e x < 2^32: o produto cabe em uint64, mas somado a b poderia
+        # passar de 2^64; reduzido mod p antes (< 2^32), a soma com b não estoura
+        permuted = (np.outer(hashes, self.a) % _PRIME + self.b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+def estimate_jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Similaridade de Jaccard estimada a partir de duas assinaturas"""
+    return float(np.count_nonzero(sig1 == sig2)) / len(sig1)
+
+class MinHashLSH:
+    """Índice LSH de assinaturas MinHash com limiar de Jaccard configurável"""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 3,
+                 seed: int = 1):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.buckets: List[Dict[Any, List[Hashable]]] = [defaultdict(list) for _ in range(self.bands)]
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray, block: Any = None) -> Iterable[Tuple[int, Any]]:
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, (block, signature[start:start + self.rows].tobytes())
+
+    def insert(self, key: Hashable, text: str = None, signature: Optional[np.ndarray] = None,
+               block: Any = None) -> np.ndarray:
+        """Indexa um documento; `block` restringe candidatos ao mesmo bloco (ex.: empresa+cidade)"""
+        if signature is None:
+            signature = self.hasher.signature(text)
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature, block):
+            self.buckets[band][band_key].append(key)
+        return signature
+
+    def query(self, text: str = None, signature: Optional[np.ndarray] = None,
+              block: Any = None) -> List[Tuple[Hashable, float]]:
+        """Documentos indexados com Jaccard estimado >= limiar, do mais similar ao menos"""
+        if signature is None:
+            signature = self.hasher.signature(text)
+        candidates = set()
+        for band, band_key in self._band_keys(signature, block):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        matches = []
+        for key in candidates:
+            similarity = estimate_jaccard(signature, self.signatures[key])
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda item: item[1], reverse=True)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.signatures)
@@ -9,13 +9,16 @@ import pandas as pd
 import json
 import re
 import logging
+import argparse
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-import hashlib
 from collections import Counter
 
+from dedup import Deduplicator, JOBDATA_FIELDS, jobdata_record
+from extraction_cache import ExtractionCache
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -89,8 +92,26 @@ class JobData:
     confidence: float
     parsed_at: str
 
+class JobRecord:
+    """Registro leve com os mesmos campos de JobData, usando __slots__ (sem __dict__ por instância)"""
+    __slots__ = tuple(JobData.__dataclass_fields__)
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+# Versão das regras de extração (faz parte da chave do cache de extração)
+EXTRACTOR_VERSION = '7.0'
+
+# Colunas do CSV usadas na normalização (na ordem esperada por normalize_values)
+CSV_COLUMNS = ['Título', 'URL', 'Descrição', 'Setor']
+
 class AdvancedVagasNormalizer:
-    def __init__(self):
+    def __init__(self, cache: Optional[ExtractionCache] = None):
+        self.cache = cache
         self.state_regions = {
             'AC': 'Norte', 'AL': 'Nordeste', 'AP': 'Norte', 'AM': 'Norte', 'BA': 'Nordeste',
             'CE': 'Nordeste', 'DF': 'Centro-Oeste', 'ES': 'Sudeste', 'GO': 'Centro-Oeste',
@@ -385,91 +406,122 @@ class AdvancedVagasNormalizer:
         
         return consolidated_data
 
+    def extract_description_data(self, description: str) -> Dict[str, Any]:
+        """Processa os segmentos da descrição, consultando o cache de extração se houver"""
+        if self.cache is None:
+            return self.process_description_segments(description)
+        return self.cache.get_or_extract(
+            description, 'normalize_vagas_to_json', EXTRACTOR_VERSION,
+            self.process_description_segments
+        )
+
     def normalize_job(self, row: pd.Series) -> JobData:
         """Normaliza uma linha de vaga para o formato estruturado"""
         try:
-            # Dados básicos
-            source_name = str(row.get('Título', '')).strip()
-            source_url = str(row.get('URL', '')).strip()
-            description = str(row.get('Descrição', '')).strip()
-            sector = str(row.get('Setor', '')).strip()
-            
-            # Processa descrição completa
-            desc_data = self.process_description_segments(description)
-            
-            # Extrai informações consolidadas
-            company_name = desc_data['companies'][0] if desc_data['companies'] else ""
-            
-            # Localização (pega a primeira válida)
-            location_city = ""
-            location_state = ""
-            location_region = ""
-            if desc_data['locations']:
-                loc = desc_data['locations'][0]
-                location_city = loc['city']
-                location_state = loc['state']
-                location_region = loc['region']
-            
-            # Salário (pega o primeiro válido)
-            salary_min = None
-            salary_max = None
-            if desc_data['salaries']:
-                sal = desc_data['salaries'][0]
-                salary_min = sal['min']
-                salary_max = sal['max']
-            
-            # Determina senioridade
-            seniority = self.determine_seniority(source_name, description)
-            
-            # Extrai tags
-            tags = self.extract_tags(description, sector)
-            
-            # Calcula confiança baseada na quantidade de dados extraídos
-            confidence = 0.3
-            if company_name: confidence += 0.2
-            if location_city: confidence += 0.2
-            if salary_min: confidence += 0.2
-            if desc_data['responsibilities']: confidence += 0.1
-            
-            return JobData(
-                title=source_name,
-                seniority=seniority,
-                area=sector,
-                company_name=company_name,
-                industry="",
-                employment_type=EmploymentType.CLT.value,
-                work_schedule="Não especificado",
-                modality=Modality.PRESENCIAL.value,
-                location_city=location_city,
-                location_state=location_state,
-                location_region=location_region,
-                salary_min=salary_min,
-                salary_max=salary_max,
-                salary_currency="BRL",
-                salary_period="month",
-                benefits=desc_data['benefits'][:10],
-                rewards=[],
-                requirements_must=desc_data['requirements'][:10],
-                requirements_nice=[],
-                education_level="Não especificado",
-                responsibilities=desc_data['responsibilities'][:10],
-                pcd=False,
-                tags=tags,
-                source_name=source_name,
-                source_url=source_url,
-                raw_excerpt=sector,
-                confidence=min(confidence, 1.0),
-                parsed_at=datetime.now().strftime('%Y-%m-%d')
-            )
-            
+            return JobData(**self.build_job_fields(
+                row.get('Título', ''), row.get('URL', ''),
+                row.get('Descrição', ''), row.get('Setor', '')
+            ))
         except Exception as e:
             logger.error(f"Erro ao normalizar vaga: {e}")
             return self.create_default_job(row)
 
+    def normalize_values(self, title: Any, url: Any, description: Any, sector: Any) -> JobRecord:
+        """Normaliza uma vaga a partir dos valores crus das colunas (caminho colunar)"""
+        try:
+            return JobRecord(**self.build_job_fields(title, url, description, sector))
+        except Exception as e:
+            logger.error(f"Erro ao normalizar vaga: {e}")
+            return JobRecord(**self.default_job_fields(title, url, sector))
+
+    def build_job_fields(self, title: Any, url: Any, description: Any, sector: Any) -> Dict[str, Any]:
+        """Extrai os campos estruturados de uma vaga"""
+        # Dados básicos
+        source_name = str(title).strip()
+        source_url = str(url).strip()
+        description = str(description).strip()
+        sector = str(sector).strip()
+        
+        # Processa descrição completa
+        desc_data = self.extract_description_data(description)
+        
+        # Extrai informações consolidadas
+        company_name = desc_data['companies'][0] if desc_data['companies'] else ""
+        
+        # Localização (pega a primeira válida)
+        location_city = ""
+        location_state = ""
+        location_region = ""
+        if desc_data['locations']:
+            loc = desc_data['locations'][0]
+            location_city = loc['city']
+            location_state = loc['state']
+            location_region = loc['region']
+        
+        # Salário (pega o primeiro válido)
+        salary_min = None
+        salary_max = None
+        if desc_data['salaries']:
+            sal = desc_data['salaries'][0]
+            salary_min = sal['min']
+            salary_max = sal['max']
+        
+        # Determina senioridade
+        seniority = self.determine_seniority(source_name, description)
+        
+        # Extrai tags
+        tags = self.extract_tags(description, sector)
+        
+        # Calcula confiança baseada na quantidade de dados extraídos
+        confidence = 0.3
+        if company_name: confidence += 0.2
+        if location_city: confidence += 0.2
+        if salary_min: confidence += 0.2
+        if desc_data['responsibilities']: confidence += 0.1
+        
+        return dict(
+            title=source_name,
+            seniority=seniority,
+            area=sector,
+            company_name=company_name,
+            industry="",
+            employment_type=EmploymentType.CLT.value,
+            work_schedule="Não especificado",
+            modality=Modality.PRESENCIAL.value,
+            location_city=location_city,
+            location_state=location_state,
+            location_region=location_region,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            salary_currency="BRL",
+            salary_period="month",
+            benefits=desc_data['benefits'][:10],
+            rewards=[],
+            requirements_must=desc_data['requirements'][:10],
+            requirements_nice=[],
+            education_level="Não especificado",
+            responsibilities=desc_data['responsibilities'][:10],
+            pcd=False,
+            tags=tags,
+            source_name=source_name,
+            source_url=source_url,
+            raw_excerpt=sector,
+            confidence=min(confidence, 1.0),
+            parsed_at=datetime.now().strftime('%Y-%m-%d')
+        )
+
     def create_default_job(self, row: pd.Series) -> JobData:
         """Cria uma vaga padrão em caso de erro"""
-        return JobData(
-            title=str(row.get('Título', 'Vaga sem título')),
+        return JobData(**self.default_job_fields(
+            row.get('Título', 'Vaga sem título'), row.get('URL', ''), row.get('Setor', ''),
+            source_name=row.get('Título', '')
+        ))
+
+    def default_job_fields(self, title: Any, url: Any, sector: Any,
+                           source_name: Any = None) -> Dict[str, Any]:
+        """Campos de uma vaga padrão (usados quando a extração falha)"""
+        return dict(
+            title=str(title),
             seniority=Seniority.NAO_ESPECIFICADO.value,
             area="",
             company_name="",
@@ -492,58 +544,59 @@ class AdvancedVagasNormalizer:
             responsibilities=[],
             pcd=False,
             tags=[],
-            source_name=str(row.get('Título', '')),
-            source_url=str(row.get('URL', '')),
-            raw_excerpt=str(row.get('Setor', '')),
+            source_name=str(title if source_name is None else source_name),
+            source_url=str(url),
+            raw_excerpt=str(sector),
             confidence=0.1,
             parsed_at=datetime.now().strftime('%Y-%m-%d')
         )
 
-    def remove_duplicates(self, jobs: List[JobData]) -> List[JobData]:
-        """Remove vagas duplicadas baseado em hash do conteúdo"""
-        seen_hashes = set()
-        unique_jobs = []
-        
-        for job in jobs:
-            # Cria hash baseado em título, empresa e localização
-            content = f"{job.title}_{job.company_name}_{job.location_city}"
-            job_hash = hashlib.md5(content.encode()).hexdigest()
-            
-            if job_hash not in seen_hashes:
-                seen_hashes.add(job_hash)
-                unique_jobs.append(job)
-        
-        return unique_jobs
+    def remove_duplicates(self, jobs: List[JobData], descriptions: Optional[List[Any]] = None) -> List[JobData]:
+        """Remove vagas duplicadas (regra única de dedup.py: empresa + setor + cidade + título + descrição)
+
+        descriptions traz o texto de origem de cada vaga, na mesma ordem de jobs;
+        sem ele, a comparação usa só os campos da vaga (descrição vazia).
+        """
+        if descriptions is None:
+            descriptions = [None] * len(jobs)
+        dedup = Deduplicator(JOBDATA_FIELDS)
+        return [job for job, description in zip(jobs, descriptions)
+                if not dedup.is_duplicate(jobdata_record(job, description))]
 
     def generate_statistics(self, jobs: List[JobData]) -> None:
         """Gera estatísticas dos dados processados"""
+        modalities = Counter([job.modality for job in jobs])
+        companies = Counter([job.company_name for job in jobs if job.company_name])
+        tags_counter = Counter()
+        for job in jobs:
+            tags_counter.update(job.tags)
+        self.log_statistics(len(jobs), modalities, companies, tags_counter)
+
+    def log_statistics(self, total: int, modalities: Counter, companies: Counter,
+                       tags_counter: Counter) -> None:
+        """Registra no log as estatísticas já agregadas"""
         logger.info("\n📊 ESTATÍSTICAS DOS DADOS PROCESSADOS")
         logger.info("=" * 50)
-        logger.info(f"📈 Total de vagas: {len(jobs)}")
+        logger.info(f"📈 Total de vagas: {total}")
+        if not total:
+            return
         
         # Estatísticas de modalidade
-        modalities = Counter([job.modality for job in jobs])
         logger.info("\n📊 Top 10 Modalidade:")
         for modality, count in modalities.most_common(10):
-            percentage = (count / len(jobs)) * 100
+            percentage = (count / total) * 100
             logger.info(f"   {modality}: {count} ({percentage:.1f}%)")
         
         # Estatísticas de empresas
-        companies = Counter([job.company_name for job in jobs if job.company_name])
         logger.info("\n📊 Top 10 Empresas:")
         for company, count in companies.most_common(10):
-            percentage = (count / len(jobs)) * 100
+            percentage = (count / total) * 100
             logger.info(f"   {company}: {count} ({percentage:.1f}%)")
         
         # Estatísticas de tags
-        all_tags = []
-        for job in jobs:
-            all_tags.extend(job.tags)
-        tags_counter = Counter(all_tags)
-        
         logger.info("\n🏷️ Top 15 Tags:")
         for tag, count in tags_counter.most_common(15):
-            percentage = (count / len(jobs)) * 100
+            percentage = (count / total) * 100
             logger.info(f"   {tag}: {count} ({percentage:.1f}%)")
 
     def process_csv(self, csv_path: str) -> None:
@@ -555,17 +608,19 @@ class AdvancedVagasNormalizer:
             
             # Processar vagas
             jobs = []
+            descriptions = []
             for i, (idx, row) in enumerate(df.iterrows()):
                 if (i + 1) % 5000 == 0:
                     logger.info(f"🔄 Processadas {i + 1} vagas...")
                 
                 job = self.normalize_job(row)
                 jobs.append(job)
+                descriptions.append(row.get('Descrição', ''))
             
             logger.info(f"✅ Total de vagas processadas: {len(jobs)}")
             
             # Remover duplicatas
-            unique_jobs = self.remove_duplicates(jobs)
+            unique_jobs = self.remove_duplicates(jobs, descriptions)
             logger.info(f"🔄 Vagas após remoção de duplicatas: {len(unique_jobs)}")
             
             # Gerar estatísticas
@@ -589,9 +644,85 @@ class AdvancedVagasNormalizer:
             logger.error(f"❌ Erro durante o processamento: {e}")
             raise
 
+    def process_csv_streaming(self, csv_path: str, output_file: str = 'vagas_normalizadas_avancado.jsonl',
+                              chunksize: int = 5000) -> int:
+        """Processa o CSV em blocos e grava JSONL incrementalmente.
+
+        Lê apenas as colunas necessárias, percorre os valores com itertuples
+        (sem criar um pd.Series por linha), remove duplicatas durante a leitura
+        e escreve cada vaga assim que é normalizada. A memória fica limitada ao
+        bloco atual mais os fingerprints de 64 bits das vagas únicas.
+        """
+        logger.info(f"📂 Processando {csv_path} em blocos de {chunksize} linhas")
+        
+        dedup = Deduplicator(JOBDATA_FIELDS)
+        modalities = Counter()
+        companies = Counter()
+        tags_counter = Counter()
+        total = 0
+        written = 0
+        
+        reader = pd.read_csv(
+            csv_path, encoding='utf-8', chunksize=chunksize, dtype=str,
+            usecols=lambda col: col in CSV_COLUMNS
+        )
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for chunk in reader:
+                # Colunas ausentes viram '' (mesmo comportamento de row.get(col, ''))
+                chunk = chunk.reindex(columns=CSV_COLUMNS, fill_value='')
+                lines = []
+                for title, url, description, sector in chunk.itertuples(index=False, name=None):
+                    total += 1
+                    job = self.normalize_values(title, url, description, sector)
+                    
+                    if dedup.is_duplicate(jobdata_record(job, description)):
+                        continue
+                    
+                    modalities[job.modality] += 1
+                    if job.company_name:
+                        companies[job.company_name] += 1
+                    tags_counter.update(job.tags)
+                    
+                    lines.append(json.dumps(job.to_dict(), ensure_ascii=False))
+                
+                if lines:
+                    f.write('\n'.join(lines) + '\n')
+                    written += len(lines)
+                logger.info(f"🔄 Processadas {total} vagas ({written} únicas)...")
+        
+        logger.info(f"✅ Total de vagas processadas: {total}")
+        logger.info(f"🔄 Vagas após remoção de duplicatas: {written}")
+        self.log_statistics(written, modalities, companies, tags_counter)
+        logger.info(f"📁 Arquivo gerado: {output_file}")
+        
+        return written
+
 def main():
-    normalizer = AdvancedVagasNormalizer()
-    normalizer.process_csv('vagas_todos_setores_1_pagina.csv')
+    parser = argparse.ArgumentParser(description='Normalizador de Vagas para JSON')
+    parser.add_argument('csv_path', nargs='?', default='vagas_todos_setores_1_pagina.csv',
+                        help='Arquivo CSV de entrada')
+    parser.add_argument('--stream', action='store_true',
+                        help='Processa em blocos e grava JSONL (memória limitada)')
+    parser.add_argument('--output', default='vagas_normalizadas_avancado.jsonl',
+                        help='Arquivo JSONL de saída (apenas com --stream)')
+    parser.add_argument('--chunksize', type=int, default=5000,
+                        help='Linhas por bloco (apenas com --stream)')
+    parser.add_argument('--cache', metavar='ARQUIVO',
+                        help='Cache SQLite de extração (reaproveita descrições já processadas)')
+    args = parser.parse_args()
+    
+    cache = ExtractionCache(args.cache) if args.cache else None
+    normalizer = AdvancedVagasNormalizer(cache=cache)
+    try:
+        if args.stream:
+            normalizer.process_csv_streaming(args.csv_path, args.output, args.chunksize)
+        else:
+            normalizer.process_csv(args.csv_path)
+    finally:
+        if cache:
+            logger.info(f"🗃️ Cache de extração: {cache.stats()}")
+            cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
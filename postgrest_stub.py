@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor local compatível com o PostgREST, para os testes dos uploaders
+- Tabelas em memória (dict de listas), ids sequenciais por tabela
+- GET com select, order (com nullsfirst/nullslast), limit/offset, cabeçalho
+  Range e os filtros eq/neq/in/ilike/gt/gte/lt/lte/is usados pelos scripts,
+  também dentro de or=(...) / and(...)
+- POST (insert e upsert com on_conflict + Prefer: resolution=merge-duplicates),
+  PATCH e DELETE
+- Falhas injetáveis: linhas com um título em fail_titles devolvem 400 e
+  status_queue devolve os próximos códigos HTTP pedidos (ex.: 503) nos POSTs,
+  com corpo em texto, como um proxy/gateway na frente do PostgREST
+
+Não é um banco: serve só para verificar localmente quantas requisições e
+quais linhas os uploaders enviam.
+
+Uso:
+  server = PostgRESTStub()
+  client = create_client(server.url, STUB_KEY)
+  ...
+  server.stop()
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlparse
+
+# JWT qualquer (o cliente só valida o formato)
+STUB_KEY = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.c2ln'
+
+RESERVED_PARAMS = ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns')
+
+def _cast(value: str, sample: Any) -> Any:
+    if isinstance(sample, bool):
+        return value == 'true'
+    if isinstance(sample, (int, float)):
+        return type(sample)(value)
+    return value
+
+def _split(text: str) -> List[str]:
+    """Separa 'a.eq.1,and(b.eq.2,c.lt."x,y")' pelas vírgulas de fora dos parênteses e aspas"""
+    parts, depth, quoted, escaped, current = [], 0, False, False, ''
+    for char in text:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted and char in '()':
+            depth += 1 if char == '(' else -1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    return parts + [current]
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+def _logic(row: Dict[str, Any], op: str, conditions: str) -> bool:
+    results = (_condition(row, condition) for condition in _split(conditions[1:-1]))
+    return any(results) if op == 'or' else all(results)
+
+def _condition(row: Dict[str, Any], text: str) -> bool:
+    for op in ('and', 'or'):
+        if text.startswith(op + '('):
+            return _logic(row, op, text[len(op):])
+    column, _, expression = text.partition('.')
+    return _matches(row, column, expression)
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    op, _, value = expression.partition('.')
+    value = _unquote(value)
+    current = row.get(column)
+    if op == 'is':
+        return current is None if value == 'null' else str(current).lower() == value
+    if op == 'in':
+        values = {item.strip().strip('"') for item in value.strip('()').split(',')}
+        return str(current) in values
+    if op == 'ilike':
+        pattern = value.replace('*', '%').strip('%').lower()
+        return pattern in str(current or '').lower()
+    if op in ('eq', 'neq'):
+        return (str(current) == value) == (op == 'eq')
+    if current is None:
+        return False
+    value = _cast(value, current)
+    return {'gt': current > value, 'gte': current >= value,
+            'lt': current < value, 'lte': current <= value}[op]
+
+def _filter(rows: List[Dict[str, Any]], params) -> List[Dict[str, Any]]:
+    for column, expression in params:
+        if column in ('or', 'and'):
+            rows = [row for row in rows if _logic(row, column, expression)]
+        elif column not in RESERVED_PARAMS:
+            rows = [row for row in rows if _matches(row, column, expression)]
+    return rows
+
+class PostgRESTStub:
+    """Servidor em uma thread; as tabelas ficam em self.tables"""
+
+    def __init__(self, port: int = 0):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.requests: List[tuple] = []
+        self.fail_titles = set()
+        self.status_queue: List[int] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, method: str, table: str) -> int:
+        return sum(1 for request in self.requests if request == (method, table))
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: Any, headers: Dict[str, str] = None) -> None:
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _parse(self):
+                url = urlparse(self.path)
+                table = url.path.rsplit('/', 1)[-1]
+                with stub.lock:
+                    stub.requests.append((self.command, table))
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                return table, parse_qsl(url.query), body
+
+            def do_GET(self):
+                table, params, _ = self._parse()
+                with stub.lock:
+                    rows = _filter(stub.tables.get(table, []), params)
+                options = dict(params)
+                for part in reversed(options.get('order', '').split(',')):
+                    if part:
+                        column, *modifiers = part.split('.')
+                        desc = 'desc' in modifiers
+                        # Como no Postgres: NULL no fim em asc e no começo em desc
+                        nulls_last = 'nullslast' in modifiers or (not desc and 'nullsfirst' not in modifiers)
+                        present = sorted((r for r in rows if r.get(column) is not None),
+                                         key=lambda r: r[column], reverse=desc)
+                        nulls = [r for r in rows if r.get(column) is None]
+                        rows = present + nulls if nulls_last else nulls + present
+                offset = int(options.get('offset', 0))
+                limit = options.get('limit')
+                if self.headers.get('Range'):
+                    first, last = self.headers['Range'].split('-')
+                    offset, limit = int(first), int(last) - int(first) + 1
+                total = len(rows)
+                rows = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+                select = options.get('select', '*')
+                if select != '*':
+                    columns = [column.strip() for column in select.split(',')]
+                    rows = [{column: row.get(column) for column in columns} for row in rows]
+                self._send(200, rows, {'Content-Range': f'{offset}-{offset + len(rows) - 1}/{total}'})
+
+            def do_POST(self):
+                table, params, body = self._parse()
+                if stub.status_queue:
+                    status = stub.status_queue.pop(0)
+                    if status >= 300:
+                        data = f'erro {status} simulado'.encode('utf-8')
+                        self.send_response(status)
+                        self.send_header('Content-Type', 'text/plain')
+                        self.send_header('Content-Length', str(len(data)))
+                        self.end_headers()
+                        self.wfile.write(data)
+                        return
+                rows = body if isinstance(body, list) else [body]
+                if len({tuple(sorted(row)) for row in rows}) > 1:
+                    return self._send(400, {'message': 'All object keys must match', 'code': 'PGRST102'})
+                for row in rows:
+                    if row.get('title') in stub.fail_titles:
+                        return self._send(400, {'message': f"linha inválida: {row.get('title')}", 'code': '22P02'})
+                conflict = dict(params).get('on_conflict')
+                merge = 'merge-duplicates' in (self.headers.get('Prefer') or '')
+                saved = []
+                with stub.lock:
+                    stored = stub.tables.setdefault(table, [])
+                    for row in rows:
+                        existing = None
+                        if merge and conflict:
+                            keys = conflict.split(',')
+                            existing = next((r for r in stored if all(r.get(k) == row.get(k) for k in keys)), None)
+                        if existing is not None:
+                            existing.update(row)
+                            saved.append(dict(existing))
+                            continue
+                        new = dict(row)
+                        if 'id' not in new:
+                            # Como um serial: depois do maior id da tabela (inclusive os pré-carregados)
+                            new['id'] = max((r.get('id') or 0 for r in stored), default=0) + 1
+                        stored.append(new)
+                        saved.append(dict(new))
+                self._send(201, saved)
+
+            def do_PATCH(self):
+                table, params, body = self._parse()
+                with stub.lock:
+                    rows = _filter(stub.tables.get(table, []), params)
+                    for row in rows:
+                        row.update(body or {})
+                self._send(200, rows)
+
+            def do_DELETE(self):
+                table, params, _ = self._parse()
+                with stub.lock:
+                    rows = _filter(stub.tables.get(table, []), params)
+                    removed = {id(row) for row in rows}
+                    stub.tables[table] = [row for row in stub.tables.get(table, []) if id(row) not in removed]
+                self._send(200, rows)
+
+        return Handler
@@ -1,3 +1,4 @@
+import argparse
 import json
 import hashlib
 from supabase import create_client, Client
@@ -5,6 +6,9 @@ import os
 from typing import Dict, List, Optional, Set
 from dotenv import load_dotenv
 
+from differential_sync import sync_table
+from response_cache import invalidate_api_cache
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -340,6 +344,24 @@ def upload_jobs_in_batches(supabase: Client, jobs: List[Dict], batch_size: int =
     
     return uploaded_count, failed_count, duplicates_skipped
 
+def sync_vagas(supabase: Client, jobs: List[Dict], dry_run: bool = False, delete_missing: bool = False,
+               force_delete: bool = False) -> Dict[str, int]:
+    """Sincroniza a tabela vagas enviando só vagas novas/alteradas (e, com
+    delete_missing, apagando as que sumiram do arquivo)"""
+    mapped = []
+    failed_count = 0
+    for job in jobs:
+        try:
+            mapped.append(map_job_to_vagas_format(job))
+        except Exception as e:
+            print(f"Erro ao processar vaga: {e}")
+            failed_count += 1
+    
+    stats = sync_table(supabase, 'vagas', mapped, batch_size=100, dry_run=dry_run, load_errors=failed_count,
+                       delete_missing=delete_missing, force_delete=force_delete)
+    stats['failed'] += failed_count
+    return stats
+
 def verify_upload(supabase: Client) -> int:
     """Verifica quantas vagas foram inseridas"""
     try:
@@ -353,19 +375,30 @@ def verify_upload(supabase: Client) -> int:
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Processamento melhorado de vagas para a tabela vagas')
+    parser.add_argument('file_path', nargs='?', default='vagas_todos_setores_estruturadas_completo.jsonl')
+    parser.add_argument('--sync', action='store_true',
+                        help='Sincronização diferencial por external_id em vez de limpar a tabela')
+    parser.add_argument('--dry-run', action='store_true', help='Com --sync, só mostra o que mudaria')
+    parser.add_argument('--delete-missing', action='store_true',
+                        help='Com --sync, apaga as vagas que não estão no arquivo')
+    parser.add_argument('--force-delete', action='store_true',
+                        help='Com --delete-missing, apaga mesmo acima do limite de segurança')
+    args = parser.parse_args()
+    
     print("=== Processamento Melhorado de Vagas ===")
     
     # Conectar ao Supabase
     supabase = connect_supabase()
     print("Conectado ao Supabase")
     
-    # Limpar tabela
-    if not clear_vagas_table(supabase):
+    # Limpar tabela (só na carga completa)
+    if not args.sync and not clear_vagas_table(supabase):
         print("Falha ao limpar tabela. Abortando.")
         return
     
     # Carregar vagas
-    file_path = "vagas_todos_setores_estruturadas_completo.jsonl"
+    file_path = args.file_path
     jobs = load_jobs_from_jsonl(file_path)
     
     if not jobs:
@@ -374,11 +407,24 @@ def main():
     
     print(f"Processando {len(jobs)} vagas...")
     
+    if args.sync:
+        stats = sync_vagas(supabase, jobs, dry_run=args.dry_run, delete_missing=args.delete_missing,
+                           force_delete=args.force_delete)
+        print("\n=== RELATÓRIO DA SINCRONIZAÇÃO ===")
+        print(f"Vagas processadas: {len(jobs)}")
+        print(f"Novas: {stats['inserted']} | Alteradas: {stats['updated']} | "
+              f"Inalteradas: {stats['unchanged']} | Removidas: {stats['deleted']} | Falhas: {stats['failed']}")
+        verify_upload(supabase)
+        if not args.dry_run:
+            invalidate_api_cache()
+        return
+    
     # Upload em lotes
     uploaded, failed, duplicates = upload_jobs_in_batches(supabase, jobs)
     
     # Verificar resultado
     final_count = verify_upload(supabase)
+    invalidate_api_cache()
     
     # Relatório final
     print("\n=== RELATÓRIO FINAL ===")
@@ -2,110 +2,182 @@
 # -*- coding: utf-8 -*-
 """
 Script para remover duplicatas das vagas
-Critérios de duplicação:
-- Empresa principal + setor + cidade + descrição similar
-- Título similar + empresa + localização
+Critérios de duplicação (regra única de dedup.py):
+- Empresa principal + setor + cidade + título + descrição iguais (fingerprint)
+- Mesma empresa + setor + cidade com descrição ou título similar
+  (SequenceMatcher no método difflib, MinHash/LSH no método minhash)
 """
 
 import json
-import hashlib
+import argparse
 from collections import defaultdict
 from difflib import SequenceMatcher
 
+from dedup import Deduplicator, ESTRUTURADA_FIELDS, block_key, content_text, get_field, normalize_field
+from fingerprint_store import FingerprintStore, STATUS_NEW, STATUS_EXACT, STATUS_NEAR
+
 def similarity(a, b):
     """Calcula similaridade entre duas strings"""
     return SequenceMatcher(None, a, b).ratio()
 
-def normalize_text(text):
-    """Normaliza texto para comparação"""
-    if not text:
-        return ""
-    return text.lower().strip().replace("  ", " ")
-
-def create_job_signature(vaga):
-    """Cria assinatura única para a vaga"""
-    empresa = normalize_text(vaga.get('informacoes_basicas', {}).get('empresa_principal', ''))
-    setor = normalize_text(vaga.get('informacoes_basicas', {}).get('setor', ''))
-    cidade = normalize_text(vaga.get('localizacao', {}).get('cidade_extraida', ''))
-    titulo = normalize_text(vaga.get('informacoes_basicas', {}).get('fonte', ''))
-    
-    # Cria hash da descrição para comparação rápida
-    descricao = normalize_text(vaga.get('descricao_completa', {}).get('texto_completo', ''))
-    descricao_hash = hashlib.md5(descricao.encode()).hexdigest()[:8] if descricao else ""
-    
-    return f"{empresa}|{setor}|{cidade}|{titulo}|{descricao_hash}"
+def _field(vaga, name):
+    """Campo canônico normalizado pela regra de dedup.py (sem acento, minúsculo)"""
+    return normalize_field(get_field(vaga, ESTRUTURADA_FIELDS[name]))
 
 def is_duplicate(vaga1, vaga2, threshold=0.85):
     """Verifica se duas vagas são duplicatas"""
     # Critério 1: Empresa + setor + cidade iguais
-    empresa1 = normalize_text(vaga1.get('informacoes_basicas', {}).get('empresa_principal', ''))
-    empresa2 = normalize_text(vaga2.get('informacoes_basicas', {}).get('empresa_principal', ''))
-    
-    setor1 = normalize_text(vaga1.get('informacoes_basicas', {}).get('setor', ''))
-    setor2 = normalize_text(vaga2.get('informacoes_basicas', {}).get('setor', ''))
-    
-    cidade1 = normalize_text(vaga1.get('localizacao', {}).get('cidade_extraida', ''))
-    cidade2 = normalize_text(vaga2.get('localizacao', {}).get('cidade_extraida', ''))
-    
-    if empresa1 == empresa2 and setor1 == setor2 and cidade1 == cidade2:
-        # Se empresa, setor e cidade são iguais, verifica similaridade da descrição
-        desc1 = normalize_text(vaga1.get('descricao_completa', {}).get('texto_completo', ''))
-        desc2 = normalize_text(vaga2.get('descricao_completa', {}).get('texto_completo', ''))
-        
-        if desc1 and desc2 and similarity(desc1, desc2) > threshold:
-            return True
-            
-        # Ou se títulos são muito similares
-        titulo1 = normalize_text(vaga1.get('informacoes_basicas', {}).get('fonte', ''))
-        titulo2 = normalize_text(vaga2.get('informacoes_basicas', {}).get('fonte', ''))
-        
-        if titulo1 and titulo2 and similarity(titulo1, titulo2) > threshold:
-            return True
-    
-    return False
+    if create_block_key(vaga1) != create_block_key(vaga2):
+        return False
+    
+    # Se empresa, setor e cidade são iguais, verifica similaridade da descrição
+    desc1 = _field(vaga1, 'description')
+    desc2 = _field(vaga2, 'description')
+    if desc1 and desc2 and similarity(desc1, desc2) > threshold:
+        return True
+    
+    # Ou se títulos são muito similares
+    titulo1 = _field(vaga1, 'title')
+    titulo2 = _field(vaga2, 'title')
+    return bool(titulo1 and titulo2 and similarity(titulo1, titulo2) > threshold)
 
-def remove_duplicates(vagas):
-    """Remove duplicatas da lista de vagas"""
-    print(f"Processando {len(vagas)} vagas...")
+def remove_duplicates(vagas, threshold=0.85):
+    """Remove duplicatas com a regra única de dedup.py mais a comparação difflib.
     
-    # Agrupa vagas por assinatura para comparação rápida
-    signature_groups = defaultdict(list)
-    for vaga in vagas:
-        signature = create_job_signature(vaga)
-        signature_groups[signature].append(vaga)
+    Duplicatas exatas (bloco + título + descrição) saem pelo fingerprint do
+    Deduplicator; as demais vagas são comparadas par a par (SequenceMatcher)
+    só com as vagas já mantidas do mesmo bloco (empresa + setor + cidade).
+    """
+    print(f"Processando {len(vagas)} vagas...")
     
+    dedup = Deduplicator(ESTRUTURADA_FIELDS)
+    blocks = defaultdict(list)
     unique_vagas = []
     duplicates_found = 0
     
-    # Processa cada grupo de assinaturas
-    for signature, group_vagas in signature_groups.items():
-        if len(group_vagas) == 1:
-            unique_vagas.extend(group_vagas)
-        else:
-            # Dentro do grupo, remove duplicatas mais refinadas
-            group_unique = []
-            for vaga in group_vagas:
-                is_dup = False
-                for unique_vaga in group_unique:
-                    if is_duplicate(vaga, unique_vaga):
-                        is_dup = True
-                        duplicates_found += 1
-                        print(f"Duplicata encontrada: ID {vaga.get('id')} similar a ID {unique_vaga.get('id')}")
-                        break
-                
-                if not is_dup:
-                    group_unique.append(vaga)
-            
-            unique_vagas.extend(group_unique)
+    for index, vaga in enumerate(vagas):
+        status, match = dedup.check(vaga, index)
+        if status == STATUS_NEW:
+            group = blocks[dedup.block_key(vaga)]
+            match = next((other for other in group if is_duplicate(vaga, vagas[other], threshold)), None)
+            if match is None:
+                group.append(index)
+                unique_vagas.append(vaga)
+                continue
+        duplicates_found += 1
+        print(f"Duplicata encontrada: ID {vaga.get('id')} similar a ID {vagas[match].get('id')}")
     
     print(f"Duplicatas removidas: {duplicates_found}")
     print(f"Vagas únicas restantes: {len(unique_vagas)}")
     
     return unique_vagas
 
+def create_block_key(vaga):
+    """Chave de bloco: empresa + setor + cidade (sem hash da descrição)"""
+    return block_key(vaga, ESTRUTURADA_FIELDS)
+
+def dedup_text(vaga):
+    """Texto usado na comparação de conteúdo: descrição normalizada ou, sem ela, o título"""
+    return content_text(vaga, ESTRUTURADA_FIELDS)
+
+def remove_duplicates_minhash(vagas, threshold=0.85, num_perm=128, verbose=True):
+    """Remove duplicatas com a regra única de dedup.py mais o estágio MinHash + LSH.
+    
+    Mantém o critério de bloco (empresa + setor + cidade) de is_duplicate, mas
+    compara descrições com redação ligeiramente diferente, que a assinatura com
+    hash MD5 separava em grupos distintos. Vagas sem descrição usam o título.
+    """
+    if verbose:
+        print(f"Processando {len(vagas)} vagas (MinHash/LSH, Jaccard >= {threshold})...")
+    
+    dedup = Deduplicator(ESTRUTURADA_FIELDS, fuzzy_threshold=threshold, num_perm=num_perm)
+    unique_vagas = []
+    
+    for index, vaga in enumerate(vagas):
+        status, match = dedup.check(vaga, index)
+        if status == STATUS_NEW:
+            unique_vagas.append(vaga)
+        elif verbose:
+            print(f"Duplicata encontrada: ID {vaga.get('id')} similar a ID {vagas[match].get('id')} ({status})")
+    
+    if verbose:
+        print(f"Duplicatas removidas: {len(vagas) - len(unique_vagas)}")
+        print(f"Vagas únicas restantes: {len(unique_vagas)}")
+    
+    return unique_vagas
+
+def stream_dedup(input_file, output_file, store, report_file=None):
+    """Classifica um lote JSONL contra o armazém persistente de fingerprints.
+    
+    Lê uma vaga por vez: as novas são gravadas em output_file e registradas no
+    armazém (também valem para as próximas vagas do mesmo lote); duplicatas
+    exatas e quase-duplicatas de vagas já vistas, hoje ou em execuções
+    anteriores, são descartadas. report_file recebe uma linha por vaga com o
+    status e o ID da vaga correspondente.
+    """
+    counts = {STATUS_NEW: 0, STATUS_EXACT: 0, STATUS_NEAR: 0}
+    report = open(report_file, 'w', encoding='utf-8') if report_file else None
+    try:
+        with open(input_file, 'r', encoding='utf-8') as fin, \
+                open(output_file, 'w', encoding='utf-8') as fout:
+            for line in fin:
+                if not line.strip():
+                    continue
+                vaga = json.loads(line)
+                texto = dedup_text(vaga)
+                if texto:
+                    status, match_id = store.classify(texto, create_block_key(vaga), vaga.get('id'))
+                else:
+                    status, match_id = STATUS_NEW, None
+                counts[status] += 1
+                
+                if status == STATUS_NEW:
+                    fout.write(json.dumps(vaga, ensure_ascii=False) + '\n')
+                if report:
+                    report.write(json.dumps(
+                        {'id': vaga.get('id'), 'status': status, 'match_id': match_id},
+                        ensure_ascii=False
+                    ) + '\n')
+        store.commit()
+    finally:
+        if report:
+            report.close()
+    
+    return counts
+
 def main():
-    input_file = 'vagas_todos_setores_estruturadas_corrigidas_completo.jsonl'
-    output_file = 'vagas_todos_setores_sem_duplicatas.jsonl'
+    parser = argparse.ArgumentParser(description='Remove vagas duplicadas de um JSONL')
+    parser.add_argument('--input', default='vagas_todos_setores_estruturadas_corrigidas_completo.jsonl',
+                        help='Arquivo JSONL de entrada')
+    parser.add_argument('--output', default='vagas_todos_setores_sem_duplicatas.jsonl',
+                        help='Arquivo JSONL de saída')
+    parser.add_argument('--method', choices=['difflib', 'minhash'], default='difflib',
+                        help='difflib: comparação par a par por bloco; minhash: MinHash + LSH')
+    parser.add_argument('--threshold', type=float, default=0.85,
+                        help='Limiar de similaridade (SequenceMatcher no difflib, Jaccard no minhash)')
+    parser.add_argument('--store', metavar='ARQUIVO',
+                        help='Modo incremental: classifica o lote contra o armazém SimHash persistente')
+    parser.add_argument('--max-distance', type=int,
+                        help='Distância de Hamming máxima para quase-duplicata (modo --store; '
+                             'padrão: a do armazém existente ou 6)')
+    parser.add_argument('--report', metavar='ARQUIVO',
+                        help='JSONL com o status de cada vaga (modo --store)')
+    args = parser.parse_args()
+    
+    input_file = args.input
+    output_file = args.output
+    
+    if args.store:
+        with FingerprintStore(args.store, max_distance=args.max_distance) as store:
+            counts = stream_dedup(input_file, output_file, store, args.report)
+            total_store = len(store)
+        print("\n=== DEDUPLICAÇÃO INCREMENTAL ===")
+        print(f"Novas: {counts[STATUS_NEW]}")
+        print(f"Duplicatas exatas: {counts[STATUS_EXACT]}")
+        print(f"Quase-duplicatas: {counts[STATUS_NEAR]}")
+        print(f"Fingerprints no armazém: {total_store}")
+        print(f"Arquivo salvo: {output_file}")
+        return
     
     print("Carregando dados...")
     vagas = []
@@ -117,7 +189,10 @@ def main():
     print(f"Total de vagas carregadas: {len(vagas)}")
     
     # Remove duplicatas
-    unique_vagas = remove_duplicates(vagas)
+    if args.method == 'minhash':
+        unique_vagas = remove_duplicates_minhash(vagas, threshold=args.threshold)
+    else:
+        unique_vagas = remove_duplicates(vagas, threshold=args.threshold)
     
     # Reordena IDs
     for i, vaga in enumerate(unique_vagas, 1):
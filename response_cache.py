@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de respostas da API (LRU + TTL em memória, Redis opcional)
+- ResponseCache: chave = endpoint + parâmetros normalizados; cada entrada
+  expira após ttl segundos e as menos usadas saem quando o cache enche
+- Com CACHE_REDIS_URL (e o pacote redis instalado) os workers do gunicorn
+  compartilham as respostas e a invalidação, feita por um contador de
+  geração no Redis: invalidar não precisa apagar chave por chave
+- invalidate_api_cache(): chamado pelos uploaders ao fim de uma carga
+- Sem Redis, a invalidação vale só para o worker que recebe o POST: com vários
+  workers (WEB_CONCURRENCY > 1) os demais seguem com as respostas e os
+  agregados antigos até o TTL/idade máxima. from_env() avisa nesse caso
+
+Variáveis de ambiente:
+  API_CACHE_TTL              validade das respostas em segundos (padrão 300)
+  API_CACHE_SIZE             entradas em memória por worker (padrão 256)
+  CACHE_REDIS_URL            Redis compartilhado (necessário com vários workers)
+  WEB_CONCURRENCY            workers do gunicorn/uvicorn (só para o aviso acima)
+  API_CACHE_INVALIDATE_URL   POST /cache/invalidate da API (opcional, sem Redis)
+  API_CACHE_TOKEN            token exigido por /cache/invalidate e /cache/stats
+
+Uso:
+  response_cache = ResponseCache.from_env()
+
+  @app.get("/jobs")
+  @response_cache.cached("jobs")
+  async def get_jobs(limit: int = 50): ...
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+DEFAULT_TTL = 300
+DEFAULT_MAXSIZE = 256
+NAMESPACE = 'api-vagas-cache'
+
+# Com Redis, a geração compartilhada é relida no máximo a cada intervalo
+GENERATION_CHECK_INTERVAL = 1.0
+
+def _connect_redis(redis_url: Optional[str]):
+    if not redis_url:
+        return None
+    if redis is None:
+        print("⚠️ CACHE_REDIS_URL definido, mas o pacote redis não está instalado; usando só o cache local")
+        return None
+    return redis.Redis.from_url(redis_url, socket_timeout=1)
+
+class ResponseCache:
+    """Cache LRU com TTL das respostas dos endpoints, com Redis opcional"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL,
+                 redis_url: Optional[str] = None, namespace: str = NAMESPACE):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.namespace = namespace
+        self.redis = _connect_redis(redis_url)
+        self.entries: 'OrderedDict[str, Tuple[float, int, Any]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self._generation_checked = 0.0
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCache':
+        cache = cls(
+            maxsize=int(os.getenv('API_CACHE_SIZE', DEFAULT_MAXSIZE)),
+            ttl=float(os.getenv('API_CACHE_TTL', DEFAULT_TTL)),
+            redis_url=os.getenv('CACHE_REDIS_URL'),
+        )
+        workers = os.getenv('WEB_CONCURRENCY', '1')
+        if cache.redis is None and workers.isdigit() and int(workers) > 1:
+            print(f"⚠️ {workers} workers sem CACHE_REDIS_URL: a invalidação do cache só vale para o "
+                  f"worker que recebe o POST; os demais ficam com dados antigos até o TTL")
+        return cache
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Endpoint + parâmetros sem vazios, com espaços removidos e em ordem fixa"""
+        normalized = {
+            name: value.strip() if isinstance(value, str) else value
+            for name, value in params.items()
+            if value is not None and not (isinstance(value, str) and not value.strip())
+        }
+        return f"{endpoint}?{json.dumps(normalized, sort_keys=True, default=str)}"
+
+    # ------------------------------------------------------------ geração
+    @property
+    def _generation_key(self) -> str:
+        return f"{self.namespace}:generation"
+
+    def _shared_key(self, key: str, generation: int) -> str:
+        return f"{self.namespace}:{generation}:{key}"
+
+    def current_generation(self) -> int:
+        if self.redis is None:
+            return self.generation
+        now = time.monotonic()
+        if now - self._generation_checked >= GENERATION_CHECK_INTERVAL:
+            try:
+                self.generation = int(self.redis.get(self._generation_key) or 0)
+                self._generation_checked = now
+            except Exception as e:
+                print(f"⚠️ Redis indisponível para o cache: {e}")
+        return self.generation
+
+    # --------------------------------------------------------------- API
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(encontrado, valor) — primeiro em memória, depois no Redis"""
+        generation = self.current_generation()
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, entry_generation, value = entry
+                if expires_at > now and entry_generation == generation:
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return True, value
+                del self.entries[key]
+
+        if self.redis is not None:
+            try:
+                payload = self.redis.get(self._shared_key(key, generation))
+            except Exception as e:
+                print(f"⚠️ Erro ao ler o cache no Redis: {e}")
+                payload = None
+            if payload is not None:
+                value = json.loads(payload)
+                self._store_local(key, generation, value)
+                self.stats['shared_hits'] += 1
+                return True, value
+
+        return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        generation = self.current_generation()
+        self._store_local(key, generation, value)
+        if self.redis is not None:
+            try:
+                self.redis.setex(self._shared_key(key, generation), max(1, int(self.ttl)),
+                                 json.dumps(value, ensure_ascii=False))
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar o cache no Redis: {e}")
+
+    def _store_local(self, key: str, generation: int, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, generation, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Descarta todas as respostas (em todos os workers, se houver Redis)"""
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+        if self.redis is not None:
+            try:
+                self.generation = int(self.redis.incr(self._generation_key))
+                self._generation_checked = time.monotonic()
+            except Exception as e:
+                print(f"⚠️ Erro ao invalidar o cache no Redis: {e}")
+        self.stats['invalidations'] += 1
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'entries': len(self.entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'shared': self.redis is not None,
+            'generation': self.generation,
+        }
+
+    def cached(self, endpoint: str) -> Callable:
+        """Decorador de endpoints async: a resposta é guardada já serializável em JSON"""
+        from fastapi.encoders import jsonable_encoder
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = self.make_key(endpoint, kwargs)
+                found, value = self.get(key)
+                if found:
+                    return value
+                # Requisições simultâneas da mesma chave esperam uma única consulta
+                lock = self._key_locks.setdefault(key, asyncio.Lock())
+                try:
+                    async with lock:
+                        found, value = self.get(key)
+                        if found:
+                            return value
+                        self.stats['misses'] += 1
+                        value = jsonable_encoder(await func(*args, **kwargs))
+                        self.set(key, value)
+                        return value
+                finally:
+                    if not lock.locked():
+                        self._key_locks.pop(key, None)
+            return wrapper
+        return decorator
+
+def invalidate_api_cache(redis_url: Optional[str] = None, invalidate_url: Optional[str] = None,
+                         token: Optional[str] = None) -> bool:
+    """Invalida o cache da API após uma carga (via Redis e/ou POST /cache/invalidate)"""
+    redis_url = redis_url or os.getenv('CACHE_REDIS_URL')
+    invalidate_url = invalidate_url or os.getenv('API_CACHE_INVALIDATE_URL')
+    token = token or os.getenv('API_CACHE_TOKEN')
+    invalidated = False
+
+    client = _connect_redis(redis_url)
+    if client is not None:
+        try:
+            client.incr(f"{NAMESPACE}:generation")
+            invalidated = True
+        except Exception as e:
+            print(f"⚠️ Erro ao invalidar o cache da API no Redis: {e}")
+
+    if invalidate_url:
+        try:
+            response = requests.post(invalidate_url, headers={'X-Cache-Token': token or ''}, timeout=10)
+            response.raise_for_status()
+            invalidated = True
+        except Exception as e:
+            print(f"⚠️ Erro ao chamar {invalidate_url}: {e}")
+
+    if invalidated:
+        print("🧹 Cache da API invalidado")
+    else:
+        print(f"ℹ️ Cache da API não invalidado (sem CACHE_REDIS_URL/API_CACHE_INVALIDATE_URL); "
+              f"as respostas expiram pelo TTL")
+    return invalidated
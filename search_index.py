@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Busca de vagas por índice invertido em memória (sem ilike '%termo%' no banco)
+- InvertedIndex: campo -> termo -> {id: frequência}, com termos sem acento e em
+  minúsculas; filtros por campo viram interseção das listas de ids (cada
+  palavra do filtro casa termos que começam com ela, como o ilike fazia) e a
+  busca livre é ordenada por BM25 sobre os campos de texto
+- SearchIndexRefresher: carrega a tabela inteira por id na subida da API e, em
+  segundo plano, acrescenta as vagas novas (id > maior id visto) a cada
+  poll_interval; reconstrói tudo quando o cache é invalidado (nova carga) ou
+  após max_age segundos, o que cobre vagas alteradas e removidas
+
+O índice guarda só ids e termos: a página de resultados é lida do banco pela
+chave primária (id=in.(...)).
+
+Uso:
+  index = SearchIndexRefresher(supabase, "vagas", fields=[...], search_fields=[...])
+  index.start()
+  ids, total = index.search("analista dados", {"setor": "tecnologia"}, limit=20)
+"""
+
+import math
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from keyset_pagination import iter_rows
+
+TOKEN_RE = re.compile(r'\w+')
+ALL_FIELD = '_all'
+DEFAULT_MAX_AGE = 3600
+DEFAULT_POLL_INTERVAL = 30
+# Prefixos curtos casariam boa parte do vocabulário; limita a expansão
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSION = 200
+
+def normalize(text: Any) -> str:
+    """Texto sem acentos e em minúsculas (listas viram um texto só)"""
+    if text is None:
+        return ''
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(item) for item in text if item)
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+def tokenize(text: Any) -> List[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+class InvertedIndex:
+    """Índice invertido por campo, com BM25 sobre os campos de busca"""
+
+    def __init__(self, fields: Sequence[str], search_fields: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.fields = list(fields)
+        self.search_fields = list(search_fields)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, Dict[int, int]]] = {f: {} for f in self.fields + [ALL_FIELD]}
+        self.doc_terms: Dict[int, List[Tuple[str, str]]] = {}
+        self.doc_len: Dict[int, int] = {}
+        self.total_len = 0
+        self.max_id: Optional[int] = None
+        self._vocab: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        doc_id = doc['id']
+        if doc_id in self.doc_len:
+            self.remove(doc_id)
+        entries = []
+        all_terms: Counter = Counter()
+        for field in self.fields:
+            terms = Counter(tokenize(doc.get(field)))
+            for term, tf in terms.items():
+                self.postings[field].setdefault(term, {})[doc_id] = tf
+                entries.append((field, term))
+            if field in self.search_fields:
+                all_terms.update(terms)
+        for term, tf in all_terms.items():
+            self.postings[ALL_FIELD].setdefault(term, {})[doc_id] = tf
+            entries.append((ALL_FIELD, term))
+        self.doc_terms[doc_id] = entries
+        self.doc_len[doc_id] = sum(all_terms.values())
+        self.total_len += self.doc_len[doc_id]
+        self.max_id = doc_id if self.max_id is None else max(self.max_id, doc_id)
+        self._vocab.clear()
+
+    def remove(self, doc_id: int) -> None:
+        for field, term in self.doc_terms.pop(doc_id, []):
+            posting = self.postings[field].get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[field][term]
+        self.total_len -= self.doc_len.pop(doc_id, 0)
+        self._vocab.clear()
+
+    def _expand(self, field: str, token: str) -> List[str]:
+        """O próprio termo e os que começam com ele (vocabulário ordenado + bisect)"""
+        vocab = self._vocab.get(field)
+        if vocab is None:
+            vocab = self._vocab[field] = sorted(self.postings[field])
+        if len(token) < MIN_PREFIX_LENGTH:
+            return [token] if token in self.postings[field] else []
+        terms = []
+        for term in vocab[bisect_left(vocab, token):]:
+            if not term.startswith(token) or len(terms) >= MAX_PREFIX_EXPANSION:
+                break
+            terms.append(term)
+        return terms
+
+    def _ids_for_token(self, field: str, token: str) -> Set[int]:
+        ids: Set[int] = set()
+        for term in self._expand(field, token):
+            ids.update(self.postings[field][term])
+        return ids
+
+    def match(self, field: str, text: Any) -> Set[int]:
+        """Vagas cujo campo contém todas as palavras do texto (interseção das listas)"""
+        result: Optional[Set[int]] = None
+        # Listas menores primeiro: a interseção encolhe mais rápido
+        for ids in sorted((self._ids_for_token(field, t) for t in set(tokenize(text))), key=len):
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result if result is not None else set(self.doc_len)
+
+    def filter_ids(self, filters: Dict[str, Any]) -> Optional[Set[int]]:
+        """Interseção de todos os filtros preenchidos (None se não há filtro)"""
+        result: Optional[Set[int]] = None
+        for field, text in filters.items():
+            if text is None or not str(text).strip():
+                continue
+            ids = self.match(field, text)
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result
+
+    def bm25(self, query: str, candidates: Optional[Set[int]] = None) -> Dict[int, float]:
+        """Pontuação BM25 das vagas com todas as palavras da busca (prefixos inclusos)"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.doc_len:
+            return {}
+        matched = self.match(ALL_FIELD, query)
+        if candidates is not None:
+            matched &= candidates
+        if not matched:
+            return {}
+
+        n_docs = len(self.doc_len)
+        avg_len = self.total_len / n_docs or 1.0
+        scores = dict.fromkeys(matched, 0.0)
+        for token in tokens:
+            for term in self._expand(ALL_FIELD, token):
+                posting = self.postings[ALL_FIELD][term]
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                # Percorre a menor das duas listas
+                if len(posting) <= len(scores):
+                    pairs = ((doc_id, tf) for doc_id, tf in posting.items() if doc_id in scores)
+                else:
+                    pairs = ((doc_id, posting[doc_id]) for doc_id in scores if doc_id in posting)
+                for doc_id, tf in pairs:
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[List[int], int]:
+        """(ids da página, total de resultados): por relevância se há busca livre,
+        senão por id"""
+        candidates = self.filter_ids(filters or {})
+        if query and tokenize(query):
+            scores = self.bm25(query, candidates)
+            ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], -doc_id))
+        else:
+            ranked = sorted(candidates if candidates is not None else self.doc_len)
+        return ranked[offset:offset + limit], len(ranked)
+
+class SearchIndexRefresher:
+    """InvertedIndex de uma tabela, carregado na subida e atualizado em segundo plano"""
+
+    label = "índice de busca"
+
+    def __init__(self, supabase, table: str, fields: Sequence[str], search_fields: Sequence[str],
+                 generation: Optional[Callable[[], int]] = None, max_age: float = DEFAULT_MAX_AGE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, columns: Optional[str] = None):
+        self.supabase = supabase
+        self.table = table
+        self.fields = list(fields)
+        self.search_fields = list(search_fields)
+        # columns="*" quando nem todos os campos existem em todas as instalações
+        self.columns = columns or ', '.join(['id'] + self.fields)
+        self.generation = generation or (lambda: 0)
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self.index: Optional[InvertedIndex] = None
+        self.built_generation: Optional[int] = None
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+        self.lock = threading.RLock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def _load(self, rows: Iterable[Dict[str, Any]], index: InvertedIndex) -> int:
+        added = 0
+        for row in rows:
+            index.add(row)
+            added += 1
+        return added
+
+    def new_index(self) -> InvertedIndex:
+        """Estrutura vazia a preencher (subclasses trocam o tipo de índice)"""
+        return InvertedIndex(self.fields, self.search_fields)
+
+    def build(self) -> InvertedIndex:
+        """Carrega a tabela inteira em um índice novo e troca de uma vez"""
+        generation = self.generation()
+        start = time.monotonic()
+        index = self.new_index()
+        self._load(iter_rows(self.supabase, self.table, self.columns), index)
+        with self.lock:
+            self.index = index
+            self.built_generation = generation
+            self.built_at = time.monotonic()
+            self.build_seconds = round(self.built_at - start, 3)
+        return index
+
+    def refresh_new_rows(self) -> int:
+        """Acrescenta as vagas com id maior que o último indexado"""
+        index = self.index
+        if index is None:
+            return 0
+        rows = list(iter_rows(self.supabase, self.table, self.columns, after_id=index.max_id))
+        if rows:
+            with self.lock:
+                self._load(rows, index)
+        return len(rows)
+
+    def get(self) -> InvertedIndex:
+        """Índice atual (carregado na hora só se ainda não existir)"""
+        if self.index is None:
+            with self.lock:
+                if self.index is None:
+                    self.build()
+        return self.index
+
+    def search(self, query: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[List[int], int]:
+        index = self.get()
+        with self.lock:
+            return index.search(query, filters, limit, offset)
+
+    def is_stale(self) -> bool:
+        return (
+            self.index is None
+            or self.built_generation != self.generation()
+            or time.monotonic() - self.built_at >= self.max_age
+        )
+
+    def refresh_soon(self) -> None:
+        """Pede uma reconstrução imediata à thread de segundo plano"""
+        self.built_generation = None
+        self.wakeup.set()
+
+    def start(self) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name=f"{self.__class__.__name__}-{self.table}", daemon=True)
+            self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                if self.is_stale():
+                    self.build()
+                else:
+                    self.refresh_new_rows()
+            except Exception as e:
+                # Mantém o índice anterior e tenta de novo no próximo ciclo
+                print(f"⚠️ Erro ao atualizar o {self.label} ({self.table}): {e}")
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+
+    def info(self) -> Dict[str, Any]:
+        index = self.index
+        return {
+            "ready": index is not None,
+            "documents": len(index) if index is not None else 0,
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if index is not None else None,
+            "build_seconds": self.build_seconds,
+        }
+
+def fetch_rows_by_id(supabase, table: str, ids: Sequence[int], columns: str = "*") -> List[Dict[str, Any]]:
+    """Linhas dos ids pedidos, na mesma ordem (busca pela chave primária)"""
+    if not ids:
+        return []
+    rows = supabase.table(table).select(columns).in_("id", list(ids)).execute().data or []
+    by_id = {row["id"]: row for row in rows}
+    return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
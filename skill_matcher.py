@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração de skills e índice skill -> vagas para as análises do main.py
+- SkillMatcher: a lista de skills já em maiúsculas, montada uma vez; cada vaga
+  junta título, requisitos e habilidades num texto só e é percorrida uma vez
+  (antes eram três chamadas, cada uma recriando a lista e os .upper())
+- build_skill_index: uma passada pelas vagas monta skill -> [ids das vagas];
+  a frequência é o tamanho da lista, sem reler o mapa de vagas para cada skill
+
+A busca continua sendo por substring sem diferenciar maiúsculas ("GO" casa em
+"DJANGO"), como em extract_skills_from_text. Com ~70 padrões, uma regex
+única (alternativas ou trie) ficou mais lenta que o "in" do CPython, por
+isso o matcher mantém o "in" e só evita o trabalho repetido.
+
+Uso:
+  index = build_skill_index(vagas)            # {'Python': [1, 7], 'SQL': [7], ...}
+  SKILL_MATCHER.find("Analista", "SQL e Excel")  # ['SQL', 'Excel']
+"""
+
+from typing import Dict, Iterable, List, Sequence
+
+# Lista de skills comuns para buscar
+COMMON_SKILLS = [
+    'Python', 'Java', 'JavaScript', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust', 'Swift',
+    'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring', 'Laravel',
+    'HTML', 'CSS', 'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Docker',
+    'Kubernetes', 'AWS', 'Azure', 'GCP', 'Git', 'Linux', 'Windows', 'MacOS',
+    'Scrum', 'Agile', 'DevOps', 'CI/CD', 'Jenkins', 'Terraform', 'Ansible',
+    'Machine Learning', 'AI', 'Data Science', 'Big Data', 'Hadoop', 'Spark',
+    'Excel', 'Power BI', 'Tableau', 'Photoshop', 'Illustrator', 'Figma',
+    'Inglês', 'Espanhol', 'Francês', 'Alemão', 'Comunicação', 'Liderança',
+    'Trabalho em Equipe', 'Gestão de Projetos', 'Análise', 'Criatividade',
+    'Organização', 'Proatividade', 'Resolução de Problemas'
+]
+
+# Campos da vaga analisados, na ordem em que eram lidos
+SKILL_FIELDS = ('titulo', 'requisitos', 'habilidades')
+
+class SkillMatcher:
+    """Procura várias skills de uma vez num texto (substring, sem diferenciar maiúsculas)"""
+
+    def __init__(self, skills: Sequence[str] = COMMON_SKILLS):
+        self.patterns = [(skill, skill.upper()) for skill in dict.fromkeys(skills)]
+
+    def find(self, *texts) -> List[str]:
+        """Skills presentes em qualquer um dos textos, na ordem da lista"""
+        # '\n' não aparece em nenhuma skill: nada casa atravessando dois campos
+        text = '\n'.join(str(t) for t in texts if t).upper()
+        if not text:
+            return []
+        return [skill for skill, pattern in self.patterns if pattern in text]
+
+SKILL_MATCHER = SkillMatcher()
+
+def job_skills(job: Dict, matcher: SkillMatcher = SKILL_MATCHER,
+               fields: Sequence[str] = SKILL_FIELDS) -> List[str]:
+    return matcher.find(*(job.get(field) for field in fields))
+
+def build_skill_index(jobs: Iterable[Dict], matcher: SkillMatcher = SKILL_MATCHER,
+                      fields: Sequence[str] = SKILL_FIELDS) -> Dict[str, List[int]]:
+    """skill -> ids das vagas que a citam (ordem das vagas), numa única passada"""
+    index: Dict[str, List[int]] = {}
+    for job in jobs:
+        for skill in job_skills(job, matcher, fields):
+            index.setdefault(skill, []).append(job['id'])
+    return index
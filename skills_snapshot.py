@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregado de skills por setor mantido em memória (/skills-by-sector)
+- SkillsBySectorSnapshot.build(): lê a tabela vagas paginada por id, só com
+  as colunas usadas (setor, habilidades, requisitos), e conta as skills
+- Uma thread em segundo plano reconstrói o agregado quando o cache da API é
+  invalidado (nova carga) ou quando ele passa de max_age segundos
+- get(): devolve o agregado pronto; a requisição não toca no banco
+
+Uso:
+  snapshot = SkillsBySectorSnapshot(supabase, parse_skills, generation=response_cache.current_generation)
+  snapshot.start()
+  snapshot.get()
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from keyset_pagination import PAGE_SIZE, iter_rows
+
+TOP_SKILLS = 10
+DEFAULT_MAX_AGE = 600
+CHECK_INTERVAL = 5
+
+def count_skills_by_sector(jobs: Iterable[Dict[str, Any]], parse_skills: Callable[[Dict], List[str]],
+                           top: int = TOP_SKILLS) -> List[Dict[str, Any]]:
+    """Total de vagas e skills mais frequentes de cada setor"""
+    totals: Counter = Counter()
+    skills: Dict[str, Counter] = {}
+    for job in jobs:
+        sector = job.get("setor") or "Outros"
+        totals[sector] += 1
+        skills.setdefault(sector, Counter()).update(parse_skills(job))
+
+    return [
+        {
+            "sector": sector,
+            "total_jobs": total,
+            "top_skills": [{"skill": s, "count": c} for s, c in skills[sector].most_common(top)],
+        }
+        for sector, total in totals.items()
+    ]
+
+def iter_vagas(supabase, columns: str = "id, setor, habilidades, requisitos",
+               page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Percorre a tabela vagas em páginas por id (sem o limite de linhas de um select único)"""
+    return iter_rows(supabase, "vagas", columns, page_size)
+
+class SkillsBySectorSnapshot:
+    """Resposta de /skills-by-sector pré-calculada e reconstruída em segundo plano"""
+
+    def __init__(self, supabase, parse_skills: Callable[[Dict], List[str]],
+                 generation: Optional[Callable[[], int]] = None, max_age: float = DEFAULT_MAX_AGE,
+                 check_interval: float = CHECK_INTERVAL):
+        self.supabase = supabase
+        self.parse_skills = parse_skills
+        self.generation = generation or (lambda: 0)
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.result: Optional[Dict[str, Any]] = None
+        self.built_generation: Optional[int] = None
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def build(self) -> Dict[str, Any]:
+        """Recalcula o agregado e troca o snapshot de uma vez"""
+        with self.lock:
+            return self._build()
+
+    def _build(self) -> Dict[str, Any]:
+        generation = self.generation()
+        start = time.monotonic()
+        sectors = count_skills_by_sector(iter_vagas(self.supabase), self.parse_skills)
+        self.result = {"sectors": sectors, "last_updated": datetime.now().isoformat()}
+        self.built_generation = generation
+        self.built_at = time.monotonic()
+        self.build_seconds = round(self.built_at - start, 3)
+        return self.result
+
+    def get(self) -> Dict[str, Any]:
+        """Agregado atual (calculado na hora só se ainda não existir)"""
+        result = self.result
+        if result is not None:
+            return result
+        with self.lock:
+            return self.result if self.result is not None else self._build()
+
+    def is_stale(self) -> bool:
+        return (
+            self.result is None
+            or self.built_generation != self.generation()
+            or time.monotonic() - self.built_at >= self.max_age
+        )
+
+    def refresh_soon(self) -> None:
+        """Pede uma reconstrução imediata à thread de segundo plano"""
+        self.built_generation = None
+        self.wakeup.set()
+
+    def start(self) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="skills-snapshot", daemon=True)
+            self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            if self.is_stale():
+                try:
+                    self.build()
+                except Exception as e:
+                    # Mantém o snapshot anterior e tenta de novo no próximo ciclo
+                    print(f"⚠️ Erro ao atualizar skills por setor: {e}")
+            self.wakeup.wait(self.check_interval)
+            self.wakeup.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "ready": self.result is not None,
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.result else None,
+            "build_seconds": self.build_seconds,
+            "sectors": len(self.result["sectors"]) if self.result else 0,
+        }
@@ -11,6 +11,11 @@ from typing import List, Dict, Any, Optional
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from batch_normalizer import clean_array, clean_numeric, clean_raw_text
+from company_cache import CompanyCache
+from upload_engine import UploadEngine
+from job_stream import batched, iter_jobs
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -23,49 +28,75 @@ class SupabaseUploaderAdvanced:
             raise ValueError("SUPABASE_URL e SUPABASE_KEY devem estar definidas no arquivo .env")
         
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.companies = CompanyCache(self.supabase)
         print(f"✅ Conectado ao Supabase: {self.supabase_url}")
     
-    def clean_text(self, text: str) -> str:
-        """Limpa e normaliza texto"""
-        if not text or text.lower() in ['nan', 'null', 'none']:
-            return None
-        return str(text).strip()
-    
-    def clean_numeric(self, value: Any) -> Optional[float]:
-        """Limpa e converte valores numéricos"""
-        if value is None or str(value).lower() in ['nan', 'null', 'none', '']:
-            return None
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return None
-    
-    def clean_array(self, arr: List[str]) -> List[str]:
-        """Limpa array removendo valores vazios ou nulos"""
-        if not arr:
-            return []
-        return [self.clean_text(item) for item in arr if self.clean_text(item)]
-    
     def insert_or_get_company(self, company_name: str, industry: str = None) -> int:
-        """Insere ou busca empresa existente"""
-        company_name = self.clean_text(company_name)
+        """Insere ou busca empresa existente (via cache de empresas)"""
+        company_name = clean_raw_text(company_name)
         if not company_name:
             return None
         
-        # Buscar empresa existente
-        result = self.supabase.table('companies').select('id').eq('name', company_name).execute()
-        
-        if result.data:
-            return result.data[0]['id']
-        
-        # Inserir nova empresa
-        company_data = {
-            'name': company_name,
-            'industry': self.clean_text(industry)
+        return self.companies.resolve(company_name, clean_raw_text(industry))
+    
+    def prefetch_companies(self, jobs_data: List[Dict[str, Any]]):
+        """Cria em um único insert as empresas ainda desconhecidas de um lote"""
+        try:
+            self.companies.resolve_many(
+                (clean_raw_text(job.get('company_name')), clean_raw_text(job.get('industry')))
+                for job in jobs_data
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao resolver empresas do lote: {str(e)}")
+    
+    def build_job_record(self, job_data: Dict[str, Any], company_id: Optional[int],
+                         extraction_timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Monta a linha da tabela jobs (sem campos None)"""
+        job_record = {
+            'title': clean_raw_text(job_data.get('title')),
+            'seniority': clean_raw_text(job_data.get('seniority')),
+            'area': clean_raw_text(job_data.get('area')),
+            'company_id': company_id,
+            'company_name': clean_raw_text(job_data.get('company_name')),
+            'industry': clean_raw_text(job_data.get('industry')),
+            'employment_type': clean_raw_text(job_data.get('employment_type')),
+            'work_schedule': clean_raw_text(job_data.get('work_schedule')),
+            'modality': clean_raw_text(job_data.get('modality')),
+            'location_city': clean_raw_text(job_data.get('location_city')),
+            'location_state': clean_raw_text(job_data.get('location_state')),
+            'location_region': clean_raw_text(job_data.get('location_region')),
+            'salary_min': clean_numeric(job_data.get('salary_min')),
+            'salary_max': clean_numeric(job_data.get('salary_max')),
+            'salary_currency': clean_raw_text(job_data.get('salary_currency', 'BRL')),
+            'salary_period': clean_raw_text(job_data.get('salary_period', 'month')),
+            'education_level': clean_raw_text(job_data.get('education_level')),
+            'pcd': bool(job_data.get('pcd', False)),
+            'source_name': clean_raw_text(job_data.get('source_name')),
+            'source_url': clean_raw_text(job_data.get('source_url')),
+            'raw_excerpt': clean_raw_text(job_data.get('raw_excerpt')),
+            'confidence': clean_numeric(job_data.get('confidence')),
+            'parsed_at': job_data.get('parsed_at'),
+            'sector': clean_raw_text(job_data.get('industry')),  # Usando industry como sector
+            'extraction_timestamp': extraction_timestamp or datetime.now().isoformat()
         }
         
-        result = self.supabase.table('companies').insert(company_data).execute()
-        return result.data[0]['id'] if result.data else None
+        # Remover campos None
+        return {k: v for k, v in job_record.items() if v is not None}
+    
+    def build_related_rows(self, job_id: int, job_data: Dict[str, Any]) -> List[tuple]:
+        """Linhas das tabelas relacionadas de uma vaga: [(tabela, linhas), ...]"""
+        related = [
+            ('job_benefits', 'benefit', job_data.get('benefits', [])),
+            ('job_rewards', 'reward', job_data.get('rewards', [])),
+            ('job_requirements_must', 'requirement', job_data.get('requirements_must', [])),
+            ('job_requirements_nice', 'requirement', job_data.get('requirements_nice', [])),
+            ('job_responsibilities', 'responsibility', job_data.get('responsibilities', [])),
+            ('job_tags', 'tag', job_data.get('tags', [])),
+        ]
+        return [
+            (table, [{'job_id': job_id, column: value} for value in clean_array(values)])
+            for table, column, values in related
+        ]
     
     def insert_job(self, job_data: Dict[str, Any]) -> Optional[int]:
         """Insere uma vaga no Supabase"""
@@ -77,36 +108,7 @@ class SupabaseUploaderAdvanced:
             )
             
             # Preparar dados principais da vaga
-            job_record = {
-                'title': self.clean_text(job_data.get('title')),
-                'seniority': self.clean_text(job_data.get('seniority')),
-                'area': self.clean_text(job_data.get('area')),
-                'company_id': company_id,
-                'company_name': self.clean_text(job_data.get('company_name')),
-                'industry': self.clean_text(job_data.get('industry')),
-                'employment_type': self.clean_text(job_data.get('employment_type')),
-                'work_schedule': self.clean_text(job_data.get('work_schedule')),
-                'modality': self.clean_text(job_data.get('modality')),
-                'location_city': self.clean_text(job_data.get('location_city')),
-                'location_state': self.clean_text(job_data.get('location_state')),
-                'location_region': self.clean_text(job_data.get('location_region')),
-                'salary_min': self.clean_numeric(job_data.get('salary_min')),
-                'salary_max': self.clean_numeric(job_data.get('salary_max')),
-                'salary_currency': self.clean_text(job_data.get('salary_currency', 'BRL')),
-                'salary_period': self.clean_text(job_data.get('salary_period', 'month')),
-                'education_level': self.clean_text(job_data.get('education_level')),
-                'pcd': bool(job_data.get('pcd', False)),
-                'source_name': self.clean_text(job_data.get('source_name')),
-                'source_url': self.clean_text(job_data.get('source_url')),
-                'raw_excerpt': self.clean_text(job_data.get('raw_excerpt')),
-                'confidence': self.clean_numeric(job_data.get('confidence')),
-                'parsed_at': job_data.get('parsed_at'),
-                'sector': self.clean_text(job_data.get('industry')),  # Usando industry como sector
-                'extraction_timestamp': datetime.now().isoformat()
-            }
-            
-            # Remover campos None
-            job_record = {k: v for k, v in job_record.items() if v is not None}
+            job_record = self.build_job_record(job_data, company_id)
             
             # Inserir vaga principal
             result = self.supabase.table('jobs').insert(job_record).execute()
@@ -134,7 +136,7 @@ class SupabaseUploaderAdvanced:
     
     def insert_job_benefits(self, job_id: int, benefits: List[str]):
         """Insere benefícios da vaga"""
-        benefits = self.clean_array(benefits)
+        benefits = clean_array(benefits)
         if not benefits:
             return
         
@@ -143,7 +145,7 @@ class SupabaseUploaderAdvanced:
     
     def insert_job_rewards(self, job_id: int, rewards: List[str]):
         """Insere recompensas da vaga"""
-        rewards = self.clean_array(rewards)
+        rewards = clean_array(rewards)
         if not rewards:
             return
         
@@ -152,7 +154,7 @@ class SupabaseUploaderAdvanced:
     
     def insert_job_requirements_must(self, job_id: int, requirements: List[str]):
         """Insere requisitos obrigatórios da vaga"""
-        requirements = self.clean_array(requirements)
+        requirements = clean_array(requirements)
         if not requirements:
             return
         
@@ -161,7 +163,7 @@ class SupabaseUploaderAdvanced:
     
     def insert_job_requirements_nice(self, job_id: int, requirements: List[str]):
         """Insere requisitos desejáveis da vaga"""
-        requirements = self.clean_array(requirements)
+        requirements = clean_array(requirements)
         if not requirements:
             return
         
@@ -170,7 +172,7 @@ class SupabaseUploaderAdvanced:
     
     def insert_job_responsibilities(self, job_id: int, responsibilities: List[str]):
         """Insere responsabilidades da vaga"""
-        responsibilities = self.clean_array(responsibilities)
+        responsibilities = clean_array(responsibilities)
         if not responsibilities:
             return
         
@@ -179,46 +181,59 @@ class SupabaseUploaderAdvanced:
     
     def insert_job_tags(self, job_id: int, tags: List[str]):
         """Insere tags da vaga"""
-        tags = self.clean_array(tags)
+        tags = clean_array(tags)
         if not tags:
             return
         
         tag_records = [{'job_id': job_id, 'tag': tag} for tag in tags]
         self.supabase.table('job_tags').insert(tag_records).execute()
     
-    def upload_from_json(self, json_file_path: str, batch_size: int = 10):
-        """Faz upload de vagas a partir de um arquivo JSON"""
+    def related_rows_for_batch(self, inserted: List[Dict[str, Any]], jobs_data: List[Dict[str, Any]]) -> List[tuple]:
+        """Linhas relacionadas de um lote já inserido, agrupadas por tabela"""
+        by_table: Dict[str, List[Dict[str, Any]]] = {}
+        # O PostgREST devolve as linhas na ordem do insert
+        for row, job_data in zip(inserted, jobs_data):
+            for table, rows in self.build_related_rows(row['id'], job_data):
+                by_table.setdefault(table, []).extend(rows)
+        return list(by_table.items())
+    
+    def upload_from_json(self, json_file_path: str, batch_size: int = 10, workers: int = 4):
+        """Faz upload de vagas a partir de um arquivo JSON (lotes enviados em paralelo)"""
         print(f"📁 Carregando dados de: {json_file_path}")
         
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                jobs_data = json.load(f)
-            
-            print(f"📊 Total de vagas encontradas: {len(jobs_data)}")
+            total = 0
             
-            successful_uploads = 0
-            failed_uploads = 0
+            # Backpressure e retentativas com backoff substituem as pausas fixas entre lotes;
+            # o arquivo é lido em streaming, lote a lote
+            with UploadEngine(self.supabase_url, self.supabase_key, workers=workers) as engine:
+                for batch in batched(iter_jobs(json_file_path), batch_size):
+                    start = total
+                    total += len(batch)
+                    self.prefetch_companies(batch)
+                    
+                    # Data de extração calculada uma vez por lote
+                    extraction_timestamp = datetime.now().isoformat()
+                    records = [
+                        self.build_job_record(job_data, self.insert_or_get_company(
+                            job_data.get('company_name'), job_data.get('industry')
+                        ), extraction_timestamp)
+                        for job_data in batch
+                    ]
+                    engine.submit('jobs', records, contexts=batch, on_success=self.related_rows_for_batch)
+                    print(f"📤 Lote enviado: vagas {start + 1}-{total}")
             
-            for i, job_data in enumerate(jobs_data, 1):
-                print(f"\n[{i}/{len(jobs_data)}] Processando: {job_data.get('title', 'N/A')}")
-                
-                job_id = self.insert_job(job_data)
-                
-                if job_id:
-                    successful_uploads += 1
-                else:
-                    failed_uploads += 1
-                
-                # Pausa a cada batch para evitar rate limiting
-                if i % batch_size == 0:
-                    print(f"\n⏸️ Processados {i} registros. Pausando...")
-                    import time
-                    time.sleep(1)
+            metrics = engine.metrics()
+            failed_jobs = [row for table, row, _ in engine.failed_rows if table == 'jobs']
+            for table, row, reason in engine.failed_rows:
+                print(f"❌ Erro ao inserir em {table} ({row.get('title', row.get('job_id', 'N/A'))}): {reason}")
             
             print(f"\n📈 Resumo do upload:")
-            print(f"✅ Sucessos: {successful_uploads}")
-            print(f"❌ Falhas: {failed_uploads}")
-            print(f"📊 Total: {len(jobs_data)}")
+            print(f"✅ Sucessos: {total - len(failed_jobs)}")
+            print(f"❌ Falhas: {len(failed_jobs)}")
+            print(f"📊 Total: {total}")
+            engine.print_metrics()
+            return metrics
             
         except FileNotFoundError:
             print(f"❌ Arquivo não encontrado: {json_file_path}")
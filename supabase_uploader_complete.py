@@ -6,11 +6,17 @@ Baseado no arquivo vagas_todos_setores_estruturadas_completo.json
 
 import json
 import os
+import time
 from datetime import datetime
+from itertools import islice
 from typing import List, Dict, Any, Optional
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from batch_normalizer import clean_array, clean_numeric, clean_raw_text, extract_salary_from_text
+from company_cache import CompanyCache
+from job_stream import batched, iter_jobs
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -23,84 +29,18 @@ class SupabaseUploaderComplete:
             raise ValueError("SUPABASE_URL e SUPABASE_KEY devem estar definidas no arquivo .env")
         
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.companies = CompanyCache(self.supabase)
         print(f"✅ Conectado ao Supabase: {self.supabase_url}")
     
-    def clean_text(self, text: str) -> str:
-        """Limpa e normaliza texto"""
-        if not text or str(text).lower() in ['nan', 'null', 'none', '']:
-            return None
-        return str(text).strip()
-    
-    def clean_numeric(self, value: Any) -> Optional[float]:
-        """Limpa e converte valores numéricos"""
-        if value is None or str(value).lower() in ['nan', 'null', 'none', '']:
-            return None
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return None
-    
-    def clean_array(self, arr: List[str]) -> List[str]:
-        """Limpa array removendo valores vazios ou nulos"""
-        if not arr:
-            return []
-        return [self.clean_text(item) for item in arr if self.clean_text(item)]
-    
-    def extract_salary_from_text(self, salary_text: str) -> tuple:
-        """Extrai valores de salário do texto"""
-        if not salary_text or str(salary_text).lower() in ['nan', 'null', 'none']:
-            return None, None
-        
-        import re
-        # Buscar padrões de salário
-        patterns = [
-            r'R\$\s*([\d.,]+)\s*a\s*R\$\s*([\d.,]+)',
-            r'([\d.,]+)\s*a\s*([\d.,]+)',
-            r'R\$\s*([\d.,]+)',
-            r'([\d.,]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, str(salary_text))
-            if match:
-                if len(match.groups()) == 2:
-                    try:
-                        min_val = float(match.group(1).replace('.', '').replace(',', '.'))
-                        max_val = float(match.group(2).replace('.', '').replace(',', '.'))
-                        return min_val, max_val
-                    except:
-                        continue
-                else:
-                    try:
-                        val = float(match.group(1).replace('.', '').replace(',', '.'))
-                        return val, val
-                    except:
-                        continue
-        
-        return None, None
-    
     def insert_or_get_company(self, company_name: str, industry: str = None) -> int:
-        """Insere ou busca empresa existente"""
-        company_name = self.clean_text(company_name)
+        """Insere ou busca empresa existente (via cache de empresas)"""
+        company_name = clean_raw_text(company_name)
         if not company_name:
             return None
         
-        # Buscar empresa existente
-        result = self.supabase.table('companies').select('id').eq('name', company_name).execute()
-        
-        if result.data:
-            return result.data[0]['id']
-        
-        # Inserir nova empresa
-        company_data = {
-            'name': company_name,
-            'industry': self.clean_text(industry)
-        }
-        
-        result = self.supabase.table('companies').insert(company_data).execute()
-        return result.data[0]['id'] if result.data else None
+        return self.companies.resolve(company_name, clean_raw_text(industry))
     
-    def map_job_data(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+    def map_job_data(self, job_data: Dict[str, Any], extraction_timestamp: Optional[str] = None) -> Dict[str, Any]:
         """Mapeia dados do JSON para o formato do Supabase"""
         info_basicas = job_data.get('informacoes_basicas', {})
         localizacao = job_data.get('localizacao', {})
@@ -110,50 +50,74 @@ class SupabaseUploaderComplete:
         habilidades = job_data.get('habilidades_e_competencias', {})
         
         # Extrair salários
-        salary_min, salary_max = self.extract_salary_from_text(
+        salary_min, salary_max = extract_salary_from_text(
             remuneracao.get('texto_original', '')
         )
         
         # Se não extraiu do texto, usar valores diretos
         if salary_min is None:
-            salary_min = self.clean_numeric(remuneracao.get('valor_minimo'))
+            salary_min = clean_numeric(remuneracao.get('valor_minimo'))
         if salary_max is None:
-            salary_max = self.clean_numeric(remuneracao.get('valor_maximo'))
+            salary_max = clean_numeric(remuneracao.get('valor_maximo'))
         
         return {
             'external_id': str(job_data.get('id')),
-            'title': self.clean_text(info_basicas.get('fonte')),
-            'company_name': self.clean_text(info_basicas.get('empresa_principal')),
-            'industry': self.clean_text(info_basicas.get('setor')),
-            'area': self.clean_text(info_basicas.get('area')),
-            'sector': self.clean_text(info_basicas.get('setor')),
-            'modality': self.clean_text(jornada.get('modalidade')),
-            'work_schedule': self.clean_text(jornada.get('jornada_extraida')),
-            'location_city': self.clean_text(localizacao.get('cidade_extraida')),
-            'location_state': self.clean_text(localizacao.get('estado_extraido')),
-            'location_region': self.clean_text(localizacao.get('unidade')),
+            'title': clean_raw_text(info_basicas.get('fonte')),
+            'company_name': clean_raw_text(info_basicas.get('empresa_principal')),
+            'industry': clean_raw_text(info_basicas.get('setor')),
+            'area': clean_raw_text(info_basicas.get('area')),
+            'sector': clean_raw_text(info_basicas.get('setor')),
+            'modality': clean_raw_text(jornada.get('modalidade')),
+            'work_schedule': clean_raw_text(jornada.get('jornada_extraida')),
+            'location_city': clean_raw_text(localizacao.get('cidade_extraida')),
+            'location_state': clean_raw_text(localizacao.get('estado_extraido')),
+            'location_region': clean_raw_text(localizacao.get('unidade')),
             'salary_min': salary_min,
             'salary_max': salary_max,
             'salary_currency': 'BRL',
             'salary_period': 'month',
-            'education_level': self.clean_text(requisitos.get('formacao_minima')),
-            'seniority': self.clean_text(requisitos.get('experiencia_necessaria')),
-            'employment_type': self.clean_text(info_basicas.get('modalidade')),
+            'education_level': clean_raw_text(requisitos.get('formacao_minima')),
+            'seniority': clean_raw_text(requisitos.get('experiencia_necessaria')),
+            'employment_type': clean_raw_text(info_basicas.get('modalidade')),
             'source_name': 'Catho',
-            'source_url': self.clean_text(info_basicas.get('link')),
-            'raw_excerpt': self.clean_text(job_data.get('descricao_completa', {}).get('texto_completo')),
-            'description': self.clean_text(job_data.get('descricao_completa', {}).get('texto_completo')),
-            'published_date': self.clean_text(info_basicas.get('publicada_em')),
-            'extraction_timestamp': datetime.now().isoformat(),
+            'source_url': clean_raw_text(info_basicas.get('link')),
+            'raw_excerpt': clean_raw_text(job_data.get('descricao_completa', {}).get('texto_completo')),
+            'description': clean_raw_text(job_data.get('descricao_completa', {}).get('texto_completo')),
+            'published_date': clean_raw_text(info_basicas.get('publicada_em')),
+            'extraction_timestamp': extraction_timestamp or datetime.now().isoformat(),
             'data_quality_score': 8.5,  # Score baseado na estruturação completa
             'pcd': False
         }
     
-    def insert_job(self, job_data: Dict[str, Any]) -> Optional[int]:
-        """Insere uma vaga no Supabase"""
+    def map_jobs(self, jobs_data: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Mapeia um lote uma única vez (None para vagas que não puderam ser mapeadas)"""
+        extraction_timestamp = datetime.now().isoformat()
+        mapped = []
+        for job_data in jobs_data:
+            try:
+                mapped.append(self.map_job_data(job_data, extraction_timestamp))
+            except Exception:
+                # O erro é reportado por insert_job, que mapeia a vaga de novo
+                mapped.append(None)
+        return mapped
+    
+    def prefetch_companies(self, mapped_jobs: List[Optional[Dict[str, Any]]]):
+        """Cria em um único insert as empresas ainda desconhecidas de um lote já mapeado"""
+        try:
+            self.companies.resolve_many(
+                (mapped_data.get('company_name'), mapped_data.get('industry'))
+                for mapped_data in mapped_jobs if mapped_data
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao resolver empresas do lote: {str(e)}")
+    
+    def insert_job(self, job_data: Dict[str, Any], mapped_data: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """Insere uma vaga no Supabase (mapped_data: resultado de map_jobs, se já mapeada)"""
         try:
             # Mapear dados
-            mapped_data = self.map_job_data(job_data)
+            if mapped_data is None:
+                mapped_data = self.map_job_data(job_data)
+            mapped_data = dict(mapped_data)
             
             # Processar empresa
             company_id = self.insert_or_get_company(
@@ -194,7 +158,7 @@ class SupabaseUploaderComplete:
     
     def insert_job_responsibilities(self, job_id: int, responsibilities: List[str]):
         """Insere responsabilidades da vaga"""
-        responsibilities = self.clean_array(responsibilities)
+        responsibilities = clean_array(responsibilities)
         if not responsibilities:
             return
         
@@ -203,7 +167,7 @@ class SupabaseUploaderComplete:
     
     def insert_job_requirements_must(self, job_id: int, requirements: List[str]):
         """Insere requisitos obrigatórios da vaga"""
-        requirements = self.clean_array(requirements)
+        requirements = clean_array(requirements)
         if not requirements:
             return
         
@@ -212,7 +176,7 @@ class SupabaseUploaderComplete:
     
     def insert_job_tags(self, job_id: int, tags: List[str]):
         """Insere tags da vaga"""
-        tags = self.clean_array(tags)
+        tags = clean_array(tags)
         if not tags:
             return
         
@@ -224,39 +188,42 @@ class SupabaseUploaderComplete:
         print(f"📁 Carregando dados de: {json_file_path}")
         
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                jobs_data = json.load(f)
+            jobs_data = iter_jobs(json_file_path)
             
             if max_records:
-                jobs_data = jobs_data[:max_records]
+                jobs_data = islice(jobs_data, max_records)
                 print(f"📊 Limitando a {max_records} registros para teste")
             
-            print(f"📊 Total de vagas a processar: {len(jobs_data)}")
-            
             successful_uploads = 0
             failed_uploads = 0
+            total = 0
             
-            for i, job_data in enumerate(jobs_data, 1):
-                title = job_data.get('informacoes_basicas', {}).get('fonte', 'N/A')
-                print(f"\n[{i}/{len(jobs_data)}] Processando: {title}")
+            # Vagas lidas em streaming: o upload começa com o primeiro lote
+            for batch in batched(jobs_data, batch_size):
+                mapped_jobs = self.map_jobs(batch)
+                self.prefetch_companies(mapped_jobs)
                 
-                job_id = self.insert_job(job_data)
-                
-                if job_id:
-                    successful_uploads += 1
-                else:
-                    failed_uploads += 1
+                for job_data, mapped_data in zip(batch, mapped_jobs):
+                    total += 1
+                    title = job_data.get('informacoes_basicas', {}).get('fonte', 'N/A')
+                    print(f"\n[{total}] Processando: {title}")
+                    
+                    job_id = self.insert_job(job_data, mapped_data)
+                    
+                    if job_id:
+                        successful_uploads += 1
+                    else:
+                        failed_uploads += 1
                 
                 # Pausa a cada batch para evitar rate limiting
-                if i % batch_size == 0:
-                    print(f"\n⏸️ Processados {i} registros. Pausando...")
-                    import time
+                if len(batch) == batch_size:
+                    print(f"\n⏸️ Processados {total} registros. Pausando...")
                     time.sleep(1)
             
             print(f"\n📈 Resumo do upload:")
             print(f"✅ Sucessos: {successful_uploads}")
             print(f"❌ Falhas: {failed_uploads}")
-            print(f"📊 Total: {len(jobs_data)}")
+            print(f"📊 Total: {total}")
             
         except FileNotFoundError:
             print(f"❌ Arquivo não encontrado: {json_file_path}")
@@ -268,10 +235,12 @@ class SupabaseUploaderComplete:
     def upload_batch(self, jobs_data: List[dict]) -> int:
         """Faz upload de um lote de vagas"""
         successful_uploads = 0
+        mapped_jobs = self.map_jobs(jobs_data)
+        self.prefetch_companies(mapped_jobs)
         
-        for job_data in jobs_data:
+        for job_data, mapped_data in zip(jobs_data, mapped_jobs):
             try:
-                job_id = self.insert_job(job_data)
+                job_id = self.insert_job(job_data, mapped_data)
                 if job_id:
                     successful_uploads += 1
             except Exception as e:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes das conversões de campo de batch_normalizer.py usadas pelos uploaders
+avançado e completo (mesmo resultado dos antigos métodos por vaga)
+
+Uso:
+  python -m pytest test_batch_normalizer.py
+"""
+
+import pytest
+
+from batch_normalizer import clean_array, clean_numeric, clean_raw_text, extract_salary_from_text
+
+@pytest.mark.parametrize('value, expected', [
+    (None, None), ('', None), ('nan', None), ('NULL', None), ('None', None),
+    ('  Analista ', 'Analista'), (42, '42'), (0, None),
+])
+def test_clean_raw_text(value, expected):
+    assert clean_raw_text(value) == expected
+
+@pytest.mark.parametrize('value, expected', [
+    (None, None), ('nan', None), ('', None), ('abc', None), ('3500', 3500.0), (12, 12.0),
+])
+def test_clean_numeric(value, expected):
+    assert clean_numeric(value) == expected
+
+def test_clean_array():
+    assert clean_array(None) == []
+    assert clean_array(['Python ', None, 'nan', '', 'SQL']) == ['Python', 'SQL']
+
+@pytest.mark.parametrize('text, expected', [
+    ('R$ 2.000,00 a R$ 3.500,00', (2000.0, 3500.0)),
+    ('1.500 a 2.000', (1500.0, 2000.0)),
+    ('R$ 4.200,50', (4200.5, 4200.5)),
+    ('A combinar', (None, None)),
+    ('nan', (None, None)),
+    (None, (None, None)),
+])
+def test_extract_salary_from_text(text, expected):
+    assert extract_salary_from_text(text) == expected
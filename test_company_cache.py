@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do CompanyCache (company_cache.py) contra o servidor local compatível
+com o PostgREST (postgrest_stub.py)
+- O warm-up carrega todas as páginas de companies, não só a primeira
+
+Uso:
+  python -m pytest test_company_cache.py
+"""
+
+from collections import Counter
+
+import pytest
+from supabase import create_client
+
+from company_cache import CompanyCache
+from postgrest_stub import STUB_KEY, PostgRESTStub
+
+@pytest.fixture
+def stub():
+    server = PostgRESTStub()
+    yield server
+    server.stop()
+
+def test_warm_loads_every_page(stub):
+    stub.tables['companies'] = [{'id': i, 'name': f'Empresa {i}', 'industry': None} for i in range(1, 2501)]
+    cache = CompanyCache(create_client(stub.url, STUB_KEY))
+
+    assert cache.warm() == 2500
+    assert stub.count('GET', 'companies') == 3
+
+    ids = cache.resolve_many([('Empresa 2500', None), ('Empresa 1200', None), ('Nova', 'TI')])
+    assert ids['Empresa 2500'] == 2500 and ids['Empresa 1200'] == 1200
+    assert cache.inserted == 1
+    assert Counter(row['name'] for row in stub.tables['companies'])['Empresa 2500'] == 1
+    assert ids['Nova'] == 2501
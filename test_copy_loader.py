@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da carga via COPY (copy_loader.py) em um Postgres de teste
+- Mesma chave repetida na carga: vale a última ocorrência em load e em merge_table
+
+Precisa de um banco descartável em TEST_DATABASE_DSN (as tabelas são criadas
+num schema próprio, apagado no fim); sem a variável, os testes são pulados.
+
+Uso:
+  TEST_DATABASE_DSN=postgresql://postgres@localhost/postgres python -m pytest test_copy_loader.py
+"""
+
+import os
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+from copy_loader import CHILD_TABLES, JOB_COLUMNS, CopyJobsLoader, merge_table
+
+DSN = os.getenv('TEST_DATABASE_DSN')
+SCHEMA = 'copy_loader_test'
+
+pytestmark = pytest.mark.skipif(not DSN, reason='defina TEST_DATABASE_DSN para rodar')
+
+COLUMN_TYPES = {
+    'salary_min': 'NUMERIC', 'salary_max': 'NUMERIC', 'data_quality_score': 'NUMERIC',
+    'published_date': 'DATE', 'extraction_timestamp': 'TIMESTAMPTZ',
+}
+
+@pytest.fixture
+def dsn():
+    conn = psycopg2.connect(DSN)
+    conn.autocommit = True
+    job_columns = ', '.join(f'{c} {COLUMN_TYPES.get(c, "TEXT")}' for c in JOB_COLUMNS if c != 'external_id')
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}; SET search_path TO {SCHEMA}')
+        cursor.execute('CREATE TABLE companies (id SERIAL PRIMARY KEY, name TEXT, industry TEXT)')
+        cursor.execute(f'CREATE TABLE jobs (id SERIAL PRIMARY KEY, company_id INTEGER, external_id TEXT UNIQUE, '
+                       f'{job_columns}, updated_at TIMESTAMPTZ)')
+        for table, column in CHILD_TABLES.items():
+            cursor.execute(f'CREATE TABLE {table} (id SERIAL PRIMARY KEY, job_id INTEGER, {column} TEXT)')
+    yield f"{DSN}{'&' if '?' in DSN else '?'}options=-csearch_path%3D{SCHEMA}"
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+    conn.close()
+
+def fetch(dsn, query):
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+def test_load_keeps_last_occurrence(dsn):
+    jobs = [
+        ({'external_id': 'a', 'title': 'Primeira', 'company_name': 'ACME'}, {'job_tags': ['velha']}),
+        ({'external_id': 'b', 'title': 'Outra', 'company_name': 'ACME'}, {}),
+        ({'external_id': 'a', 'title': 'Última', 'company_name': 'ACME'}, {'job_tags': ['nova']}),
+    ]
+
+    stats = CopyJobsLoader(dsn).load(iter(jobs))
+
+    assert stats['inserted'] == 2
+    assert fetch(dsn, "SELECT title FROM jobs WHERE external_id = 'a'") == [('Última',)]
+    assert fetch(dsn, 'SELECT tag FROM job_tags') == [('nova',)]
+
+def test_merge_table_keeps_last_occurrence(dsn):
+    rows = [{'external_id': 'a', 'title': 'Primeira'}, {'external_id': 'a', 'title': 'Última'}]
+
+    merge_table(dsn, 'jobs', ['external_id', 'title'], rows, conflict_key='external_id')
+
+    assert fetch(dsn, "SELECT title FROM jobs WHERE external_id = 'a'") == [('Última',)]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da regra única de deduplicação (dedup.py)
+- As mesmas vagas, no formato plano do normalizador (JobRecord + descrição de
+  origem) e no JSONL estruturado, recebem as mesmas decisões
+- remove_duplicates.py (método difflib) segue a mesma regra
+
+Uso:
+  python -m pytest test_dedup.py
+"""
+
+from dedup import Deduplicator, ESTRUTURADA_FIELDS, JOBDATA_FIELDS, jobdata_record
+from normalize_vagas_to_json import AdvancedVagasNormalizer, JobData, JobRecord
+from remove_duplicates import remove_duplicates
+
+# (título, empresa, setor, cidade, descrição)
+VAGAS = [
+    ('Analista Financeiro', 'ACME', 'Financeiro', 'São Paulo', 'Conciliação bancária e fluxo de caixa'),
+    # Mesmo conteúdo com acentos/caixa/espaços diferentes: exata
+    ('analista  financeiro', 'acme', 'financeiro', 'Sao Paulo', 'conciliação  bancária e fluxo de caixa'),
+    # Mesmo título e bloco, descrição diferente: nova
+    ('Analista Financeiro', 'ACME', 'Financeiro', 'São Paulo', 'Contas a pagar e a receber'),
+    # Mesmo título e descrição, outra cidade: nova
+    ('Analista Financeiro', 'ACME', 'Financeiro', 'Campinas', 'Conciliação bancária e fluxo de caixa'),
+    # Sem descrição
+    ('Auxiliar Administrativo', 'Beta', 'Administrativo', 'Recife', ''),
+    ('Auxiliar Administrativo', 'Beta', 'Administrativo', 'Recife', None),
+    ('Auxiliar Administrativo', 'Beta', 'Administrativo', 'Recife', 'Arquivo e atendimento'),
+]
+ESPERADO = ['new', 'exact', 'new', 'new', 'new', 'exact', 'new']
+
+NORMALIZER = AdvancedVagasNormalizer()
+
+def job_record(titulo, empresa, setor, cidade):
+    fields = NORMALIZER.default_job_fields(titulo, '', setor)
+    fields.update(company_name=empresa, area=setor, location_city=cidade)
+    return JobRecord(**fields)
+
+def estruturada(titulo, empresa, setor, cidade, descricao):
+    return {
+        'informacoes_basicas': {'fonte': titulo, 'empresa_principal': empresa, 'setor': setor},
+        'localizacao': {'cidade_extraida': cidade},
+        'descricao_completa': {'texto_completo': descricao},
+    }
+
+def decisions(fields, records):
+    dedup = Deduplicator(fields)
+    return [dedup.check(record, index)[0] for index, record in enumerate(records)]
+
+def test_same_decisions_for_both_shapes():
+    flat = [jobdata_record(job_record(*vaga[:4]), vaga[4]) for vaga in VAGAS]
+    nested = [estruturada(*vaga) for vaga in VAGAS]
+    assert decisions(JOBDATA_FIELDS, flat) == decisions(ESTRUTURADA_FIELDS, nested) == ESPERADO
+
+def test_same_fingerprint_for_both_shapes():
+    for vaga in VAGAS:
+        flat = Deduplicator(JOBDATA_FIELDS).record_fingerprint(jobdata_record(job_record(*vaga[:4]), vaga[4]))
+        nested = Deduplicator(ESTRUTURADA_FIELDS).record_fingerprint(estruturada(*vaga))
+        assert flat == nested
+
+def test_normalizer_uses_description():
+    jobs = [JobData(**job_record(*vaga[:4]).to_dict()) for vaga in VAGAS]
+    unique = NORMALIZER.remove_duplicates(jobs, [vaga[4] for vaga in VAGAS])
+    assert len(unique) == ESPERADO.count('new')
+
+def test_normalizer_without_descriptions():
+    jobs = [JobData(**job_record(*vaga[:4]).to_dict()) for vaga in VAGAS]
+    unique = NORMALIZER.remove_duplicates(jobs)
+    # Sem descrição: mesmo título e bloco é duplicata
+    assert [(job.title, job.location_city) for job in unique] == [
+        ('Analista Financeiro', 'São Paulo'), ('Analista Financeiro', 'Campinas'),
+        ('Auxiliar Administrativo', 'Recife'),
+    ]
+
+def test_difflib_method_uses_shared_rule():
+    vagas = [dict(estruturada(*vaga), id=index) for index, vaga in enumerate(VAGAS[:4])]
+    # Quase-duplicata: mesmo bloco, título diferente, descrição com uma palavra trocada
+    vagas.append(dict(estruturada('Assistente Financeiro', 'ACME', 'Financeiro', 'São Paulo',
+                                  'Conciliação bancária e fluxo do caixa'), id=4))
+    vagas.append(dict(estruturada('Motorista', 'ACME', 'Financeiro', 'São Paulo', 'Entregas na região'), id=5))
+    unique = remove_duplicates(vagas)
+    # A variação de acentos/caixa (1), que a assinatura MD5 separava, e a quase-duplicata (4)
+    # saem; o título igual no mesmo bloco (2) também conta como duplicata no difflib
+    assert [vaga['id'] for vaga in unique] == [0, 3, 5]
+
+if __name__ == "__main__":
+    test_same_decisions_for_both_shapes()
+    test_same_fingerprint_for_both_shapes()
+    test_normalizer_uses_description()
+    test_normalizer_without_descriptions()
+    test_difflib_method_uses_shared_rule()
+    print("✅ Testes de dedup passaram")
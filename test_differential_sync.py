@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da sincronização diferencial (differential_sync.py) contra o servidor
+local compatível com o PostgREST (postgrest_stub.py)
+- Com mais de uma página de linhas no banco, só as vagas novas ou alteradas
+  são enviadas e só as que sumiram da carga são apagadas
+- A remoção é opcional e é recusada com a carga vazia, com falhas ou acima
+  do limite de segurança (sem force_delete)
+
+Uso:
+  python -m pytest test_differential_sync.py
+"""
+
+import contextlib
+import io
+
+import pytest
+from supabase import create_client
+
+from differential_sync import content_hash, fetch_existing_hashes, sync_table
+from postgrest_stub import STUB_KEY, PostgRESTStub
+
+TOTAL = 2500
+
+@pytest.fixture
+def stub():
+    server = PostgRESTStub()
+    yield server
+    server.stop()
+
+def job(i, description='descrição'):
+    return {'external_id': f'ext-{i:05d}', 'title': f'Vaga {i}', 'description': f'{description} {i}'}
+
+def seed(stub, jobs):
+    stub.tables['jobs'] = [dict(row, id=i, content_hash=content_hash(row)) for i, row in enumerate(jobs, 1)]
+
+def test_fetch_existing_hashes_reads_every_page(stub):
+    seed(stub, [job(i) for i in range(TOTAL)])
+
+    existing = fetch_existing_hashes(create_client(stub.url, STUB_KEY), 'jobs')
+
+    assert len(existing) == TOTAL
+    assert stub.count('GET', 'jobs') == 3
+
+def test_sync_touches_only_the_difference(stub):
+    seed(stub, [job(i) for i in range(TOTAL)])
+    changed = {10, 1500, 2400}
+    removed = {7, 2499}
+    rows = [job(i, 'nova' if i in changed else 'descrição') for i in range(TOTAL) if i not in removed]
+    rows.append(job(TOTAL))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = sync_table(create_client(stub.url, STUB_KEY), 'jobs', rows, delete_missing=True)
+
+    assert stats == {'existing': TOTAL, 'inserted': 1, 'updated': 3, 'unchanged': TOTAL - 5,
+                     'deleted': 2, 'failed': 0}
+    stored = {row['external_id']: row for row in stub.tables['jobs']}
+    assert len(stored) == TOTAL - 1
+    assert not {job(i)['external_id'] for i in removed} & set(stored)
+    assert all(stored[job(i)['external_id']]['description'] == f'nova {i}' for i in changed)
+
+def sync(stub, rows, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sync_table(create_client(stub.url, STUB_KEY), 'jobs', rows, **options)
+
+def test_sync_keeps_missing_rows_by_default(stub):
+    seed(stub, [job(i) for i in range(10)])
+
+    stats = sync(stub, [job(i) for i in range(5)])
+
+    assert stats['deleted'] == 0 and len(stub.tables['jobs']) == 10
+
+@pytest.mark.parametrize('rows, options', [
+    ([], {}),
+    ([job(i) for i in range(95)], {'load_errors': 1}),
+    ([job(i) for i in range(80)], {}),
+])
+def test_sync_refuses_unsafe_deletes(stub, rows, options):
+    seed(stub, [job(i) for i in range(100)])
+
+    stats = sync(stub, rows, delete_missing=True, **options)
+
+    assert stats['deleted'] == 0 and stub.count('DELETE', 'jobs') == 0
+    assert len(stub.tables['jobs']) == 100
+
+def test_sync_refuses_delete_after_failed_upsert(stub):
+    seed(stub, [job(i) for i in range(100)])
+    stub.fail_titles = {'Vaga 1'}
+    rows = [job(i, 'nova') for i in range(95)]
+
+    stats = sync(stub, rows, delete_missing=True)
+
+    assert stats['failed'] == 1 and stats['deleted'] == 0
+    assert len(stub.tables['jobs']) == 100
+
+def test_force_delete_overrides_the_limit(stub):
+    seed(stub, [job(i) for i in range(100)])
+
+    stats = sync(stub, [job(i) for i in range(80)], delete_missing=True, force_delete=True)
+
+    assert stats['deleted'] == 20 and len(stub.tables['jobs']) == 80
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do cache de extração (extraction_cache.py)
+- Descrições que diferem só em maiúsculas ou quebras de linha têm entradas
+  separadas (os extratores dependem das duas)
+- A mesma descrição em NFC e NFD usa a mesma entrada
+
+Uso:
+  python -m pytest test_extraction_cache.py
+"""
+
+import unicodedata
+
+from extraction_cache import ExtractionCache, description_key
+
+def extract(text):
+    return {'segments': text.split('\n'), 'first': text.split()[0]}
+
+def test_case_and_line_breaks_are_separate_entries(tmp_path):
+    texts = ['Atender Clientes\nEmitir notas', 'atender clientes\nemitir notas', 'Atender Clientes Emitir notas']
+    with ExtractionCache(str(tmp_path / 'cache.sqlite')) as cache:
+        for text in texts:
+            cache.get_or_extract(text, 'teste', '1', extract)
+        results = [cache.get_or_extract(text, 'teste', '1', extract) for text in texts]
+
+    assert results == [extract(text) for text in texts]
+    assert cache.stats()['hits'] == 3 and cache.stats()['misses'] == 3
+
+def test_unicode_normalization_shares_entry():
+    text = 'Gestão de manutenção'
+    nfd = unicodedata.normalize('NFD', text)
+    assert nfd != text
+    assert description_key(nfd, 'teste', '1') == description_key(text, 'teste', '1')
+    assert description_key(text, 'teste', '1') != description_key(text, 'teste', '2')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do armazém de fingerprints (fingerprint_store.py)
+- Em um corpus sintético com pares de quase-duplicatas conhecidos, a busca
+  por faixas encontra os pares (recall) e não junta vagas diferentes (precisão)
+- Conteúdo exato, blocos, persistência entre execuções e max_distance gravado
+  (reaberto sem max_distance, o armazém usa o valor com que foi criado)
+
+Uso:
+  python -m pytest test_fingerprint_store.py
+"""
+
+import pytest
+
+from fingerprint_store import (DEFAULT_MAX_DISTANCE, STATUS_EXACT, STATUS_NEAR, STATUS_NEW,
+                               FingerprintStore, hamming_distance, simhash)
+from test_minhash_lsh import corpus
+
+@pytest.fixture
+def store(tmp_path):
+    with FingerprintStore(str(tmp_path / 'fingerprints.sqlite')) as fingerprints:
+        yield fingerprints
+
+def test_simhash_distance_tracks_similarity():
+    originals, copies = corpus(size=50)
+    near = [hamming_distance(simhash(a), simhash(b)) for a, b in zip(originals, copies)]
+    unrelated = [hamming_distance(simhash(a), simhash(b)) for a, b in zip(originals, originals[1:])]
+    assert max(near) < min(unrelated)
+
+def test_recall_and_precision_on_known_near_duplicates(store):
+    # Uma palavra trocada em descrições de 300 palavras
+    originals, copies = corpus(words=300)
+    for i, text in enumerate(originals):
+        assert store.classify(text, posting_id=i) == (STATUS_NEW, None)
+
+    found = 0
+    false_matches = 0
+    for i, text in enumerate(copies):
+        status, match_id = store.lookup(text)[:2]
+        if status == STATUS_NEAR and match_id == str(i):
+            found += 1
+        elif status != STATUS_NEW:
+            false_matches += 1
+
+    assert found / len(copies) >= 0.9
+    assert false_matches == 0
+
+def test_exact_and_block(store):
+    text = 'Analista de Dados Pleno com Python, SQL e Power BI para atuar em São Paulo'
+    assert store.classify(text, block='empresa-a', posting_id=1) == (STATUS_NEW, None)
+    assert store.classify(text, block='empresa-a', posting_id=2) == (STATUS_EXACT, '1')
+    # Mesmo texto em outro bloco (outra empresa/cidade) é uma vaga nova
+    assert store.classify(text, block='empresa-b', posting_id=3) == (STATUS_NEW, None)
+    assert len(store) == 2
+
+def test_store_persists_between_runs(tmp_path):
+    path = str(tmp_path / 'fingerprints.sqlite')
+    originals, copies = corpus(size=3)
+    with FingerprintStore(path) as first_run:
+        first_run.classify(originals[0], posting_id='a')
+    with FingerprintStore(path) as second_run:
+        assert second_run.classify(originals[0])[0] == STATUS_EXACT
+        assert second_run.lookup(originals[1])[0] == STATUS_NEW
+
+    with pytest.raises(ValueError):
+        FingerprintStore(path, max_distance=5)
+
+def test_reopen_uses_stored_max_distance(tmp_path):
+    path = str(tmp_path / 'fingerprints.sqlite')
+    with FingerprintStore(path, max_distance=3):
+        pass
+    with FingerprintStore(path) as reopened:
+        assert reopened.max_distance == 3
+        assert reopened.num_bands == 4
+    with FingerprintStore(str(tmp_path / 'novo.sqlite')) as new:
+        assert new.max_distance == DEFAULT_MAX_DISTANCE
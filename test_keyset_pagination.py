@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da paginação por cursor (keyset_pagination.py) contra o servidor local
+compatível com o PostgREST (postgrest_stub.py)
+- Seguindo next_cursor, a listagem por (created_at, id) desc passa por todas
+  as linhas uma única vez, inclusive as com created_at NULL (no fim da ordem)
+- O cursor da última linha com created_at NULL não encerra a listagem
+
+Uso:
+  python -m pytest test_keyset_pagination.py
+"""
+
+import pytest
+from supabase import create_client
+
+from keyset_pagination import InvalidCursor, apply_cursor, decode_cursor, encode_cursor, next_cursor
+from postgrest_stub import STUB_KEY, PostgRESTStub
+
+ORDER = ('created_at', 'id')
+
+@pytest.fixture
+def stub():
+    server = PostgRESTStub()
+    yield server
+    server.stop()
+
+def seed(stub):
+    # Datas repetidas (desempate por id) e um bloco de vagas sem created_at no meio dos ids
+    stub.tables['jobs'] = [
+        {'id': i, 'created_at': None if 8 <= i <= 14 else f'2024-01-{1 + i % 5:02d}T10:00:00+00:00'}
+        for i in range(1, 21)
+    ]
+
+def list_all(client, limit):
+    pages, cursor = [], None
+    while True:
+        query = apply_cursor(client.table('jobs').select('*'), cursor, ORDER, desc=True)
+        rows = query.limit(limit).execute().data
+        pages.append(rows)
+        cursor = next_cursor(rows, limit, ORDER)
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize('limit', [1, 3, 7, 20])
+def test_cursor_walks_null_created_at(stub, limit):
+    seed(stub)
+    client = create_client(stub.url, STUB_KEY)
+    pages = list_all(client, limit)
+
+    ids = [row['id'] for page in pages for row in page]
+    assert sorted(ids) == list(range(1, 21))
+    # NULL no fim, cada bloco em ordem decrescente de (created_at, id)
+    rows = [row for page in pages for row in page]
+    dated = [row for row in rows if row['created_at'] is not None]
+    assert rows[-7:] == [row for row in rows if row['created_at'] is None]
+    assert [row['id'] for row in rows[-7:]] == list(range(14, 7, -1))
+    assert dated == sorted(dated, key=lambda row: (row['created_at'], row['id']), reverse=True)
+
+def test_next_cursor_encodes_null():
+    rows = [{'id': 9, 'created_at': '2024-01-01'}, {'id': 8, 'created_at': None}]
+    cursor = next_cursor(rows, 2, ORDER)
+    assert cursor is not None
+    assert decode_cursor(cursor, ORDER) == {'created_at': None, 'id': 8}
+
+def test_cursor_without_tiebreaker_is_invalid():
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor({'created_at': '2024-01-01', 'id': None}, ORDER), ORDER)
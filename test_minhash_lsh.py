@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do MinHash + LSH (minhash_lsh.py)
+- A assinatura vetorizada em uint64 é igual à conta exata em inteiros do
+  Python (sem estouro em a*x + b)
+- Em um corpus sintético com pares de quase-duplicatas conhecidos, o índice
+  encontra os pares (recall) e não junta vagas diferentes (precisão)
+
+Uso:
+  python -m pytest test_minhash_lsh.py
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from minhash_lsh import MinHashLSH, MinHasher, _hash32, estimate_jaccard, shingles
+
+PRIME = 4294967291
+
+def reference_signature(hasher, text):
+    hashes = [_hash32(g) for g in shingles(text, hasher.shingle_size)]
+    return np.array([min((x * int(a) + int(b)) % PRIME for x in hashes)
+                     for a, b in zip(hasher.a, hasher.b)], dtype=np.uint32)
+
+def corpus(size=200, words=120, seed=7):
+    """Descrições aleatórias + uma cópia de cada com uma palavra trocada"""
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9)))
+                  for _ in range(3000)]
+    originals = [[rng.choice(vocabulary) for _ in range(words)] for _ in range(size)]
+    copies = []
+    for tokens in originals:
+        tokens = list(tokens)
+        tokens[rng.randrange(words)] = rng.choice(vocabulary)
+        copies.append(tokens)
+    return [' '.join(tokens) for tokens in originals], [' '.join(tokens) for tokens in copies]
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_signature_matches_exact_arithmetic(seed):
+    # Com 128 permutações e dezenas de shingles, a*x + b passa de 2^64 em vários pares
+    hasher = MinHasher(num_perm=128, seed=seed)
+    originals, _ = corpus(size=3)
+    for text in originals:
+        assert (hasher.signature(text) == reference_signature(hasher, text)).all()
+
+def test_empty_text_signature():
+    hasher = MinHasher(num_perm=16)
+    assert (hasher.signature('') == np.uint32(0xFFFFFFFF)).all()
+
+def test_jaccard_estimate_close_to_exact():
+    originals, copies = corpus(size=20)
+    hasher = MinHasher(num_perm=256)
+    for original, copy in zip(originals, copies):
+        a, b = shingles(original), shingles(copy)
+        exact = len(a & b) / len(a | b)
+        estimate = estimate_jaccard(hasher.signature(original), hasher.signature(copy))
+        assert abs(estimate - exact) < 0.1
+
+def test_recall_and_precision_on_known_near_duplicates():
+    originals, copies = corpus()
+    index = MinHashLSH(threshold=0.85)
+    for i, text in enumerate(originals):
+        index.insert(i, text)
+
+    found = 0
+    false_matches = 0
+    for i, text in enumerate(copies):
+        keys = [key for key, _ in index.query(text)]
+        found += i in keys
+        false_matches += sum(1 for key in keys if key != i)
+
+    assert found / len(copies) >= 0.98
+    assert false_matches == 0
+
+def test_block_restricts_candidates():
+    originals, copies = corpus(size=5)
+    index = MinHashLSH(threshold=0.85)
+    index.insert('a', originals[0], block=('Empresa A', 'São Paulo'))
+    assert index.query(copies[0], block=('Empresa B', 'São Paulo')) == []
+    assert [key for key, _ in index.query(copies[0], block=('Empresa A', 'São Paulo'))] == ['a']
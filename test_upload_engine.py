@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do UploadEngine (upload_engine.py) contra o servidor local compatível
+com o PostgREST (postgrest_stub.py)
+- Erro de dados (400) divide o lote e isola só a linha rejeitada
+- 5xx em insert simples não é reenviado nem dividido (o lote pode ter sido gravado)
+- 5xx em upsert com on_conflict é repetido até dar certo
+- Erro em on_success deixa as linhas do lote (e o contexto) em failed_rows
+
+Uso:
+  python -m pytest test_upload_engine.py
+"""
+
+import pytest
+
+from postgrest_stub import STUB_KEY, PostgRESTStub
+from upload_engine import UploadEngine
+
+@pytest.fixture
+def stub():
+    server = PostgRESTStub()
+    yield server
+    server.stop()
+
+def rows(count):
+    return [{'title': f'Vaga {i}', 'external_id': f'ext-{i}'} for i in range(count)]
+
+def upload(stub, batch, **options):
+    with UploadEngine(stub.url, STUB_KEY, workers=1, backoff_base=0.01) as engine:
+        engine.submit('jobs', batch, **options).result()
+    return engine
+
+def test_data_error_isolates_rejected_row(stub):
+    stub.fail_titles = {'Vaga 5'}
+
+    engine = upload(stub, rows(8))
+
+    assert sorted(row['title'] for row in stub.tables['jobs']) == [f'Vaga {i}' for i in range(8) if i != 5]
+    assert [row['title'] for _, row, _ in engine.failed_rows] == ['Vaga 5']
+    assert [(reason.status, reason.transient) for _, _, reason in engine.failed_rows] == [(400, False)]
+    assert engine.stats['splits'] > 0
+
+@pytest.mark.parametrize('status', [500, 502, 503, 504])
+def test_server_error_on_insert_is_not_resent(stub, status):
+    stub.status_queue = [status]
+
+    engine = upload(stub, rows(8))
+
+    assert stub.count('POST', 'jobs') == 1
+    assert engine.stats['splits'] == 0 and engine.stats['rows_sent'] == 0
+    assert len(engine.failed_rows) == 8
+    assert all(f'HTTP {status}' in reason for _, _, reason in engine.failed_rows)
+    assert all(reason.transient for _, _, reason in engine.failed_rows)
+
+def test_network_error_on_insert_is_not_resent():
+    # Porta sem servidor: erro de rede em todas as tentativas
+    with UploadEngine('http://127.0.0.1:9', STUB_KEY, workers=1, backoff_base=0.01) as engine:
+        engine.submit('jobs', rows(4)).result()
+
+    assert engine.stats['requests'] == 1 and engine.stats['splits'] == 0
+    assert len(engine.failed_rows) == 4
+    assert all(reason.status is None and reason.transient for _, _, reason in engine.failed_rows)
+
+def test_server_error_on_upsert_is_retried(stub):
+    stub.status_queue = [503, 502]
+
+    engine = upload(stub, rows(8), upsert=True, on_conflict='external_id')
+
+    assert engine.stats['retries'] == 2 and engine.stats['rows_sent'] == 8
+    assert len(stub.tables['jobs']) == 8 and not engine.failed_rows
+
+def test_follow_up_error_is_recorded(stub):
+    def on_success(returned, contexts):
+        raise ValueError('contexto inválido')
+
+    batch = rows(3)
+    with UploadEngine(stub.url, STUB_KEY, workers=1) as engine:
+        engine.submit('jobs', batch, contexts=['a', 'b', 'c'], on_success=on_success).result()
+
+    assert len(stub.tables['jobs']) == 3
+    assert [(table, row['title'], reason.context) for table, row, reason in engine.failed_rows] == [
+        ('jobs', 'Vaga 0', 'a'), ('jobs', 'Vaga 1', 'b'), ('jobs', 'Vaga 2', 'c'),
+    ]
+    assert all('contexto inválido' in reason and not reason.transient for _, _, reason in engine.failed_rows)
+    assert engine.metrics()['follow_up_failures'] == 3
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do upload em lotes de upload_jsonl_to_supabase.py contra o servidor
+local compatível com o PostgREST (postgrest_stub.py)
+- 503 em um lote segura o checkpoint antes das vagas não confirmadas, sem
+  mandá-las para a fila de rejeitadas, e o --resume envia cada vaga uma vez
+- O arquivo é lido em streaming: a leitura acompanha os lotes enviados
+
+Uso:
+  python -m pytest test_upload_jsonl_to_supabase.py
+"""
+
+import contextlib
+import io
+import json
+from collections import Counter
+
+import pytest
+
+import upload_jsonl_to_supabase
+from postgrest_stub import STUB_KEY, PostgRESTStub
+from upload_checkpoint import Checkpoint
+from upload_jsonl_to_supabase import JSONLToSupabaseUploader
+
+WORDS = ['solda', 'estoque', 'vendas', 'contabil', 'logistica', 'suporte', 'pintura', 'usinagem']
+
+def vaga(i):
+    return {
+        'id': i,
+        'informacoes_basicas': {'titulo': f'V{i}', 'fonte': f'Vaga {WORDS[i]}', 'empresa_principal': f'Empresa {i}',
+                                'setor': 'Industria'},
+        'localizacao': {'cidade_extraida': f'Cidade {i}', 'estado_extraido': 'SP'},
+        'descricao_completa': {'texto_completo': f'{WORDS[i]} ' * (i + 3)},
+    }
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = PostgRESTStub()
+    monkeypatch.setenv('SUPABASE_URL', server.url)
+    monkeypatch.setenv('SUPABASE_KEY', STUB_KEY)
+    yield server
+    server.stop()
+
+def run(tmp_path, resume=False):
+    path = str(tmp_path / 'vagas.jsonl')
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader = JSONLToSupabaseUploader()
+        uploader.upload_all_jobs(uploader.load_jsonl_data(path), batch_size=4, workers=1, jsonl_filename=path,
+                                 resume=resume, checkpoint_path=str(tmp_path / 'checkpoint.json'),
+                                 dead_letter_path=str(tmp_path / 'rejeitadas.jsonl'))
+    return Checkpoint(str(tmp_path / 'checkpoint.json')), path
+
+def write_file(tmp_path):
+    with open(tmp_path / 'vagas.jsonl', 'w', encoding='utf-8') as f:
+        for i in range(8):
+            f.write(json.dumps(vaga(i)) + '\n')
+
+def titles(stub):
+    return Counter(row['title'] for row in stub.tables.get('jobs', []))
+
+@pytest.mark.parametrize('statuses, offset, done_after, sent', [
+    ([201, 503], 4, set(), range(4)),
+    ([503, 201], 0, {4, 5, 6, 7}, range(4, 8)),
+])
+def test_transient_failure_holds_checkpoint(stub, tmp_path, statuses, offset, done_after, sent):
+    write_file(tmp_path)
+    stub.status_queue = list(statuses)
+
+    checkpoint, path = run(tmp_path)
+
+    assert checkpoint.offset(path) == offset
+    assert checkpoint.done_after(path) == done_after
+    assert titles(stub) == Counter(f'V{i}' for i in sent)
+    assert not (tmp_path / 'rejeitadas.jsonl').exists()
+
+    checkpoint, path = run(tmp_path, resume=True)
+
+    assert titles(stub) == Counter(f'V{i}' for i in range(8))
+    assert checkpoint.offset(path) == 0 and checkpoint.done_after(path) == set()
+
+def test_rejected_rows_go_to_dead_letter(stub, tmp_path):
+    write_file(tmp_path)
+    stub.fail_titles = {'V2'}
+
+    checkpoint, path = run(tmp_path)
+
+    assert sorted(titles(stub)) == [f'V{i}' for i in range(8) if i != 2]
+    rejected = [json.loads(line) for line in open(tmp_path / 'rejeitadas.jsonl', encoding='utf-8')]
+    assert [(entry['record']['title'], entry['offset']) for entry in rejected] == [('V2', 2)]
+    assert checkpoint.offset(path) == 0
+
+def test_file_is_streamed(stub, tmp_path, monkeypatch):
+    write_file(tmp_path)
+    path = str(tmp_path / 'vagas.jsonl')
+    events = []
+    submit = upload_jsonl_to_supabase.UploadEngine.submit
+    monkeypatch.setattr(upload_jsonl_to_supabase.UploadEngine, 'submit',
+                        lambda engine, *args, **kwargs: events.append('lote') or submit(engine, *args, **kwargs))
+    monkeypatch.setattr(upload_jsonl_to_supabase, 'iter_jsonl',
+                        lambda filename: (events.append('vaga') or vaga(i) for i in range(8)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader = JSONLToSupabaseUploader()
+        uploader.upload_all_jobs(uploader.load_jsonl_data(path), batch_size=4, workers=1, jsonl_filename=path,
+                                 checkpoint_path=str(tmp_path / 'checkpoint.json'),
+                                 dead_letter_path=str(tmp_path / 'rejeitadas.jsonl'))
+
+    # Cada lote é enviado antes de as vagas do próximo serem lidas
+    assert events == ['vaga'] * 4 + ['lote'] + ['vaga'] * 4 + ['lote']
+    assert uploader.loaded_jobs == 8 and len(stub.tables['jobs']) == 8
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do upload em massa de upload_vagas_to_supabase.py contra o servidor
+local compatível com o PostgREST (postgrest_stub.py)
+- Um grupo de colunas que falha no insert em massa é reenviado vaga a vaga,
+  sem reenviar as vagas dos grupos já gravados
+- Erro transitório (5xx) não avança o checkpoint além da vaga não confirmada,
+  e o --resume envia cada vaga uma única vez
+- Falha nas tabelas relacionadas vai para a fila de rejeitadas nos dois
+  caminhos (vaga a vaga e em massa)
+
+Uso:
+  python -m pytest test_upload_vagas_to_supabase.py
+"""
+
+import contextlib
+import io
+import json
+from collections import Counter
+
+import pytest
+
+import upload_vagas_to_supabase
+from postgrest_stub import STUB_KEY, PostgRESTStub
+from upload_checkpoint import Checkpoint, DeadLetterQueue
+from upload_vagas_to_supabase import SupabaseVagasUploader
+
+def vaga(titulo, salario=None):
+    return {
+        'informacoes_basicas': {'fonte': titulo, 'empresa_principal': f'Empresa {titulo}', 'setor': 'TI'},
+        'remuneracao': {'valor_minimo': salario} if salario else {},
+        'responsabilidades': {'lista_responsabilidades': [f'Tarefa de {titulo}']},
+    }
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = PostgRESTStub()
+    monkeypatch.setenv('SUPABASE_URL', server.url)
+    monkeypatch.setenv('SUPABASE_KEY', STUB_KEY)
+    monkeypatch.setattr(upload_vagas_to_supabase.time, 'sleep', lambda seconds: None)
+    yield server
+    server.stop()
+
+def upload(vagas):
+    uploader = SupabaseVagasUploader()
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploaded = uploader.upload_batch_bulk(vagas, batch_size=len(vagas))
+    return uploader, uploaded
+
+@pytest.mark.parametrize('failing_first', [False, True])
+def test_partial_group_failure_does_not_duplicate(stub, failing_first):
+    com_salario = [vaga(f'A{i}', '3000') for i in range(3)]
+    sem_salario = [vaga('B0'), vaga('RUIM'), vaga('B1')]
+    stub.fail_titles = {'RUIM'}
+    vagas = sem_salario + com_salario if failing_first else com_salario + sem_salario
+
+    uploader, uploaded = upload(vagas)
+
+    titles = Counter(row['title'] for row in stub.tables['jobs'])
+    assert titles == Counter({'A0': 1, 'A1': 1, 'A2': 1, 'B0': 1, 'B1': 1})
+    assert uploaded == uploader.stats['vagas_inseridas'] == 5
+    assert uploader.stats['erros'] == 1
+    responsibilities = Counter(row['responsibility'] for row in stub.tables['job_responsibilities'])
+    assert responsibilities == Counter({f'Tarefa de {title}': 1 for title in titles})
+    # Um insert em massa por grupo + um insert por vaga do grupo que falhou
+    assert stub.count('POST', 'jobs') == 2 + len(sem_salario)
+
+def test_bulk_without_failures(stub):
+    vagas = [vaga(f'A{i}', '3000') for i in range(3)] + [vaga(f'B{i}') for i in range(3)]
+
+    uploader, uploaded = upload(vagas)
+
+    assert uploaded == 6
+    assert sorted(row['title'] for row in stub.tables['jobs']) == ['A0', 'A1', 'A2', 'B0', 'B1', 'B2']
+    assert stub.count('POST', 'jobs') == 2
+    assert stub.count('POST', 'job_responsibilities') == 1
+
+def run_file(tmp_path, bulk, resume=False):
+    uploader = SupabaseVagasUploader()
+    with contextlib.redirect_stdout(io.StringIO()):
+        uploader.load_and_upload_json(str(tmp_path / 'vagas.jsonl'), bulk=bulk, batch_size=4, resume=resume,
+                                      checkpoint_path=str(tmp_path / 'checkpoint.json'),
+                                      dead_letter_path=str(tmp_path / 'rejeitadas.jsonl'))
+    return uploader
+
+def write_file(tmp_path, stub, count=8):
+    vagas = [vaga(f'V{i}') for i in range(count)]
+    with open(tmp_path / 'vagas.jsonl', 'w', encoding='utf-8') as f:
+        for item in vagas:
+            f.write(json.dumps(item) + '\n')
+    # Empresas já existentes: os únicos POSTs são os de jobs e das tabelas filhas
+    stub.tables['companies'] = [{'id': i + 1, 'name': f'Empresa V{i}'} for i in range(count)]
+    return [f'V{i}' for i in range(count)]
+
+def dead_letters(tmp_path):
+    path = tmp_path / 'rejeitadas.jsonl'
+    return [json.loads(line) for line in open(path, encoding='utf-8')] if path.exists() else []
+
+def test_transient_bulk_failure_keeps_checkpoint(stub, tmp_path):
+    titles = write_file(tmp_path, stub)
+    # Lote 1: jobs e filhas gravados; lote 2: 503 no insert das vagas
+    stub.status_queue = [201, 201, 503]
+
+    run_file(tmp_path, bulk=True)
+
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    assert checkpoint.offset(str(tmp_path / 'vagas.jsonl')) == 4
+    assert [row['title'] for row in stub.tables['jobs']] == titles[:4]
+    assert dead_letters(tmp_path) == []
+
+    run_file(tmp_path, bulk=True, resume=True)
+
+    assert Counter(row['title'] for row in stub.tables['jobs']) == Counter(titles)
+    assert Checkpoint(str(tmp_path / 'checkpoint.json')).offset(str(tmp_path / 'vagas.jsonl')) == 0
+
+def test_transient_row_failure_resends_only_unconfirmed(stub, tmp_path):
+    titles = write_file(tmp_path, stub)
+    stub.status_queue = [503]
+
+    run_file(tmp_path, bulk=False)
+
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    assert checkpoint.offset(str(tmp_path / 'vagas.jsonl')) == 0
+    assert checkpoint.done_after(str(tmp_path / 'vagas.jsonl')) == {1, 2, 3}
+    assert [row['title'] for row in stub.tables['jobs']] == titles[1:4]
+
+    run_file(tmp_path, bulk=False, resume=True)
+
+    assert Counter(row['title'] for row in stub.tables['jobs']) == Counter(titles)
+    assert dead_letters(tmp_path) == []
+
+def test_permanent_rejection_advances_checkpoint(stub, tmp_path):
+    titles = write_file(tmp_path, stub)
+    stub.fail_titles = {'V2'}
+
+    uploader = run_file(tmp_path, bulk=False)
+
+    assert sorted(row['title'] for row in stub.tables['jobs']) == [t for t in titles if t != 'V2']
+    assert [entry['record']['informacoes_basicas']['fonte'] for entry in dead_letters(tmp_path)] == ['V2']
+    assert Checkpoint(str(tmp_path / 'checkpoint.json')).offset(str(tmp_path / 'vagas.jsonl')) == 0
+    assert uploader.stats['vagas_inseridas'] == 7
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_related_failure_goes_to_dead_letter(stub, tmp_path, bulk):
+    vagas = [vaga('V0')]
+    stub.tables['companies'] = [{'id': 1, 'name': 'Empresa V0'}]
+    # POST em jobs grava, POST em job_responsibilities é recusado
+    stub.status_queue = [201, 400]
+    uploader = SupabaseVagasUploader()
+    uploader.dead_letter = DeadLetterQueue(str(tmp_path / 'rejeitadas.jsonl'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        if bulk:
+            uploader.upload_batch_bulk(vagas)
+        else:
+            uploader.upload_batch(vagas)
+    uploader.dead_letter.close()
+
+    assert [row['title'] for row in stub.tables['jobs']] == ['V0']
+    assert [(entry['table'], entry['record'][0]['responsibility']) for entry in dead_letters(tmp_path)] == [
+        ('job_responsibilities', 'Tarefa de V0'),
+    ]
+
+def test_final_stats_without_jobs(stub):
+    uploader = SupabaseVagasUploader()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        uploader.print_final_stats()
+    assert 'Nenhuma vaga foi inserida' in output.getvalue()
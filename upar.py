@@ -11,6 +11,7 @@ Uso:
   export SUPABASE_URL="https://<your-project>.supabase.co"
   export SUPABASE_SERVICE_ROLE_KEY="<service-role-key>"
   python upload_csv_supabase.py --csv vagas.csv --table jobs --batch-size 300
+  python upload_csv_supabase.py --csv vagas.csv --dsn postgresql://postgres:<senha>@<host>:5432/postgres
 
 Dica:
   Use --dry-run para só ver o que seria enviado (sem gravar).
@@ -197,6 +198,23 @@ def upload_csv(csv_path: str, table: str = "jobs", batch_size: int = 300, dry_ru
 
     print(f"Concluído. Linhas lidas: {total}. Registros enviados: {enviados} (tabela: {table}). {'[DRY RUN]' if dry_run else ''}")
 
+# --------- Carga direta via COPY (DSN do Postgres) ---------------
+def upload_csv_copy(csv_path: str, dsn: str, table: str = "jobs", dry_run: bool = False) -> None:
+    """Mesma normalização de upload_csv, mas via COPY + merge por link em uma transação."""
+    from copy_loader import merge_table
+
+    print(f"Iniciando carga via COPY do arquivo: {csv_path}")
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = (payload for payload in map(row_to_db, reader) if payload.get("link"))
+        if dry_run:
+            print(f"Concluído. Registros válidos: {sum(1 for _ in rows)} (tabela: {table}). [DRY RUN]")
+            return
+        stats = merge_table(dsn, table, list(CSV_TO_DB.values()), rows, conflict_key="link")
+
+    print(f"Concluído. Registros enviados: {stats['staged']}, gravados: {stats['merged']} "
+          f"(tabela: {table}) em {stats['elapsed_seconds']}s ({stats['rows_per_second']} linhas/s)")
+
 # --------- CLI ----------------------------------------------------
 def main():
     parser = argparse.ArgumentParser(description="Upload de CSV para Supabase (tabela jobs) com upsert por link.")
@@ -204,10 +222,14 @@ def main():
     parser.add_argument("--table", default="jobs", help="Nome da tabela (default: jobs)")
     parser.add_argument("--batch-size", type=int, default=300, help="Tamanho do lote (default: 300)")
     parser.add_argument("--dry-run", action="store_true", help="Não grava no banco; só simula/processa")
+    parser.add_argument("--dsn", help="DSN do Postgres: carrega via COPY direto no banco (sem a API REST)")
     args = parser.parse_args()
 
     try:
-        upload_csv(args.csv, table=args.table, batch_size=args.batch_size, dry_run=args.dry_run)
+        if args.dsn:
+            upload_csv_copy(args.csv, args.dsn, table=args.table, dry_run=args.dry_run)
+        else:
+            upload_csv(args.csv, table=args.table, batch_size=args.batch_size, dry_run=args.dry_run)
     except Exception as e:
         print(f"Erro ao enviar CSV: {e}")
         raise
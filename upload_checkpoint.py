@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checkpoints e fila de rejeitadas (dead-letter) para uploads longos
+- Checkpoint: JSON com, por arquivo de entrada, quantas vagas já foram
+  confirmadas ou rejeitadas de vez (lotes concluídos em sequência), mais as
+  posições já resolvidas depois desse ponto. --resume continua dali.
+  Se o arquivo de entrada mudou (tamanho/data), o checkpoint é ignorado.
+- DeadLetterQueue: JSONL com cada vaga rejeitada, o motivo e a posição na
+  entrada, para corrigir e reenviar só o que falhou
+- is_transient_error: erros de rede/5xx, em que a vaga não foi rejeitada e
+  deve ser reenviada pelo --resume (não vai para a fila de rejeitadas)
+
+Uso:
+  checkpoint = Checkpoint()
+  start = checkpoint.offset(arquivo) if resume else 0
+  ...
+  checkpoint.save(arquivo, offset_confirmado)
+  checkpoint.clear(arquivo)   # upload concluído
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+import httpx
+
+# Classes de SQLSTATE de falhas passageiras: conexão, transação abortada
+# (deadlock/serialização), recursos insuficientes e intervenção do operador (timeout)
+TRANSIENT_SQLSTATE_CLASSES = ('08', '40', '53', '57')
+# Erros do PostgREST sem conexão com o banco ou com timeout no pool
+TRANSIENT_POSTGREST_CODES = {'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003'}
+
+DEFAULT_CHECKPOINT_PATH = 'upload_checkpoint.json'
+DEFAULT_DEAD_LETTER_PATH = 'upload_dead_letter.jsonl'
+
+def is_transient_error(error: Any) -> bool:
+    """True para falhas em que a vaga não foi rejeitada pelo banco (rede, 5xx,
+    429, timeout): o envio pode ser repetido mais tarde"""
+    # upload_engine.FailureReason já traz a classificação
+    transient = getattr(error, 'transient', None)
+    if isinstance(transient, bool):
+        return transient
+    if isinstance(error, httpx.TransportError):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        # postgrest-py sem corpo JSON (ex.: 502/504 do proxy): code é o status HTTP
+        return code >= 500 or code == 429
+    if isinstance(code, str):
+        return code in TRANSIENT_POSTGREST_CODES or code[:2] in TRANSIENT_SQLSTATE_CLASSES
+    return False
+
+def _file_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+class Checkpoint:
+    """Offset confirmado por arquivo de entrada, gravado de forma atômica"""
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Checkpoint ilegível ({path}): {e}. Ignorando.")
+
+    @staticmethod
+    def _key(input_file: str) -> str:
+        return os.path.abspath(input_file)
+
+    def _entry(self, input_file: str, warn: bool = True) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(self._key(input_file))
+        if not entry:
+            return None
+        if {k: entry.get(k) for k in ('size', 'mtime')} != _file_signature(input_file):
+            if warn:
+                print(f"⚠️ {input_file} mudou desde o checkpoint; recomeçando do início")
+            return None
+        return entry
+
+    def offset(self, input_file: str) -> int:
+        """Vagas já confirmadas deste arquivo (0 se não há checkpoint válido)"""
+        entry = self._entry(input_file)
+        return int(entry.get('offset', 0)) if entry else 0
+
+    def done_after(self, input_file: str) -> Set[int]:
+        """Posições depois do offset já confirmadas ou rejeitadas (não reenviar)"""
+        entry = self._entry(input_file, warn=False)
+        return set(entry.get('done_after', [])) if entry else set()
+
+    def save(self, input_file: str, offset: int, done_after: Iterable[int] = ()) -> None:
+        entry = {
+            'offset': offset,
+            **_file_signature(input_file),
+            'updated_at': datetime.now().isoformat(),
+        }
+        done_after = sorted(position for position in done_after if position >= offset)
+        if done_after:
+            entry['done_after'] = done_after
+        self.entries[self._key(input_file)] = entry
+        self._write()
+
+    def clear(self, input_file: str) -> None:
+        if self.entries.pop(self._key(input_file), None) is not None:
+            self._write()
+
+    def _write(self) -> None:
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+class DeadLetterQueue:
+    """Vagas rejeitadas em JSONL (uma por linha, com motivo), gravadas na hora"""
+
+    def __init__(self, path: str = DEFAULT_DEAD_LETTER_PATH, source: Optional[str] = None):
+        self.path = path
+        self.source = source
+        self.count = 0
+        self._handle = None
+
+    def add(self, record: Any, reason: str, offset: Optional[int] = None,
+            table: Optional[str] = None) -> None:
+        if self._handle is None:
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        entry = {
+            'source': self.source,
+            'offset': offset,
+            'table': table,
+            'reason': str(reason),
+            'failed_at': datetime.now().isoformat(),
+            'record': record,
+        }
+        self._handle.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+        self._handle.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.count:
+            print(f"📮 {self.count} vagas rejeitadas gravadas em {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
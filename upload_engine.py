@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de upload concorrente para o PostgREST do Supabase
+- Pool limitado de threads compartilhando um pool de conexões HTTP (httpx)
+- Backpressure: submit() bloqueia quando já há max_pending lotes em andamento
+- Retentativas com backoff exponencial (+ jitter, respeitando Retry-After):
+  429 sempre; 5xx e erros de rede só em lotes idempotentes (upsert com on_conflict)
+- Lote rejeitado por erro de dados (400/409/422) é dividido ao meio até isolar
+  a(s) linha(s) com problema; as demais seguem normalmente e as rejeitadas
+  ficam em failed_rows com o motivo
+- Demais falhas (5xx, erro de rede, 429 após as retentativas) não são
+  reenviadas: o servidor pode ter gravado o lote antes de a resposta se
+  perder, então o lote inteiro vai para failed_rows
+- O motivo em failed_rows é um FailureReason: o texto do erro, com o status
+  HTTP e se a falha é passageira (rede, 5xx, 429) e pode ser reenviada depois
+- Erro em on_success (linhas das tabelas filhas) também vai para failed_rows:
+  as linhas do lote pai, com o contexto de cada uma no motivo
+- Métricas de vazão (linhas/s, requisições, retentativas, falhas)
+
+Uso:
+  with UploadEngine(SUPABASE_URL, SUPABASE_KEY, workers=4) as engine:
+      for lote in lotes:
+          engine.submit('jobs', lote)
+  engine.print_metrics()
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+# Erros de dados: o lote não foi gravado e dividi-lo isola a linha com problema
+SPLITTABLE_STATUS = {400, 409, 422}
+
+class FailureReason(str):
+    """Motivo de uma linha em failed_rows (status None em erro de rede; context
+    é o contexto da linha quando a falha foi em on_success)"""
+
+    def __new__(cls, message: str, status: Optional[int] = None, transient: Optional[bool] = None,
+                context: Any = None):
+        reason = super().__new__(cls, message)
+        reason.status = status
+        reason.transient = (status is None or status >= 500 or status == 429) if transient is None else transient
+        reason.context = context
+        return reason
+
+# on_success(linhas_retornadas, contextos) -> [(tabela, linhas), ...] a enviar em seguida
+SuccessCallback = Callable[[List[Dict[str, Any]], List[Any]], Optional[List[Tuple[str, List[Dict[str, Any]]]]]]
+
+class UploadEngine:
+    """Envia lotes para tabelas do PostgREST com workers concorrentes"""
+
+    def __init__(self, supabase_url: str, supabase_key: str, workers: int = 4,
+                 max_pending: Optional[int] = None, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, timeout: float = 60.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = httpx.Client(
+            base_url=f"{supabase_url.rstrip('/')}/rest/v1",
+            headers={
+                'apikey': supabase_key,
+                'Authorization': f'Bearer {supabase_key}',
+                'Content-Type': 'application/json',
+            },
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=workers, max_keepalive_connections=workers),
+        )
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload')
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        self.failed_rows: List[Tuple[str, Dict[str, Any], str]] = []
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.stats = {
+            'rows_sent': 0,
+            'rows_failed': 0,
+            'batches': 0,
+            'requests': 0,
+            'retries': 0,
+            'splits': 0,
+            'follow_up_failures': 0,
+        }
+
+    # ------------------------------------------------------------------ API
+    def submit(self, table: str, rows: Sequence[Dict[str, Any]], contexts: Optional[Sequence[Any]] = None,
+               on_success: Optional[SuccessCallback] = None, upsert: bool = False,
+               on_conflict: Optional[str] = None) -> Future:
+        """Agenda o envio de um lote (bloqueia se houver lotes demais pendentes)"""
+        rows = list(rows)
+        contexts = list(contexts) if contexts is not None else [None] * len(rows)
+        self.slots.acquire()
+        try:
+            future = self.pool.submit(self._run, table, rows, contexts, on_success, upsert, on_conflict)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def close(self) -> None:
+        """Aguarda os lotes pendentes e libera as conexões"""
+        self.pool.shutdown(wait=True)
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self.stats)
+        elapsed = time.monotonic() - self._started
+        snapshot['elapsed_seconds'] = round(elapsed, 2)
+        snapshot['rows_per_second'] = round(snapshot['rows_sent'] / elapsed, 1) if elapsed else 0.0
+        return snapshot
+
+    def print_metrics(self) -> None:
+        m = self.metrics()
+        print(f"📈 Upload: {m['rows_sent']} linhas em {m['elapsed_seconds']}s "
+              f"({m['rows_per_second']} linhas/s)")
+        print(f"   Requisições: {m['requests']} | Retentativas: {m['retries']} | "
+              f"Divisões de lote: {m['splits']} | Linhas rejeitadas: {m['rows_failed']}")
+        if m['follow_up_failures']:
+            print(f"   ⚠️ Linhas gravadas sem as tabelas filhas (erro no pós-envio): {m['follow_up_failures']}")
+
+    # ------------------------------------------------------------ internos
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _run(self, table, rows, contexts, on_success, upsert, on_conflict) -> int:
+        self._count(batches=1)
+        # O PostgREST exige as mesmas chaves em todas as linhas de um insert em massa
+        groups: Dict[tuple, List[int]] = {}
+        for index, row in enumerate(rows):
+            groups.setdefault(tuple(sorted(row)), []).append(index)
+        sent = 0
+        for indexes in groups.values():
+            sent += self._send_split(
+                table, [rows[i] for i in indexes], [contexts[i] for i in indexes],
+                on_success, upsert, on_conflict
+            )
+        return sent
+
+    def _send_split(self, table, rows, contexts, on_success, upsert, on_conflict) -> int:
+        ok, result, status = self._post(table, rows, upsert, on_conflict, want_rows=on_success is not None)
+        if ok:
+            self._count(rows_sent=len(rows))
+            if on_success is not None:
+                self._follow_up(table, rows, on_success, result, contexts)
+            return len(rows)
+
+        if len(rows) > 1 and status in SPLITTABLE_STATUS:
+            self._count(splits=1)
+            middle = len(rows) // 2
+            return (
+                self._send_split(table, rows[:middle], contexts[:middle], on_success, upsert, on_conflict) +
+                self._send_split(table, rows[middle:], contexts[middle:], on_success, upsert, on_conflict)
+            )
+
+        # Linha rejeitada, ou falha em que o lote pode ter sido gravado: não reenvia
+        self._count(rows_failed=len(rows))
+        with self._lock:
+            self.failed_rows.extend((table, row, result) for row in rows)
+        return 0
+
+    def _follow_up(self, table, rows, on_success, returned_rows, contexts) -> None:
+        try:
+            follow_ups = on_success(returned_rows, contexts) or []
+        except Exception as e:
+            # As linhas do lote já foram gravadas, mas as das tabelas filhas se perderam
+            print(f"⚠️ Erro no processamento pós-envio: {e}")
+            self._count(follow_up_failures=len(rows))
+            with self._lock:
+                self.failed_rows.extend(
+                    (table, row, FailureReason(f'erro no pós-envio: {e}', transient=False, context=context))
+                    for row, context in zip(rows, contexts)
+                )
+            return
+        for child_table, child_rows in follow_ups:
+            if child_rows:
+                self._send_split(child_table, list(child_rows), [None] * len(child_rows), None, False, None)
+
+    def _post(self, table, rows, upsert, on_conflict, want_rows) -> Tuple[bool, Any, Optional[int]]:
+        """POST com retentativas; retorna (True, linhas, status) ou (False, motivo, status),
+        com status None em erro de rede"""
+        prefer = ['return=representation' if want_rows else 'return=minimal']
+        if upsert:
+            prefer.append('resolution=merge-duplicates')
+        params = {'on_conflict': on_conflict} if on_conflict else None
+        idempotent = upsert and bool(on_conflict)
+
+        attempt = 0
+        while True:
+            self._count(requests=1)
+            retry_after = status = None
+            try:
+                response = self.client.post(f'/{table}', json=rows, params=params,
+                                            headers={'Prefer': ','.join(prefer)})
+            except httpx.TransportError as e:
+                reason, retryable = FailureReason(f'erro de rede: {e}'), idempotent
+            else:
+                status = response.status_code
+                if status < 300:
+                    return True, (response.json() if want_rows and response.content else []), status
+                reason = FailureReason(f'HTTP {status}: {response.text[:300]}', status)
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in RETRYABLE_STATUS
+                )
+                retry_after = response.headers.get('Retry-After')
+
+            if not retryable or attempt >= self.max_retries:
+                return False, reason, status
+
+            attempt += 1
+            self._count(retries=1)
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            time.sleep(delay * random.uniform(0.5, 1.0) if not retry_after else delay)
@@ -5,6 +5,7 @@ Script para fazer upload do arquivo vagas_todos_setores_estruturadas_completo.js
 para o Supabase, garantindo vagas únicas e setores sem acentos.
 """
 
+import argparse
 import json
 import os
 import pandas as pd
@@ -13,7 +14,14 @@ from datetime import datetime
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import hashlib
-import time
+
+from dedup import Deduplicator, ESTRUTURADA_FIELDS
+from upload_engine import UploadEngine
+from differential_sync import sync_table
+from job_stream import batched, iter_jsonl
+from upload_checkpoint import (
+    Checkpoint, DeadLetterQueue, DEFAULT_CHECKPOINT_PATH, DEFAULT_DEAD_LETTER_PATH, is_transient_error
+)
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -28,6 +36,8 @@ class JSONLToSupabaseUploader:
         
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
         self.sector_map = self.load_sector_map()
+        self.loaded_jobs = 0
+        self.skipped_jobs = 0
         
     def load_sector_map(self):
         """Carrega o mapeamento de setores do CSV"""
@@ -124,26 +134,19 @@ class JSONLToSupabaseUploader:
             raise
     
     def load_jsonl_data(self, filename):
-        """Carrega dados do arquivo JSONL"""
+        """Lê o arquivo JSONL em streaming, uma vaga por vez (conta em self.loaded_jobs)"""
         print(f"Carregando dados de {filename}...")
-        jobs_data = []
+        self.loaded_jobs = 0
         
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    if line.strip():
-                        try:
-                            job_data = json.loads(line)
-                            jobs_data.append(job_data)
-                        except json.JSONDecodeError as e:
-                            print(f"Erro ao decodificar JSON na linha {line_num}: {e}")
-                            continue
-            
-            print(f"Total de vagas carregadas: {len(jobs_data)}")
-            return jobs_data
+            for job_data in iter_jsonl(filename):
+                self.loaded_jobs += 1
+                yield job_data
         except Exception as e:
             print(f"Erro ao carregar arquivo JSONL: {e}")
             raise
+        
+        print(f"Total de vagas carregadas: {self.loaded_jobs}")
     
     def upload_jobs_batch(self, jobs_batch):
         """Faz upload de um lote de vagas"""
@@ -154,41 +157,141 @@ class JSONLToSupabaseUploader:
             print(f"Erro ao fazer upload do lote: {e}")
             return 0
     
-    def upload_all_jobs(self, jobs_data, batch_size=50):
-        """Faz upload de todas as vagas em lotes"""
-        print(f"Iniciando upload de {len(jobs_data)} vagas em lotes de {batch_size}...")
-        
-        mapped_jobs = []
-        skipped_jobs = 0
+    def iter_mapped_jobs(self, jobs_data, dead_letter=None):
+        """Remove duplicatas e mapeia as vagas para a tabela jobs, uma a uma"""
+        self.skipped_jobs = 0
+        mapped = 0
         
-        # Mapeia todos os jobs
-        for job_data in jobs_data:
+        # Remove duplicatas com a mesma regra dos scripts de normalização
+        dedup = Deduplicator(ESTRUTURADA_FIELDS)
+        for job_data in dedup.filter(jobs_data):
             try:
                 mapped_job = self.map_jsonl_to_jobs_table(job_data)
-                mapped_jobs.append(mapped_job)
             except Exception as e:
                 print(f"Erro ao mapear job ID {job_data.get('id', 'N/A')}: {e}")
-                skipped_jobs += 1
+                if dead_letter is not None:
+                    dead_letter.add(job_data, f"erro de mapeamento: {e}")
+                self.skipped_jobs += 1
                 continue
+            mapped += 1
+            yield mapped_job
         
-        print(f"Jobs mapeados: {len(mapped_jobs)}, Jobs ignorados: {skipped_jobs}")
+        duplicated = dedup.counts['exact'] + dedup.counts['near']
+        if duplicated:
+            print(f"Duplicatas ignoradas: {duplicated}")
+        print(f"Jobs mapeados: {mapped}, Jobs ignorados: {self.skipped_jobs}")
+    
+    def map_all_jobs(self, jobs_data, dead_letter=None):
+        """Remove duplicatas e mapeia as vagas para a tabela jobs (lista completa)"""
+        return list(self.iter_mapped_jobs(jobs_data, dead_letter=dead_letter))
+    
+    def upload_all_jobs(self, jobs_data, batch_size=50, workers=4, jsonl_filename=None,
+                        resume=False, checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+                        dead_letter_path=DEFAULT_DEAD_LETTER_PATH):
+        """Faz upload de todas as vagas em lotes.
         
-        # Upload em lotes
-        uploaded_count = 0
-        total_batches = (len(mapped_jobs) + batch_size - 1) // batch_size
+        Com jsonl_filename, grava no checkpoint até onde as vagas mapeadas já
+        foram confirmadas ou rejeitadas de vez; resume=True continua dali.
+        Vagas rejeitadas vão para o JSONL de rejeitadas com o motivo; vagas que
+        falharam por erro passageiro (rede, 5xx) seguram o checkpoint e são
+        reenviadas no --resume.
+        """
+        print(f"Iniciando upload em lotes de {batch_size}...")
         
-        for i in range(0, len(mapped_jobs), batch_size):
-            batch = mapped_jobs[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
+        checkpoint = Checkpoint(checkpoint_path) if jsonl_filename else None
+        dead_letter = DeadLetterQueue(dead_letter_path, source=jsonl_filename)
+        try:
+            # As vagas são lidas, mapeadas e enviadas em streaming: a posição de
+            # cada uma na sequência mapeada é a mesma em toda execução
+            mapped_jobs = self.iter_mapped_jobs(jobs_data, dead_letter=dead_letter)
+            total = 0
+            
+            start = checkpoint.offset(jsonl_filename) if checkpoint and resume else 0
+            skip = checkpoint.done_after(jsonl_filename) if checkpoint and resume else set()
+            if start:
+                print(f"Retomando do checkpoint: {start} vagas já enviadas")
+            
+            # Os lotes terminam fora de ordem: o checkpoint só avança até a
+            # primeira posição ainda não resolvida (lote pendente ou falha passageira)
+            pending = []
+            confirmed = start
+            resolved = set(skip)
+            transient_failures = []
+            failures = {}
+            seen_failures = 0
+            
+            def settle(positions, batch):
+                """Resolve as posições de um lote concluído; falhas passageiras ficam de fora"""
+                for position, job in zip(positions, batch):
+                    failure = failures.pop(id(job), None)
+                    if failure is None:
+                        resolved.add(position)
+                        continue
+                    table, reason = failure
+                    if is_transient_error(reason):
+                        transient_failures.append((job, reason))
+                    else:
+                        dead_letter.add(job, reason, offset=position, table=table)
+                        resolved.add(position)
             
-            print(f"Uploading lote {batch_num}/{total_batches} ({len(batch)} vagas)...")
+            def advance():
+                nonlocal confirmed, seen_failures
+                # Linhas com falha ainda vivas (no lote pendente): id() identifica a vaga
+                for table, job, reason in engine.failed_rows[seen_failures:]:
+                    failures[id(job)] = (table, reason)
+                seen_failures = len(engine.failed_rows)
+                done = [item for item in pending if item[0].done()]
+                for item in done:
+                    pending.remove(item)
+                    future, positions, batch = item
+                    if future.exception() is not None:
+                        # Lote interrompido sem resultado: nada confirmado, reenviado no --resume
+                        print(f"Erro inesperado no lote: {future.exception()}")
+                        continue
+                    settle(positions, batch)
+                if not done:
+                    return
+                while confirmed in resolved:
+                    resolved.discard(confirmed)
+                    confirmed += 1
+                if checkpoint:
+                    checkpoint.save(jsonl_filename, confirmed, resolved)
             
-            uploaded = self.upload_jobs_batch(batch)
-            uploaded_count += uploaded
+            def todo():
+                nonlocal total
+                for position, job in enumerate(mapped_jobs):
+                    total = position + 1
+                    if position >= start and position not in skip:
+                        yield position, job
             
-            # Pausa para evitar rate limiting
-            if batch_num < total_batches:
-                time.sleep(1)
+            engine = None
+            try:
+                # Upload em lotes paralelos (backpressure e backoff em 429 no lugar das pausas fixas)
+                with UploadEngine(self.supabase_url, self.supabase_key, workers=workers) as engine:
+                    for batch_num, items in enumerate(batched(todo(), batch_size), 1):
+                        positions = [position for position, _ in items]
+                        batch = [job for _, job in items]
+                        
+                        print(f"Uploading lote {batch_num} ({len(batch)} vagas)...")
+                        pending.append((engine.submit('jobs', batch, upsert=True), positions, batch))
+                        advance()
+            finally:
+                # Mesmo se interrompido, os lotes já concluídos entram no checkpoint
+                # e as vagas rejeitadas na fila
+                if engine is not None:
+                    advance()
+            for job, reason in transient_failures:
+                print(f"Falha passageira ao enviar vaga {job.get('external_id', 'N/A')} "
+                      f"(será reenviada com --resume): {reason}")
+            uploaded_count = engine.stats['rows_sent']
+            engine.print_metrics()
+            
+            if checkpoint and confirmed == total:
+                checkpoint.clear(jsonl_filename)
+            elif checkpoint:
+                print(f"Upload interrompido em {confirmed}/{total} vagas; use --resume para continuar")
+        finally:
+            dead_letter.close()
         
         print(f"Upload concluído! Total de vagas enviadas: {uploaded_count}")
         return uploaded_count
@@ -216,30 +319,39 @@ class JSONLToSupabaseUploader:
             print(f"Erro ao verificar upload: {e}")
             return 0
     
-    def run_full_upload(self, jsonl_filename='vagas_todos_setores_estruturadas_completo.jsonl'):
-        """Executa o processo completo de upload"""
+    def run_full_upload(self, jsonl_filename='vagas_todos_setores_estruturadas_completo.jsonl',
+                        resume=False, checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+                        dead_letter_path=DEFAULT_DEAD_LETTER_PATH):
+        """Executa o processo completo de upload (resume=True continua do checkpoint)"""
         print("=== INICIANDO UPLOAD COMPLETO DO JSONL PARA SUPABASE ===")
         print(f"Timestamp: {datetime.now()}")
         
         try:
-            # 1. Backup
-            backup_file = self.backup_current_jobs()
-            
-            # 2. Limpar tabela
-            self.clear_jobs_table()
+            # Retomada: a tabela já tem os lotes confirmados, não pode ser limpa
+            resuming = resume and Checkpoint(checkpoint_path).offset(jsonl_filename) > 0
+            backup_file = None
+            if not resuming:
+                # 1. Backup
+                backup_file = self.backup_current_jobs()
+                
+                # 2. Limpar tabela
+                self.clear_jobs_table()
             
             # 3. Carregar dados do JSONL
             jobs_data = self.load_jsonl_data(jsonl_filename)
             
             # 4. Upload
-            uploaded_count = self.upload_all_jobs(jobs_data)
+            uploaded_count = self.upload_all_jobs(
+                jobs_data, jsonl_filename=jsonl_filename, resume=resuming,
+                checkpoint_path=checkpoint_path, dead_letter_path=dead_letter_path
+            )
             
             # 5. Verificação
             final_count = self.verify_upload()
             
             print("\n=== RESUMO DO UPLOAD ===")
             print(f"Arquivo processado: {jsonl_filename}")
-            print(f"Vagas no arquivo: {len(jobs_data)}")
+            print(f"Vagas no arquivo: {self.loaded_jobs}")
             print(f"Vagas enviadas: {uploaded_count}")
             print(f"Vagas na tabela final: {final_count}")
             print(f"Backup salvo em: {backup_file}")
@@ -249,6 +361,49 @@ class JSONLToSupabaseUploader:
             print(f"Erro durante o upload: {e}")
             raise
 
+    def run_sync(self, jsonl_filename='vagas_todos_setores_estruturadas_completo.jsonl', dry_run=False,
+                 delete_missing=False, force_delete=False):
+        """Sincroniza a tabela jobs com o JSONL enviando só a diferença (sem limpar a tabela).
+        
+        delete_missing apaga as vagas que não estão no arquivo (recusado com
+        vagas ignoradas no mapeamento ou acima do limite, sem force_delete).
+        """
+        print("=== INICIANDO SINCRONIZAÇÃO DIFERENCIAL DO JSONL PARA SUPABASE ===")
+        print(f"Timestamp: {datetime.now()}")
+        
+        jobs_data = self.load_jsonl_data(jsonl_filename)
+        mapped_jobs = self.map_all_jobs(jobs_data)
+        stats = sync_table(self.supabase, 'jobs', mapped_jobs, dry_run=dry_run, load_errors=self.skipped_jobs,
+                           delete_missing=delete_missing, force_delete=force_delete)
+        
+        print("\n=== RESUMO DA SINCRONIZAÇÃO ===")
+        print(f"Arquivo processado: {jsonl_filename}")
+        print(f"Vagas no arquivo: {self.loaded_jobs}")
+        for name, value in stats.items():
+            print(f"{name}: {value}")
+        return stats
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Upload do JSONL estruturado para a tabela jobs')
+    parser.add_argument('jsonl_file', nargs='?', default='vagas_todos_setores_estruturadas_completo.jsonl')
+    parser.add_argument('--sync', action='store_true',
+                        help='Sincronização diferencial por external_id em vez de limpar e recarregar')
+    parser.add_argument('--dry-run', action='store_true', help='Com --sync, só mostra o que mudaria')
+    parser.add_argument('--delete-missing', action='store_true',
+                        help='Com --sync, apaga as vagas que não estão no arquivo')
+    parser.add_argument('--force-delete', action='store_true',
+                        help='Com --delete-missing, apaga mesmo acima do limite de segurança')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continua do último lote confirmado no checkpoint, sem limpar a tabela')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help='Arquivo de checkpoint')
+    parser.add_argument('--dead-letter', default=DEFAULT_DEAD_LETTER_PATH,
+                        help='JSONL onde as vagas rejeitadas são gravadas com o motivo')
+    args = parser.parse_args()
+    
     uploader = JSONLToSupabaseUploader()
-    uploader.run_full_upload()
\ No newline at end of file
+    if args.sync:
+        uploader.run_sync(args.jsonl_file, dry_run=args.dry_run, delete_missing=args.delete_missing,
+                          force_delete=args.force_delete)
+    else:
+        uploader.run_full_upload(args.jsonl_file, resume=args.resume, checkpoint_path=args.checkpoint,
+                                 dead_letter_path=args.dead_letter)
@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 from typing import List, Dict, Any
 import time
 
+from response_cache import invalidate_api_cache
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -234,6 +236,7 @@ def main():
     # Verificar resultado
     print("\n🔍 Verificando resultado do upload...")
     verification = verify_upload(supabase)
+    invalidate_api_cache()
     
     print(f"\n=== RELATÓRIO FINAL ===")
     print(f"Vagas carregadas do arquivo: {len(jobs)}")
@@ -6,24 +6,43 @@ Usa a biblioteca supabase-py para inserção em lotes
 
 import os
 import json
+import argparse
 from datetime import datetime, date
+from itertools import islice
 from decimal import Decimal
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+import batch_normalizer
+from batch_normalizer import REJECT_NOT_DICT, normalize_vagas
+from company_cache import CompanyCache
+from job_stream import batched, iter_jobs
+from upload_checkpoint import (
+    Checkpoint, DeadLetterQueue, DEFAULT_CHECKPOINT_PATH, DEFAULT_DEAD_LETTER_PATH, is_transient_error
+)
+
+# Vagas normalizadas por vez na carga via COPY
+NORMALIZE_CHUNK_SIZE = 1000
 
 class SupabaseVagasUploader:
-    def __init__(self):
+    def __init__(self, connect: bool = True):
         load_dotenv()
         
         self.url = os.environ.get("SUPABASE_URL")
         self.key = os.environ.get("SUPABASE_KEY")
+        self.supabase: Optional[Client] = None
+        self.companies: Optional[CompanyCache] = None
         
-        if not self.url or not self.key:
-            raise ValueError("❌ Variáveis SUPABASE_URL e SUPABASE_KEY não encontradas no .env")
+        # connect=False: só normalização (ex.: carga via COPY com --dsn)
+        if connect:
+            if not self.url or not self.key:
+                raise ValueError("❌ Variáveis SUPABASE_URL e SUPABASE_KEY não encontradas no .env")
+            
+            self.supabase = create_client(self.url, self.key)
+            self.companies = CompanyCache(self.supabase)
         
-        self.supabase: Client = create_client(self.url, self.key)
         self.stats = {
             'total_vagas': 0,
             'vagas_inseridas': 0,
@@ -32,85 +51,37 @@ class SupabaseVagasUploader:
             'inicio': datetime.now()
         }
         
-        print(f"✅ Conectado ao Supabase: {self.url}")
+        # Fila de vagas rejeitadas, posição (na entrada) do lote em andamento e
+        # vagas do lote que falharam por erro transitório (ficam para o --resume)
+        self.dead_letter: Optional[DeadLetterQueue] = None
+        self.batch_offset = 0
+        self.transient_failures: List[Dict[str, Any]] = []
+        
+        if connect:
+            print(f"✅ Conectado ao Supabase: {self.url}")
     
     def clean_value(self, value: Any) -> Any:
         """Limpa e converte valores para tipos apropriados"""
-        if value is None or value == "" or value == "null":
-            return None
-        
-        if isinstance(value, str):
-            value = value.strip()
-            if value == "" or value.lower() == "null":
-                return None
-        
-        return value
+        return batch_normalizer.clean_value(value)
     
     def parse_salary(self, salary_str: str) -> tuple[Optional[float], Optional[float]]:
         """Extrai salário mínimo e máximo de uma string"""
-        if not salary_str or salary_str.lower() in ['não informado', 'a combinar', 'null']:
-            return None, None
-        
-        try:
-            # Remove caracteres não numéricos exceto vírgulas, pontos e hífens
-            import re
-            clean_salary = re.sub(r'[^\d,.-]', '', salary_str)
-            
-            # Procura por padrões como "5000-8000" ou "5.000,00 - 8.000,00"
-            if '-' in clean_salary or 'a' in salary_str.lower():
-                parts = re.split(r'[-a]', clean_salary)
-                if len(parts) >= 2:
-                    min_sal = self.convert_to_float(parts[0].strip())
-                    max_sal = self.convert_to_float(parts[1].strip())
-                    return min_sal, max_sal
-            
-            # Se não tem range, usa como salário único
-            single_salary = self.convert_to_float(clean_salary)
-            return single_salary, single_salary
-            
-        except Exception:
-            return None, None
+        return batch_normalizer.parse_salary(salary_str)
     
     def convert_to_float(self, value: str) -> Optional[float]:
         """Converte string para float, lidando com formato brasileiro"""
-        if not value:
-            return None
-        
-        try:
-            # Remove espaços e substitui vírgula por ponto
-            clean_value = value.replace(' ', '').replace(',', '.')
-            # Remove pontos que não são decimais (milhares)
-            if clean_value.count('.') > 1:
-                parts = clean_value.split('.')
-                clean_value = ''.join(parts[:-1]) + '.' + parts[-1]
-            
-            return float(clean_value)
-        except Exception:
-            return None
+        return batch_normalizer.convert_to_float(value)
     
     def insert_or_get_company(self, company_name: str, industry: str = None) -> Optional[int]:
-        """Insere ou obtém ID da empresa"""
+        """Insere ou obtém ID da empresa (via cache de empresas)"""
         if not company_name:
             return None
         
         try:
-            # Primeiro tenta buscar a empresa
-            result = self.supabase.table('companies').select('id').eq('name', company_name).execute()
-            
-            if result.data:
-                return result.data[0]['id']
-            
-            # Se não existe, insere nova empresa
-            company_data = {
-                'name': company_name,
-                'industry': self.clean_value(industry)
-            }
-            
-            result = self.supabase.table('companies').insert(company_data).execute()
-            
-            if result.data:
-                self.stats['empresas_inseridas'] += 1
-                return result.data[0]['id']
+            inserted_before = self.companies.inserted
+            company_id = self.companies.resolve(company_name, self.clean_value(industry))
+            self.stats['empresas_inseridas'] += self.companies.inserted - inserted_before
+            return company_id
             
         except Exception as e:
             print(f"⚠️  Erro ao inserir empresa '{company_name}': {e}")
@@ -119,128 +90,89 @@ class SupabaseVagasUploader:
     
     def prepare_job_data(self, vaga: Dict[str, Any]) -> Dict[str, Any]:
         """Prepara dados da vaga para inserção"""
-        # Extrair dados das seções estruturadas
-        info_basicas = vaga.get('informacoes_basicas', {})
-        localizacao = vaga.get('localizacao', {})
-        remuneracao = vaga.get('remuneracao', {})
-        jornada = vaga.get('jornada_trabalho', {})
-        requisitos = vaga.get('requisitos', {})
-        
-        # Extrair salários
-        salary_min, salary_max = None, None
-        if remuneracao.get('valor_minimo'):
-            salary_min = float(remuneracao['valor_minimo'])
-        if remuneracao.get('valor_maximo'):
-            salary_max = float(remuneracao['valor_maximo'])
-        
-        # Se não tem min/max, tenta extrair do texto original
-        if not salary_min and not salary_max and remuneracao.get('texto_original'):
-            salary_min, salary_max = self.parse_salary(str(remuneracao['texto_original']))
-        
-        # Função auxiliar para limpar e truncar strings
-        def clean_and_truncate(value, max_length=None):
-            cleaned = self.clean_value(value)
-            if cleaned is None:
-                return None
-            if max_length and len(str(cleaned)) > max_length:
-                return str(cleaned)[:max_length]
-            return str(cleaned) if cleaned else None
-        
-        # Preparar dados principais da vaga
-        job_data = {
-            'title': clean_and_truncate(info_basicas.get('fonte', ''), 500),
-            'company_name': clean_and_truncate(info_basicas.get('empresa_principal', ''), 255),
-            'sector': clean_and_truncate(info_basicas.get('setor', ''), 100),
-            'area': clean_and_truncate(info_basicas.get('area', ''), 100),
-            'employment_type': clean_and_truncate(remuneracao.get('tipo', ''), 50),
-            'work_schedule': clean_and_truncate(jornada.get('jornada_extraida', '')),
-            'modality': clean_and_truncate(info_basicas.get('modalidade', ''), 50),
-            'location_city': clean_and_truncate(localizacao.get('cidade_extraida', ''), 100),
-            'location_state': clean_and_truncate(localizacao.get('estado_extraido', ''), 10),
-            'location_region': clean_and_truncate(localizacao.get('localidade_original', ''), 100),
-            'salary_min': salary_min,
-            'salary_max': salary_max,
-            'salary_currency': 'BRL',
-            'salary_period': 'month',
-            'education_level': clean_and_truncate(requisitos.get('formacao_minima', ''), 100),
-            'seniority': clean_and_truncate(requisitos.get('experiencia_necessaria', ''), 100),
-            'source_name': 'Catho',
-            'source_url': clean_and_truncate(info_basicas.get('link', '')),
-            'description': clean_and_truncate(requisitos.get('requisitos_texto_original', '')),
-            'published_date': self.parse_date(info_basicas.get('publicada_em')),
-            'extraction_timestamp': datetime.now().isoformat(),
-            'data_quality_score': 0.8
-        }
-        
-        # Remover campos None para não sobrescrever defaults
-        return {k: v for k, v in job_data.items() if v is not None}
+        return batch_normalizer.prepare_vaga(vaga)
     
     def parse_date(self, date_str: Any) -> Optional[str]:
         """Converte string de data para formato ISO"""
-        if not date_str:
-            return None
-        
-        try:
-            if isinstance(date_str, str):
-                # Tenta vários formatos de data
-                for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']:
-                    try:
-                        parsed_date = datetime.strptime(date_str, fmt)
-                        return parsed_date.date().isoformat()
-                    except ValueError:
-                        continue
-            return None
-        except Exception:
-            return None
+        return batch_normalizer.parse_date(date_str)
     
-    def insert_related_data(self, job_id: int, vaga: Dict[str, Any]):
-        """Insere dados relacionados (benefícios, responsabilidades, etc.)"""
-        try:
-            responsabilidades = vaga.get('responsabilidades', {})
-            requisitos = vaga.get('requisitos', {})
-            info_basicas = vaga.get('informacoes_basicas', {})
+    def build_related_rows(self, job_id: int, vaga: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Monta as linhas das tabelas relacionadas (benefícios, responsabilidades, etc.)"""
+        responsabilidades = vaga.get('responsabilidades', {})
+        requisitos = vaga.get('requisitos', {})
+        info_basicas = vaga.get('informacoes_basicas', {})
+        related = {}
+        
+        # Responsabilidades
+        if 'lista_responsabilidades' in responsabilidades and isinstance(responsabilidades['lista_responsabilidades'], list):
+            resp_data = []
+            for resp in responsabilidades['lista_responsabilidades']:
+                if resp and str(resp).strip():
+                    resp_data.append({
+                        'job_id': job_id,
+                        'responsibility': str(resp).strip()
+                    })
             
-            # Responsabilidades
-            if 'lista_responsabilidades' in responsabilidades and isinstance(responsabilidades['lista_responsabilidades'], list):
-                resp_data = []
-                for resp in responsabilidades['lista_responsabilidades']:
-                    if resp and str(resp).strip():
-                        resp_data.append({
-                            'job_id': job_id,
-                            'responsibility': str(resp).strip()
-                        })
-                
-                if resp_data:
-                    self.supabase.table('job_responsibilities').insert(resp_data).execute()
+            if resp_data:
+                related['job_responsibilities'] = resp_data
+        
+        # Idiomas como requisitos
+        if 'idiomas' in requisitos and isinstance(requisitos['idiomas'], list):
+            req_data = []
+            for idioma in requisitos['idiomas']:
+                if idioma and str(idioma).strip():
+                    req_data.append({
+                        'job_id': job_id,
+                        'requirement': f"Idioma: {str(idioma).strip()}"
+                    })
             
-            # Idiomas como requisitos
-            if 'idiomas' in requisitos and isinstance(requisitos['idiomas'], list):
-                req_data = []
-                for idioma in requisitos['idiomas']:
-                    if idioma and str(idioma).strip():
-                        req_data.append({
-                            'job_id': job_id,
-                            'requirement': f"Idioma: {str(idioma).strip()}"
-                        })
-                
-                if req_data:
-                    self.supabase.table('job_requirements_must').insert(req_data).execute()
+            if req_data:
+                related['job_requirements_must'] = req_data
+        
+        # Empresas mencionadas como tags
+        if 'empresas_mencionadas' in info_basicas and isinstance(info_basicas['empresas_mencionadas'], list):
+            tags_data = []
+            for empresa in info_basicas['empresas_mencionadas']:
+                if empresa and str(empresa).strip() and str(empresa).strip() != info_basicas.get('empresa_principal', ''):
+                    tags_data.append({
+                        'job_id': job_id,
+                        'tag': str(empresa).strip()[:100]
+                    })
             
-            # Empresas mencionadas como tags
-            if 'empresas_mencionadas' in info_basicas and isinstance(info_basicas['empresas_mencionadas'], list):
-                tags_data = []
-                for empresa in info_basicas['empresas_mencionadas']:
-                    if empresa and str(empresa).strip() and str(empresa).strip() != info_basicas.get('empresa_principal', ''):
-                        tags_data.append({
-                            'job_id': job_id,
-                            'tag': str(empresa).strip()[:100]
-                        })
-                
-                if tags_data:
-                    self.supabase.table('job_tags').insert(tags_data).execute()
+            if tags_data:
+                related['job_tags'] = tags_data
         
-        except Exception as e:
-            print(f"⚠️  Erro ao inserir dados relacionados para vaga {job_id}: {e}")
+        return related
+    
+    def reject(self, record: Any, reason: Any, table: str = 'jobs'):
+        """Registra uma vaga (ou linhas relacionadas) rejeitada na fila de rejeitadas"""
+        if self.dead_letter is not None:
+            self.dead_letter.add(record, str(reason), offset=self.batch_offset, table=table)
+    
+    def fail(self, vaga: Any, error: Exception):
+        """Vaga que o banco recusou vai para a fila de rejeitadas; com erro
+        transitório (rede/5xx) ela não foi recusada e fica para o --resume"""
+        if is_transient_error(error):
+            self.transient_failures.append(vaga)
+        else:
+            self.reject(vaga, error)
+    
+    def insert_related_rows(self, related_rows: Dict[str, List[Dict[str, Any]]]) -> List[Tuple[str, Exception]]:
+        """Um insert por tabela relacionada; as linhas de uma tabela que falhou vão
+        para a fila de rejeitadas com o motivo. Retorna [(tabela, erro), ...]"""
+        failures = []
+        for table, rows in related_rows.items():
+            try:
+                self.supabase.table(table).insert(rows).execute()
+            except Exception as e:
+                print(f"⚠️  Erro ao inserir {len(rows)} linhas em {table}: {str(e)[:100]}")
+                self.reject(rows, e, table=table)
+                failures.append((table, e))
+        return failures
+    
+    def insert_related_data(self, job_id: int, vaga: Dict[str, Any]) -> List[Tuple[str, Exception]]:
+        """Insere dados relacionados (benefícios, responsabilidades, etc.)"""
+        return self.insert_related_rows(self.build_related_rows(job_id, vaga))
     
     def upload_batch(self, vagas: List[Dict[str, Any]], batch_size: int = 50) -> int:
         """Faz upload de um lote de vagas"""
@@ -256,6 +188,7 @@ class SupabaseVagasUploader:
                     if not isinstance(vaga, dict):
                         print(f"❌ Vaga {idx + 1} não é um dicionário")
                         self.stats['erros'] += 1
+                        self.reject(vaga, 'vaga não é um dicionário')
                         continue
                     
                     # Preparar dados da vaga
@@ -263,6 +196,7 @@ class SupabaseVagasUploader:
                     
                     if not job_data.get('title') or not job_data.get('company_name'):
                         print(f"⚠️  Vaga {idx + 1} ignorada: título ou empresa em branco")
+                        self.reject(vaga, 'título ou empresa em branco')
                         continue
                     
                     # Inserir ou obter empresa
@@ -292,6 +226,7 @@ class SupabaseVagasUploader:
                 except Exception as e:
                     self.stats['erros'] += 1
                     print(f"❌ Erro ao processar vaga {idx + 1}: {str(e)[:100]}...")
+                    self.fail(vaga, e)
                     continue
             
             # Pequena pausa entre lotes
@@ -299,40 +234,193 @@ class SupabaseVagasUploader:
         
         return uploaded_count
     
-    def load_and_upload_json(self, json_file: str):
-        """Carrega JSON e faz upload de todas as vagas"""
-        print(f"📂 Carregando dados de {json_file}...")
+    def insert_jobs_bulk(self, jobs: List[Dict[str, Any]]) -> Tuple[List[Optional[int]], List[Tuple[List[int], Exception]]]:
+        """Insere várias vagas e retorna os IDs na mesma ordem, mais os grupos que falharam.
+        
+        prepare_job_data remove campos None (para manter os defaults da tabela),
+        e o PostgREST exige as mesmas colunas em todas as linhas de um insert em
+        massa: por isso as vagas são agrupadas pelo conjunto de colunas, com um
+        insert por grupo (normalmente um ou dois por lote). Cada grupo é um
+        insert independente: se um falha, os outros continuam, e os índices do
+        grupo que falhou voltam junto com o erro (com ID None).
+        """
+        groups: Dict[tuple, List[int]] = {}
+        for index, job in enumerate(jobs):
+            groups.setdefault(tuple(sorted(job)), []).append(index)
+        
+        job_ids: List[Optional[int]] = [None] * len(jobs)
+        failed: List[Tuple[List[int], Exception]] = []
+        for indexes in groups.values():
+            try:
+                result = self.supabase.table('jobs').insert([jobs[i] for i in indexes]).execute()
+            except Exception as e:
+                failed.append((indexes, e))
+                continue
+            # INSERT ... RETURNING devolve as linhas na ordem enviada
+            for index, row in zip(indexes, result.data or []):
+                job_ids[index] = row['id']
+        return job_ids, failed
+    
+    def upload_batch_bulk(self, vagas: List[Dict[str, Any]], batch_size: int = 50) -> int:
+        """Faz upload em lotes com inserts em massa.
+        
+        Por lote: um insert de vagas (por conjunto de colunas) e um insert por
+        tabela relacionada, em vez de um insert por vaga e por tabela. Se o
+        insert em massa de um grupo for recusado, só as vagas desse grupo são
+        reenviadas uma a uma por upload_batch para isolar a linha com problema
+        (as dos grupos já gravados não são enviadas de novo). Se a falha for
+        transitória (rede/5xx), o grupo pode ter sido gravado: as vagas não são
+        reenviadas agora e ficam para o --resume.
+        """
+        uploaded_count = 0
+        
+        for i in range(0, len(vagas), batch_size):
+            batch = vagas[i:i + batch_size]
+            
+            print(f"📤 Processando lote {i//batch_size + 1} ({len(batch)} vagas, em massa)...")
+            
+            # Normalização e validação do lote inteiro antes de montar os inserts
+            records, reasons = normalize_vagas(batch)
+            
+            jobs, sources = [], []
+            for idx, (vaga, job_data, reason) in enumerate(zip(batch, records, reasons)):
+                if reason == REJECT_NOT_DICT:
+                    print(f"❌ Vaga {idx + 1} não é um dicionário")
+                    self.stats['erros'] += 1
+                    self.reject(vaga, reason)
+                    continue
+                
+                if reason:
+                    print(f"⚠️  Vaga {idx + 1} ignorada: {reason}")
+                    self.reject(vaga, reason)
+                    continue
+                
+                jobs.append(job_data)
+                sources.append(vaga)
+            
+            if not jobs:
+                continue
+            
+            # Empresas do lote: resolvidas pelo cache, novas criadas em um único insert
+            try:
+                inserted_before = self.companies.inserted
+                company_ids = self.companies.resolve_many(
+                    (job['company_name'], self.clean_value(job.get('industry'))) for job in jobs
+                )
+                self.stats['empresas_inseridas'] += self.companies.inserted - inserted_before
+                for job in jobs:
+                    if company_ids.get(job['company_name']):
+                        job['company_id'] = company_ids[job['company_name']]
+            except Exception as e:
+                print(f"⚠️  Erro ao resolver empresas do lote: {str(e)[:100]}")
+            
+            job_ids, failed_groups = self.insert_jobs_bulk(jobs)
+            retried = set()
+            for indexes, e in failed_groups:
+                retried.update(indexes)
+                if is_transient_error(e):
+                    print(f"⚠️  Insert em massa de {len(indexes)} vagas falhou por erro transitório "
+                          f"({str(e)[:100]}); ficam para o --resume")
+                    self.stats['erros'] += len(indexes)
+                    self.transient_failures.extend(sources[i] for i in indexes)
+                    continue
+                print(f"⚠️  Insert em massa de {len(indexes)} vagas falhou ({str(e)[:100]}); "
+                      f"reenviando essas vagas uma a uma...")
+                uploaded_count += self.upload_batch([sources[i] for i in indexes], batch_size=len(indexes))
+            
+            # Um insert por tabela relacionada para as vagas gravadas em massa
+            related_rows: Dict[str, List[Dict[str, Any]]] = {}
+            for index, (job_id, vaga) in enumerate(zip(job_ids, sources)):
+                if index in retried:
+                    continue
+                if job_id is None:
+                    self.stats['erros'] += 1
+                    self.reject(vaga, 'insert em massa não retornou o ID da vaga')
+                    continue
+                for table, rows in self.build_related_rows(job_id, vaga).items():
+                    related_rows.setdefault(table, []).extend(rows)
+            
+            self.insert_related_rows(related_rows)
+            
+            inserted = sum(1 for job_id in job_ids if job_id is not None)
+            uploaded_count += inserted
+            self.stats['vagas_inseridas'] += inserted
+            print(f"✅ {uploaded_count} vagas processadas...")
+        
+        return uploaded_count
+    
+    def iter_vagas(self, json_file: str) -> Iterator[Dict[str, Any]]:
+        """Lê as vagas do JSON (ou JSONL) em streaming, contando o total"""
+        for vaga in iter_jobs(json_file):
+            self.stats['total_vagas'] += 1
+            yield vaga
+    
+    def load_and_upload_json(self, json_file: str, bulk: bool = True, batch_size: int = 50,
+                             resume: bool = False, checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+                             dead_letter_path: str = DEFAULT_DEAD_LETTER_PATH):
+        """Lê o JSON em streaming e faz upload das vagas lote a lote.
         
+        Após cada lote, o checkpoint avança só até onde todas as vagas foram
+        confirmadas ou rejeitadas de vez (fila de rejeitadas, com o motivo).
+        Se alguma vaga falhar por erro transitório (rede/5xx), o upload para ao
+        fim do lote: o checkpoint aponta para a primeira dessas vagas e guarda
+        as posições seguintes já resolvidas, e resume=True reenvia só o resto.
+        """
+        print(f"📂 Lendo dados de {json_file} (streaming)...")
+        
+        checkpoint = Checkpoint(checkpoint_path)
+        self.dead_letter = DeadLetterQueue(dead_letter_path, source=json_file)
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            offset = checkpoint.offset(json_file) if resume else 0
+            done_after = checkpoint.done_after(json_file) if resume else set()
+            vagas = self.iter_vagas(json_file)
+            if offset:
+                print(f"⏩ Retomando do checkpoint: {offset} vagas já enviadas")
+                vagas = islice(vagas, offset, None)
+            # (posição na entrada, vaga), sem as já resolvidas depois do checkpoint
+            positioned = ((position, vaga) for position, vaga in enumerate(vagas, offset)
+                          if position not in done_after)
+            
+            print(f"\n🚀 Iniciando upload para o Supabase (lotes de {batch_size})...")
             
-            # Extrair lista de vagas do JSON
-            if isinstance(data, dict):
-                if 'vagas' in data:
-                    vagas = data['vagas']
-                elif 'jobs' in data:
-                    vagas = data['jobs']
+            # Cada lote é enviado assim que lido; o arquivo nunca fica inteiro em memória
+            interrupted = False
+            for items in batched(positioned, batch_size):
+                positions = [position for position, _ in items]
+                batch = [vaga for _, vaga in items]
+                self.batch_offset = positions[0]
+                self.transient_failures = []
+                if bulk:
+                    self.upload_batch_bulk(batch, batch_size=batch_size)
                 else:
-                    # Assumir que o dict inteiro são as vagas
-                    vagas = list(data.values()) if all(isinstance(v, dict) for v in data.values()) else [data]
-            elif isinstance(data, list):
-                vagas = data
-            else:
-                raise ValueError("Formato de JSON não reconhecido")
+                    self.upload_batch(batch, batch_size=batch_size)
+                
+                if self.transient_failures:
+                    pending = {id(vaga) for vaga in self.transient_failures}
+                    first = next(i for i, vaga in enumerate(batch) if id(vaga) in pending)
+                    offset = positions[first]
+                    done_after |= {p for p, vaga in zip(positions[first:], batch[first:]) if id(vaga) not in pending}
+                    checkpoint.save(json_file, offset, done_after)
+                    print(f"⚠️  {len(pending)} vagas não confirmadas por erro transitório (rede/5xx); "
+                          f"upload interrompido na vaga {offset}")
+                    interrupted = True
+                    break
+                
+                offset = positions[-1] + 1
+                checkpoint.save(json_file, offset, done_after)
             
-            self.stats['total_vagas'] = len(vagas)
             print(f"📊 Total de vagas encontradas: {self.stats['total_vagas']}")
-            
             if self.stats['total_vagas'] == 0:
                 print("❌ Nenhuma vaga encontrada no arquivo JSON")
                 return
             
-            # Confirmar upload
-            print(f"\n🚀 Iniciando upload de {self.stats['total_vagas']} vagas para o Supabase...")
+            if interrupted:
+                self.print_final_stats()
+                print(f"💡 Use --resume para reenviar as vagas não confirmadas")
+                return
             
-            # Fazer upload em lotes
-            uploaded = self.upload_batch(vagas)
+            # Upload completo: o próximo começa do início
+            checkpoint.clear(json_file)
             
             # Estatísticas finais
             self.print_final_stats()
@@ -343,6 +431,39 @@ class SupabaseVagasUploader:
             print(f"❌ Erro ao decodificar JSON: {e}")
         except Exception as e:
             print(f"❌ Erro durante upload: {e}")
+            print(f"💡 Use --resume para continuar do último lote confirmado")
+        finally:
+            self.dead_letter.close()
+    
+    def iter_copy_rows(self, vagas: Iterable[Dict[str, Any]]):
+        """Pares (linha de jobs, {tabela_filha: [valores]}) para o CopyJobsLoader"""
+        from copy_loader import CHILD_TABLES
+        
+        for chunk in batched(vagas, NORMALIZE_CHUNK_SIZE):
+            records, reasons = normalize_vagas(chunk)
+            for vaga, job_data, reason in zip(chunk, records, reasons):
+                if reason:
+                    print(f"⚠️  Vaga ignorada: {reason}")
+                    self.stats['erros'] += 1
+                    continue
+                children = {
+                    table: [row[CHILD_TABLES[table]] for row in rows]
+                    for table, rows in self.build_related_rows(None, vaga).items()
+                }
+                yield job_data, children
+    
+    def load_with_copy(self, json_file: str, dsn: str):
+        """Carga direta no Postgres: COPY para staging + merge em uma transação"""
+        from copy_loader import CopyJobsLoader, print_load_stats
+        
+        print(f"🚀 Carregando vagas de {json_file} via COPY (streaming)...")
+        
+        stats = CopyJobsLoader(dsn).load(self.iter_copy_rows(self.iter_vagas(json_file)))
+        self.stats['vagas_inseridas'] = stats['inserted'] + stats['updated']
+        self.stats['empresas_inseridas'] = stats['companies_inserted']
+        print_load_stats(stats)
+        self.print_final_stats()
+        return stats
     
     def print_final_stats(self):
         """Imprime estatísticas finais"""
@@ -357,7 +478,8 @@ class SupabaseVagasUploader:
         print(f"🏢 Empresas inseridas: {self.stats['empresas_inseridas']}")
         print(f"❌ Erros encontrados: {self.stats['erros']}")
         print(f"⏱️  Tempo total: {duracao}")
-        print(f"📊 Taxa de sucesso: {(self.stats['vagas_inseridas']/self.stats['total_vagas']*100):.1f}%")
+        if self.stats['total_vagas']:
+            print(f"📊 Taxa de sucesso: {(self.stats['vagas_inseridas']/self.stats['total_vagas']*100):.1f}%")
         
         if self.stats['vagas_inseridas'] > 0:
             print(f"\n🎉 Upload concluído com sucesso!")
@@ -366,11 +488,24 @@ class SupabaseVagasUploader:
             print(f"\n⚠️  Nenhuma vaga foi inserida. Verifique os dados e tente novamente.")
 
 def main():
+    parser = argparse.ArgumentParser(description='Upload de vagas do JSON para o Supabase')
+    parser.add_argument('json_file', nargs='?', default='vagas_todos_setores_estruturadas_completo.json',
+                        help='Arquivo JSON com as vagas')
+    parser.add_argument('--row-by-row', action='store_true',
+                        help='Insere uma vaga por requisição (modo antigo, sem inserts em massa)')
+    parser.add_argument('--dsn', help='DSN do Postgres: carrega via COPY direto no banco, sem a API REST')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continua do último lote confirmado no checkpoint')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help='Arquivo de checkpoint')
+    parser.add_argument('--dead-letter', default=DEFAULT_DEAD_LETTER_PATH,
+                        help='JSONL onde as vagas rejeitadas são gravadas com o motivo')
+    args = parser.parse_args()
+    
     print("🚀 UPLOAD DE VAGAS PARA SUPABASE")
     print("="*40)
     
     # Arquivo JSON com as vagas
-    json_file = "vagas_todos_setores_estruturadas_completo.json"
+    json_file = args.json_file
     
     if not os.path.exists(json_file):
         print(f"❌ Arquivo {json_file} não encontrado")
@@ -378,8 +513,14 @@ def main():
         return
     
     try:
-        uploader = SupabaseVagasUploader()
-        uploader.load_and_upload_json(json_file)
+        if args.dsn:
+            uploader = SupabaseVagasUploader(connect=False)
+            uploader.load_with_copy(json_file, args.dsn)
+        else:
+            uploader = SupabaseVagasUploader()
+            uploader.load_and_upload_json(json_file, bulk=not args.row_by_row, resume=args.resume,
+                                          checkpoint_path=args.checkpoint,
+                                          dead_letter_path=args.dead_letter)
         
     except Exception as e:
         print(f"❌ Erro fatal: {e}")